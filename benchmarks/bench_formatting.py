@@ -0,0 +1,121 @@
+"""
+Graphing/formatting pipeline cost on the AAPL sample: the previous row-by-row
+groupAttributes/flattenBook and formatQueues/queueFromatHelper against the
+vectorized versions in Book, checking that both produce identical frames.
+
+The row-by-row versions are kept here as reference implementations.
+
+Usage:
+	python benchmarks/bench_formatting.py [num_rows]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from order_book import Book
+from message_reader import readMessages
+import snapshot_policy as sp
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'lobster',
+					'AAPL_2012-06-21_34200000_37800000_message_50.csv')
+
+def rowGroupAttributes(bids, asks):
+	"""
+	Row-by-row groupAttributes followed by flattenBook.
+	"""
+	b_name = ['Bid 5', 'Bid 4', 'Bid 3', 'Bid 2', 'Best Best']
+	a_name = ['Best ask', 'Ask 2', 'Ask 3', 'Ask 4', 'Ask 5']
+	transpose_bids = []
+	transpose_asks = []
+	for i in range(len(bids)):
+		bid_time = bids.iloc[i]['Time']
+		bid_prices = [bids.iloc[i].Bid_5, bids.iloc[i].Bid_4, bids.iloc[i].Bid_3, bids.iloc[i].Bid_2, bids.iloc[i].Bid_1]
+		bid_vols = [bids.iloc[i].Bid_5_Vol, bids.iloc[i].Bid_4_Vol, bids.iloc[i].Bid_3_Vol, bids.iloc[i].Bid_2_Vol, bids.iloc[i].Bid_1_Vol]
+		transpose_bids.append([bid_time, bid_vols, bid_prices, b_name])
+		ask_time = asks.iloc[i]['Time']
+		ask_prices = [asks.iloc[i].Ask_1, asks.iloc[i].Ask_2, asks.iloc[i].Ask_3, asks.iloc[i].Ask_4, asks.iloc[i].Ask_5]
+		ask_vols = [asks.iloc[i].Ask_1_Vol, asks.iloc[i].Ask_2_Vol, asks.iloc[i].Ask_3_Vol, asks.iloc[i].Ask_4_Vol, asks.iloc[i].Ask_5_Vol]
+		transpose_asks.append([ask_time, ask_vols, ask_prices, a_name])
+	transpose_bids = pd.DataFrame(transpose_bids, columns=['Time', 'Bid_vol', 'Bid_Prices', 'Bid_level'])
+	transpose_asks = pd.DataFrame(transpose_asks, columns=['Time', 'Ask_vol', 'Ask_Prices', 'Ask_level'])
+
+	flattened_limits = []
+	for i in range(len(transpose_bids)):
+		ts = transpose_bids.iloc[i]['Time']
+		bs = transpose_bids.iloc[i]['Bid_vol']
+		ns = transpose_bids.iloc[i]['Bid_level']
+		ps = transpose_bids.iloc[i]['Bid_Prices']
+		for j in range(len(bs)):
+			flattened_limits.append([ts, bs[j], ns[j], ps[j], 'Bid'])
+		bs = transpose_asks.iloc[i]['Ask_vol']
+		ns = transpose_asks.iloc[i]['Ask_level']
+		ps = transpose_asks.iloc[i]['Ask_Prices']
+		for k in range(len(bs)):
+			flattened_limits.append([ts, bs[k], ns[k], ps[k], 'Ask'])
+	return pd.DataFrame(flattened_limits, columns=['Time', 'Vol', 'Level', 'Price', 'Side'])
+
+def rowFormatQueues(queues):
+	"""
+	Row-by-row formatQueues followed by queueFromatHelper on both sides.
+	"""
+	def pad(side_qs):
+		row = []
+		lens = []
+		for a in range(5 - len(side_qs)):
+			row.append(None)
+			lens.append(0)
+		for q in side_qs:
+			row.append(q)
+			lens.append(1 if type(q[0]) != list else len(q))
+		row.append(lens)
+		return row
+
+	def helper(data):
+		columns = {'l1': [], 'l2': [], 'l3': [], 'l4': [], 'l5': []}
+		for x in range(len(data)):
+			for k in range(1, 6):
+				columns['l{}'.format(k)].append(data[x][-k])
+		return pd.DataFrame(columns)
+
+	bid_queues = pd.DataFrame([pad(q[0][0]) for q in queues], columns=['Bid_5', 'Bid_4', 'Bid_3', 'Bid_2', 'Bid_1', 'Bid_Q_lens'])
+	ask_queues = pd.DataFrame([pad(q[0][1]) for q in queues], columns=['Ask_5', 'Ask_4', 'Ask_3', 'Ask_2', 'Ask_1', 'Ask_Q_lens'])
+	return bid_queues, ask_queues, helper(bid_queues['Bid_Q_lens']), helper(ask_queues['Ask_Q_lens'])
+
+def vectorFormatQueues(book):
+	"""
+	Book.formatQueues followed by queueFromatHelper on both sides.
+	"""
+	bid_queues, ask_queues = book.formatQueues()
+	return bid_queues, ask_queues, book.queueFromatHelper(bid_queues['Bid_Q_lens']), book.queueFromatHelper(ask_queues['Ask_Q_lens'])
+
+def timed(fn):
+	"""
+	Returns fn's result and its run time in seconds.
+	"""
+	start = time.perf_counter()
+	result = fn()
+	return result, time.perf_counter() - start
+
+if __name__ == '__main__':
+	num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+	book = Book(snapshot_policy=sp.TopLevels(5))
+	book.replay(readMessages(DATA).iloc[:num_rows])
+	bids, asks = book.splitBidsAsks(book.formatBook(0, 5))
+
+	old, old_seconds = timed(lambda: rowGroupAttributes(bids, asks))
+	new, new_seconds = timed(lambda: book.groupAttributes(bids, asks))
+	pd.testing.assert_frame_equal(old, new)
+	print('groupAttributes  {:>7} rows  row-by-row {:8.3f}s  vectorized {:8.3f}s  {:6.1f}x'.format(
+		len(bids), old_seconds, new_seconds, old_seconds / new_seconds))
+
+	old, old_seconds = timed(lambda: rowFormatQueues(book.queues))
+	new, new_seconds = timed(lambda: vectorFormatQueues(book))
+	for old_frame, new_frame in zip(old, new):
+		pd.testing.assert_frame_equal(old_frame, new_frame)
+	print('formatQueues     {:>7} rows  row-by-row {:8.3f}s  vectorized {:8.3f}s  {:6.1f}x'.format(
+		len(book.queues), old_seconds, new_seconds, old_seconds / new_seconds))
@@ -0,0 +1,54 @@
+"""
+CSV ingestion versus memory-mapped binary ingestion on the bundled AAPL sample.
+
+Converts the message CSV to the binary replay format once, then times loading
+each format into the column arrays Book.replay consumes, and a full replay
+(snapshots off) from each.
+
+Usage:
+	python benchmarks/bench_ingest.py [repeats]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from order_book import Book
+import message_reader as mr
+import snapshot_policy as sp
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'lobster',
+					'AAPL_2012-06-21_34200000_37800000_message_50.csv')
+
+def best(fn, repeats):
+	"""
+	Returns the fastest of repeats runs of fn, in seconds.
+	"""
+	timings = []
+	for _ in range(repeats):
+		start = time.perf_counter()
+		fn()
+		timings.append(time.perf_counter() - start)
+	return min(timings)
+
+if __name__ == '__main__':
+	repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+	binary_path = os.path.join(tempfile.gettempdir(), 'AAPL_message_50.bin')
+
+	start = time.perf_counter()
+	count = mr.writeBinaryMessages(DATA, binary_path)
+	convert = time.perf_counter() - start
+
+	csv_load = best(lambda: mr.readMessages(DATA), repeats)
+	bin_load = best(lambda: mr.loadBinaryMessages(binary_path), repeats)
+	csv_replay = best(lambda: Book(snapshot_policy=sp.NoSnapshots()).replay(mr.readMessages(DATA)), 1)
+	bin_replay = best(lambda: Book(snapshot_policy=sp.NoSnapshots()).replay(mr.loadBinaryMessages(binary_path)), 1)
+
+	print('{} messages, CSV {:.1f} MB, binary {:.1f} MB (one-off conversion {:.2f}s)'.format(
+		count, os.path.getsize(DATA) / 1e6, os.path.getsize(binary_path) / 1e6, convert))
+	print('{:<22} {:>10} {:>10}'.format('', 'csv', 'mmap'))
+	print('{:<22} {:>9.1f}ms {:>9.1f}ms'.format('load', csv_load * 1e3, bin_load * 1e3))
+	print('{:<22} {:>9.2f}s {:>9.2f}s'.format('load + replay', csv_replay, bin_replay))
@@ -0,0 +1,69 @@
+"""
+Replay overhead of logging on the AAPL sample.
+
+Runs the same replay with every INFO call stubbed out of the book's loggers (the
+baseline), with logging disabled (WARNING, the default), with INFO logging to
+dev.log, and with the structured per-event trace enabled. Overheads are relative
+to the baseline, so the first of them is what disabled log calls still cost.
+
+Usage:
+	python benchmarks/bench_logging.py [num_events]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from order_book import Book
+from message_reader import readMessages
+import snapshot_policy as sp
+import log
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'lobster',
+					'AAPL_2012-06-21_34200000_37800000_message_50.csv')
+
+LOGGERS = ['Order Book', 'Limit BST', 'Price Ladder']
+
+@contextmanager
+def infoRemoved():
+	"""
+	Replaces info() on the engine's loggers with a no-op while the block runs.
+	"""
+	loggers = [log.get_logger(name) for name in LOGGERS]
+	for logger in loggers:
+		logger.info = lambda *args, **kwargs: None
+	try:
+		yield
+	finally:
+		for logger in loggers:
+			del logger.info
+
+def run(messages, level, trace_path=None):
+	"""
+	Replays messages with the given root log level and returns events/sec.
+	"""
+	logging.getLogger().setLevel(level)
+	book = Book(snapshot_policy=sp.TopLevels(5, record_queues=False), trace_path=trace_path)
+	stats = book.replay(messages)
+	book.closeTrace()
+	logging.getLogger().setLevel(logging.WARNING)
+	return stats['events_per_sec']
+
+if __name__ == '__main__':
+	num_events = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+	messages = readMessages(DATA)[:num_events]
+	trace_path = os.path.join(tempfile.gettempdir(), 'book_trace.csv')
+
+	with infoRemoved():
+		baseline = run(messages, logging.WARNING)
+	off = run(messages, logging.WARNING)
+	info = run(messages, logging.INFO)
+	trace = run(messages, logging.WARNING, trace_path)
+	print('{:<24} {:>12}  {:>9}'.format('mode', 'events/sec', 'overhead'))
+	print('{:<24} {:>12.0f}  {:>9}'.format('log calls removed', baseline, '-'))
+	for name, rate in (('logging off', off), ('INFO to dev.log', info), ('per-event trace', trace)):
+		print('{:<24} {:>12.0f}  {:>8.0f}%'.format(name, rate, (baseline / rate - 1) * 100))
@@ -0,0 +1,65 @@
+"""
+Memory per resting order and per live price level.
+
+Replays the AAPL sample into a book that keeps no history (retain_history=False,
+snapshots off), so what it holds at the end is the resting book itself: the live
+levels, their queues and indexes, the resting orders and the orders dict. The
+traced total, less what an empty book holds, is divided by the resting orders and by
+the live levels, and split into the part held by the levels (Limit, LinkedList and
+QueueIndex with its lists) and the rest, which is charged to the resting orders.
+
+Usage:
+	python benchmarks/bench_memory.py
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from order_book import Book
+from message_reader import readMessages
+import snapshot_policy as sp
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'lobster',
+					'AAPL_2012-06-21_34200000_37800000_message_50.csv')
+
+def liveLevels(book):
+	"""
+	Returns every live level on both sides of the book.
+	"""
+	return book.buy.inOrderTraversal() + book.sell.inOrderTraversal()
+
+def levelBytes(level):
+	"""
+	Bytes held by one level's own objects: the Limit, its queue and the queue's index.
+	"""
+	queue = level.order_queue
+	index = queue.index
+	return (sys.getsizeof(level) + sys.getsizeof(queue) + sys.getsizeof(index) +
+			sys.getsizeof(index.counts) + sys.getsizeof(index.shares) + sys.getsizeof(index.values))
+
+if __name__ == '__main__':
+	messages = readMessages(DATA)
+	tracemalloc.start()
+	empty = Book(snapshot_policy=sp.NoSnapshots(), retain_history=False)
+	empty_bytes = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	del empty
+
+	tracemalloc.start()
+	book = Book(snapshot_policy=sp.NoSnapshots(), retain_history=False)
+	book.replay(messages)
+	book_bytes = tracemalloc.get_traced_memory()[0] - empty_bytes
+	tracemalloc.stop()
+
+	levels = liveLevels(book)
+	resting = sum(level.num_orders for level in levels)
+	level_bytes = sum(levelBytes(level) for level in levels)
+	order_bytes = book_bytes - level_bytes
+	print('AAPL sample: {} messages, {} resting orders ({} held), {} live levels'.format(
+		len(messages), resting, len(book.orders), len(levels)))
+	print('book memory (no history)  {:8.3f} MB'.format(book_bytes / 1e6))
+	print('per resting order         {:8.0f} bytes ({:.0f} bytes of total)'.format(order_bytes / resting, book_bytes / resting))
+	print('per live level            {:8.0f} bytes ({:.0f} bytes of total)'.format(level_bytes / len(levels), book_bytes / len(levels)))
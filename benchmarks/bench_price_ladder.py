@@ -0,0 +1,81 @@
+"""
+Level lookup cost near the touch: balanced tree on float prices versus the
+integer tick price ladder.
+
+Both sides hold the same set of levels; lookups are drawn from within a few
+dozen ticks of the centre, which is where most LOBSTER messages land.
+
+Levels are created and removed far more often than a lookup alone would suggest, so
+the AAPL sample is also replayed end to end with snapshots off, on float prices with
+the tree alone and on integer prices with the ladder.
+
+Usage:
+	python benchmarks/bench_price_ladder.py [num_levels] [num_lookups]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import limit_bst as tree
+from price_ladder import PriceLadder
+from order_obj import Order
+from order_book import Book
+from message_reader import readMessages
+import snapshot_policy as sp
+
+TICK = 100
+CENTER = 5850000
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'lobster',
+					'AAPL_2012-06-21_34200000_37800000_message_50.csv')
+
+def timeLookups(side, prices):
+	"""
+	Returns the mean lookup time in nanoseconds.
+	"""
+	get_limit = side.getLimit
+	start = time.perf_counter()
+	for price in prices:
+		get_limit(price)
+	return (time.perf_counter() - start) / len(prices) * 1e9
+
+def replaySeconds(messages, repeats=3, **kwargs):
+	"""
+	Returns the fastest of repeats replays of messages into Book(**kwargs) with snapshots off.
+	"""
+	timings = []
+	for _ in range(repeats):
+		book = Book(snapshot_policy=sp.NoSnapshots(), **kwargs)
+		timings.append(book.replay(messages)['seconds'])
+	return min(timings)
+
+if __name__ == '__main__':
+	num_levels = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+	num_lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+	rng = random.Random(42)
+
+	float_side = tree.BinarySearchTree()
+	tick_side = PriceLadder(TICK, 256, 1)
+	for i in range(num_levels):
+		price = CENTER + (i - num_levels // 2) * TICK
+		float_side.handleNewOrder(Order(0, i, 100, price / 10000, 1))
+		tick_side.handleNewOrder(Order(0, i, 100, price, 1))
+	tick_side.recenter(CENTER)
+
+	offsets = [rng.randint(-30, 30) for _ in range(num_lookups)]
+	float_ns = timeLookups(float_side, [(CENTER + o * TICK) / 10000 for o in offsets])
+	tick_ns = timeLookups(tick_side, [CENTER + o * TICK for o in offsets])
+	print('levels {}, tree depth {}'.format(num_levels, float_side.depth()))
+	print('tree (float prices)   {:8.1f} ns/lookup'.format(float_ns))
+	print('ladder (tick prices)  {:8.1f} ns/lookup'.format(tick_ns))
+
+	float_messages = readMessages(DATA)
+	tick_messages = readMessages(DATA, price_scale=None)
+	events = len(float_messages)
+	for name, messages, kwargs in (('tree (float prices)', float_messages, {}),
+									('ladder (tick prices)', tick_messages, {'tick_size': TICK})):
+		seconds = replaySeconds(messages, **kwargs)
+		print('AAPL replay, {:<21} {:9.0f} events/sec'.format(name, events / seconds))
@@ -0,0 +1,386 @@
+"""
+Reproducible benchmark suite: replay throughput, per-event-type latency, snapshot and
+formatting cost, and peak memory, on the bundled AAPL sample and on synthetic deep books.
+
+Snapshots record the top 5 levels. Order queues are recorded for the AAPL sample only:
+the synthetic books hold hundreds of orders at the touch, and copying those queues on
+every event would measure little but list copying and exhaust memory.
+
+Results are written as JSON. Given a saved baseline, every metric is compared against it
+and any that got worse by more than the tolerance is reported (exit status 1).
+
+Usage:
+	python benchmarks/bench_suite.py [--output results.json] [--baseline baseline.json]
+		[--tolerance 0.10] [--depths 100 2000] [--synthetic-events 100000] [--format-rows 2000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from order_book import Book
+from message_reader import readMessages
+import snapshot_policy as sp
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'lobster',
+					'AAPL_2012-06-21_34200000_37800000_message_50.csv')
+
+EVENT_NAMES = {1: 'submit', 2: 'cancel', 3: 'delete', 4: 'execute', 5: 'hidden'}
+PERCENTILES = [50, 90, 99, 99.9]
+# latency figures reported but not gated: single outliers move them by more than any
+# tolerance between runs of identical code
+UNGATED = ('.max_us', '.p99.9_us', '.mean_us')
+
+def syntheticMessages(num_events, depth, seed=0, mid=5850000, tick=100):
+	"""
+	Generates a valid LOBSTER-style message stream over a book depth levels deep per side.
+
+	Every level on both sides is first filled with two orders, then submissions, partial
+	cancels, deletions, executions at the touch and hidden executions are drawn at random.
+	Only live orders are cancelled, deleted or executed, and executions always hit the
+	front of the best queue, so the stream is one a real venue could have produced.
+
+	Args:
+		num_events (int): Number of messages, including the initial fill.
+		depth (int): Number of price levels per side.
+		seed (int): Random seed.
+		mid (int): Mid price in LOBSTER integer units.
+		tick (int): Tick size in LOBSTER integer units.
+
+	Returns:
+		tuple: (times, types, order_ids, shares, prices, directions) arrays, prices in dollars.
+	"""
+	rng = random.Random(seed)
+	live = {}
+	ids = []
+	position = {}
+	queues = {1: {}, -1: {}}
+	rows = []
+	next_id = [1]
+
+	def levelPrice(direction, k):
+		return mid - direction * (k + 1) * tick
+
+	def submit(direction, k):
+		order_id = next_id[0]
+		next_id[0] += 1
+		price = levelPrice(direction, k)
+		shares = rng.choice([1, 10, 50, 100, 100, 200, 500])
+		live[order_id] = [direction, price, shares]
+		position[order_id] = len(ids)
+		ids.append(order_id)
+		queues[direction].setdefault(price, deque()).append(order_id)
+		rows.append((1, order_id, shares, price, direction))
+
+	def remove(order_id):
+		direction, price, _ = live.pop(order_id)
+		last = ids.pop()
+		if last != order_id:
+			ids[position[order_id]] = last
+			position[last] = position[order_id]
+		del position[order_id]
+		queue = queues[direction][price]
+		queue.remove(order_id)
+		if not queue:
+			del queues[direction][price]
+
+	for k in range(depth):
+		for direction in (1, -1):
+			submit(direction, k)
+			submit(direction, k)
+
+	while len(rows) < num_events:
+		draw = rng.random()
+		if draw < 0.5 or not ids:
+			submit(rng.choice((1, -1)), min(int(rng.expovariate(8 / depth)), depth - 1))
+		elif draw < 0.75:
+			order_id = ids[rng.randrange(len(ids))]
+			direction, price, shares = live[order_id]
+			if shares > 1:
+				cancelled = rng.randint(1, shares - 1)
+				live[order_id][2] -= cancelled
+				rows.append((2, order_id, cancelled, price, direction))
+			else:
+				remove(order_id)
+				rows.append((3, order_id, shares, price, direction))
+		elif draw < 0.9:
+			order_id = ids[rng.randrange(len(ids))]
+			direction, price, shares = live[order_id]
+			remove(order_id)
+			rows.append((3, order_id, shares, price, direction))
+		elif draw < 0.98:
+			direction = rng.choice((1, -1))
+			if not queues[direction]:
+				continue
+			best = max(queues[direction]) if direction == 1 else min(queues[direction])
+			order_id = queues[direction][best][0]
+			shares = live[order_id][2]
+			executed = rng.randint(1, shares)
+			if executed == shares:
+				remove(order_id)
+			else:
+				live[order_id][2] -= executed
+			rows.append((4, order_id, executed, best, direction))
+		else:
+			direction = rng.choice((1, -1))
+			rows.append((5, 0, rng.randint(1, 100), levelPrice(direction, 0), direction))
+
+	rows = np.array(rows[:num_events], dtype=np.int64)
+	times = 34200.0 + np.arange(len(rows)) * 1e-3
+	return times, rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3] / 10000, rows[:, 4]
+
+def asColumns(messages):
+	"""
+	Returns the six message columns as NumPy arrays.
+	"""
+	if isinstance(messages, pd.DataFrame):
+		return tuple(messages.iloc[:, k].to_numpy() for k in range(6))
+	return messages
+
+def best(fn, repeats, min_seconds=0.2):
+	"""
+	Returns the fastest of repeats timings of one call of fn, in seconds.
+
+	As with timeit, the garbage collector is off while timing, and a call shorter than
+	min_seconds is looped until a timing lasts that long, so millisecond calls are not
+	at the mercy of timer resolution and a single scheduling hiccup.
+	"""
+	loops = 1
+	while True:
+		start = time.perf_counter()
+		for _ in range(loops):
+			fn()
+		if time.perf_counter() - start >= min_seconds or loops >= 1024:
+			break
+		loops *= 4
+	timings = []
+	enabled = gc.isenabled()
+	gc.disable()
+	try:
+		for _ in range(repeats):
+			start = time.perf_counter()
+			for _ in range(loops):
+				fn()
+			timings.append((time.perf_counter() - start) / loops)
+	finally:
+		if enabled:
+			gc.enable()
+	return min(timings)
+
+def throughput(columns, repeats, record_queues):
+	"""
+	Replay events/sec with snapshots off and with the top 5 levels (and queues if record_queues) recorded.
+	"""
+	num_events = len(columns[0])
+	bare = best(lambda: Book(snapshot_policy=sp.NoSnapshots()).replay(columns), repeats)
+	snapshots = best(lambda: Book(snapshot_policy=sp.TopLevels(5, record_queues=record_queues)).replay(columns), repeats)
+	return {'events': num_events,
+			'events_per_sec': num_events / bare,
+			'events_per_sec_snapshots': num_events / snapshots,
+			'snapshot_us_per_event': (snapshots - bare) / num_events * 1e6}
+
+def latencies(columns, repeats):
+	"""
+	Per-event latency percentiles (microseconds) for each LOBSTER event type, snapshots off.
+
+	Each processMessage call is timed on its own with the garbage collector off, so figures
+	include one timer call but no collection pauses. The replay is run repeats times on
+	fresh books and each figure is the median across runs.
+	"""
+	clock = time.perf_counter_ns
+	rows = list(zip(*[np.asarray(c).tolist() for c in columns]))
+	types = np.asarray(columns[1])
+	runs = []
+	enabled = gc.isenabled()
+	gc.disable()
+	try:
+		for _ in range(repeats):
+			process_message = Book(snapshot_policy=sp.NoSnapshots()).processMessage
+			elapsed = np.empty(len(rows), dtype=np.int64)
+			for i, message in enumerate(rows):
+				start = clock()
+				process_message(*message, i)
+				elapsed[i] = clock() - start
+			runs.append(elapsed / 1e3)
+	finally:
+		if enabled:
+			gc.enable()
+
+	result = {}
+	for event_type, name in EVENT_NAMES.items():
+		mask = types == event_type
+		if not mask.any():
+			continue
+		samples = [run[mask] for run in runs]
+		result[name] = {'count': int(mask.sum()),
+						'mean_us': float(np.median([sample.mean() for sample in samples])),
+						'max_us': float(np.median([sample.max() for sample in samples]))}
+		percentiles = np.median([np.percentile(sample, PERCENTILES) for sample in samples], axis=0)
+		for p, value in zip(PERCENTILES, percentiles):
+			result[name]['p{:g}_us'.format(p)] = float(value)
+	return result
+
+def formatting(columns, format_rows, repeats, record_queues):
+	"""
+	Cost of the DataFrame output methods after a replay recording the top 5 levels.
+
+	groupAttributes is timed on the first format_rows rows only, as it scales per row.
+	getQueues is timed only if record_queues.
+	"""
+	book = Book(snapshot_policy=sp.TopLevels(5, record_queues=record_queues))
+	book.replay(columns)
+	rows = len(book.event_times)
+	formatted = book.formatBook(0, 5)
+	bids, asks = book.splitBidsAsks(formatted.iloc[:format_rows])
+	group_rows = len(bids)
+	format_seconds = best(lambda: book.formatBook(0, 5), repeats)
+	group_seconds = best(lambda: book.groupAttributes(bids, asks), repeats)
+	result = {'rows': rows,
+			'formatBook_seconds': format_seconds,
+			'formatBook_us_per_row': format_seconds / rows * 1e6,
+			'groupAttributes_rows': group_rows,
+			'groupAttributes_seconds': group_seconds,
+			'groupAttributes_us_per_row': group_seconds / max(group_rows, 1) * 1e6}
+	if record_queues:
+		queue_seconds = best(lambda: book.getQueues(0, 5), repeats)
+		result['getQueues_seconds'] = queue_seconds
+		result['getQueues_us_per_row'] = queue_seconds / rows * 1e6
+	return result
+
+def memory(columns, record_queues):
+	"""
+	Peak traced memory (MB) of a replay with snapshots off and with top 5 snapshots (and queues if record_queues).
+	"""
+	result = {}
+	for name, policy in (('peak_mb', sp.NoSnapshots()), ('peak_mb_snapshots', sp.TopLevels(5, record_queues=record_queues))):
+		tracemalloc.start()
+		Book(snapshot_policy=policy).replay(columns)
+		result[name] = tracemalloc.get_traced_memory()[1] / 1e6
+		tracemalloc.stop()
+	return result
+
+def runDataset(columns, repeats, format_rows, record_queues):
+	"""
+	Runs every benchmark on one message stream.
+	"""
+	return {'throughput': throughput(columns, repeats, record_queues),
+			'latency': latencies(columns, repeats),
+			'formatting': formatting(columns, format_rows, repeats, record_queues),
+			'memory': memory(columns, record_queues)}
+
+def environment():
+	"""
+	Describes the machine and code version the results came from.
+	"""
+	try:
+		commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+								cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+	except OSError:
+		commit = None
+	return {'python': platform.python_version(),
+			'numpy': np.__version__,
+			'pandas': pd.__version__,
+			'platform': platform.platform(),
+			'processor': platform.processor(),
+			'commit': commit,
+			'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def flatten(results, prefix=''):
+	"""
+	Flattens nested results into {'dataset.section.metric': value} for numeric leaves.
+	"""
+	flat = {}
+	for key, value in results.items():
+		name = prefix + key
+		if isinstance(value, dict):
+			flat.update(flatten(value, name + '.'))
+		elif isinstance(value, (int, float)) and not isinstance(value, bool):
+			flat[name] = value
+	return flat
+
+def compare(results, baseline, tolerance):
+	"""
+	Compares timing and memory metrics to a baseline.
+
+	Metrics named *_per_sec are better when higher; *_us, *_seconds, *_mb and *_us_per_* are
+	better when lower. Counts are not compared, and the max, p99.9 and mean latencies are
+	listed without being gated.
+
+	Returns:
+		list: (metric, baseline, current, relative change, regressed) for every shared metric.
+	"""
+	current = flatten(results['datasets'])
+	previous = flatten(baseline['datasets'])
+	rows = []
+	for metric in sorted(current.keys() & previous.keys()):
+		leaf = metric.rsplit('.', 2)[-1] if metric.endswith('.9_us') else metric.rsplit('.', 1)[-1]
+		if 'per_sec' in leaf:
+			higher_is_better = True
+		elif leaf.endswith(('_us', '_seconds', '_mb', '_snapshots')) or '_us_' in leaf:
+			higher_is_better = False
+		else:
+			continue
+		before, after = previous[metric], current[metric]
+		if before == 0:
+			continue
+		change = (after - before) / before
+		regressed = change < -tolerance if higher_is_better else change > tolerance
+		if metric.endswith(UNGATED):
+			regressed = False
+		rows.append((metric, before, after, change, regressed))
+	return rows
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Run the order book benchmark suite.')
+	parser.add_argument('--output', default='bench_results.json')
+	parser.add_argument('--baseline', default=None)
+	parser.add_argument('--tolerance', type=float, default=0.10)
+	parser.add_argument('--depths', type=int, nargs='*', default=[100, 2000])
+	parser.add_argument('--synthetic-events', type=int, default=100000)
+	parser.add_argument('--format-rows', type=int, default=2000)
+	parser.add_argument('--repeats', type=int, default=3)
+	args = parser.parse_args()
+
+	datasets = {'aapl': asColumns(readMessages(DATA))}
+	for depth in args.depths:
+		datasets['synthetic_depth_{}'.format(depth)] = syntheticMessages(args.synthetic_events, depth)
+
+	results = {'environment': environment(), 'settings': vars(args), 'datasets': {}}
+	for name, columns in datasets.items():
+		start = time.perf_counter()
+		results['datasets'][name] = runDataset(columns, args.repeats, args.format_rows, name == 'aapl')
+		data = results['datasets'][name]
+		print('{:<24} {:>8} events {:>9.0f} events/sec ({:.0f} with snapshots)  peak {:.1f} MB  [{:.0f}s]'.format(
+			name, data['throughput']['events'], data['throughput']['events_per_sec'],
+			data['throughput']['events_per_sec_snapshots'], data['memory']['peak_mb_snapshots'],
+			time.perf_counter() - start))
+		for event, stats in data['latency'].items():
+			print('    {:<8} n={:<7} p50 {:6.1f}us  p99 {:6.1f}us  p99.9 {:7.1f}us'.format(
+				event, stats['count'], stats['p50_us'], stats['p99_us'], stats['p99.9_us']))
+
+	with open(args.output, 'w') as f:
+		json.dump(results, f, indent=2)
+	print('results written to', args.output)
+
+	if args.baseline is not None:
+		with open(args.baseline) as f:
+			baseline = json.load(f)
+		rows = compare(results, baseline, args.tolerance)
+		regressions = [row for row in rows if row[4]]
+		for metric, before, after, change, regressed in rows:
+			print('{} {:<60} {:>12.4g} -> {:<12.4g} {:+7.1%}'.format('!' if regressed else ' ', metric, before, after, change))
+		print('{} of {} metrics regressed by more than {:.0%}'.format(len(regressions), len(rows), args.tolerance))
+		sys.exit(1 if regressions else 0)
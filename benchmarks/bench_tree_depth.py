@@ -0,0 +1,70 @@
+"""
+Per-event cost of the price-level tree as the number of levels grows.
+
+Levels are inserted in a monotonic run, the worst case for an unbalanced tree,
+then a fixed mix of submissions, cancellations and level add/delete churn is
+timed at random prices. With a balanced tree the per-event cost should stay
+roughly flat from 10 to 10,000 levels.
+
+Usage:
+	python benchmarks/bench_tree_depth.py [events_per_run]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import limit_bst as tree
+from order_obj import Order
+
+LEVELS = [10, 100, 1000, 10000]
+
+def buildTree(num_levels):
+	"""
+	Builds a tree with one order per level, prices added in ascending order.
+	"""
+	side = tree.BinarySearchTree()
+	for price in range(num_levels):
+		side.handleNewOrder(Order(0, price, 100, price, 1))
+	return side
+
+def run(num_levels, num_events, seed=42):
+	"""
+	Times a mixed workload against a tree of num_levels levels.
+
+	Returns:
+		tuple: (microseconds per event, tree depth)
+	"""
+	rng = random.Random(seed)
+	side = buildTree(num_levels)
+	next_id = num_levels
+	resting = []
+
+	start = time.perf_counter()
+	for _ in range(num_events):
+		price = rng.randrange(num_levels)
+		action = rng.random()
+		if action < 0.5 or not resting:
+			order = Order(0, next_id, 100, price, 1)
+			next_id += 1
+			side.handleNewOrder(order)
+			resting.append(order)
+		elif action < 0.8:
+			side.handleCancellation(resting[rng.randrange(len(resting))], 10)
+		else:
+			# remove a whole level then re-create it, exercising delete and insert
+			side.deleteLimit(price)
+			side.handleNewOrder(Order(0, next_id, 100, price, 1))
+			next_id += 1
+	elapsed = time.perf_counter() - start
+	return elapsed / num_events * 1e6, side.depth()
+
+if __name__ == '__main__':
+	num_events = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+	print('{:>8}  {:>6}  {:>10}'.format('levels', 'depth', 'us/event'))
+	for num_levels in LEVELS:
+		us_per_event, depth = run(num_levels, num_events)
+		print('{:>8}  {:>6}  {:>10.2f}'.format(num_levels, depth, us_per_event))
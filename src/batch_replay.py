@@ -0,0 +1,196 @@
+"""
+Replays many LOBSTER message files (one per symbol-day) across a process pool.
+
+Each file gets its own Book in a worker process; its formatted book, executions
+and queue lengths are written to the output directory and a manifest of every
+file's outcome is returned and saved as manifest.json.
+
+Usage:
+	python src/batch_replay.py OUT_DIR MESSAGE_FILE [MESSAGE_FILE ...] [--workers N] [--levels L]
+"""
+
+import argparse
+import json
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from time import perf_counter
+
+from order_book import Book
+from message_reader import readMessageChunks, readMessageRows, readOrderbookRow
+import snapshot_policy as sp
+import log
+
+logger = log.get_logger('Batch Replay')
+
+def replayFile(path, out_dir, levels=5, chunk_size=500000):
+	"""
+	Replays one message file and writes its results. Runs inside a worker process.
+
+	Args:
+		path (str): LOBSTER message CSV.
+		out_dir (str): Directory results are written to.
+		levels (int): Number of book levels, and of queue lengths, recorded and written.
+		chunk_size (int): Rows per chunk when streaming the file.
+
+	Returns:
+		dict: Manifest entry with the file, status, event count, timing and output paths.
+	"""
+	name = os.path.splitext(os.path.basename(path))[0]
+	book = Book(snapshot_policy=sp.TopLevels(levels, queue_depth=levels))
+	stats = book.replayChunks(readMessageChunks(path, chunk_size=chunk_size, prefetch=0))
+
+	outputs = {'book': os.path.join(out_dir, name + '_book.csv.gz'),
+				'executions': os.path.join(out_dir, name + '_executions.csv.gz'),
+				'queues': os.path.join(out_dir, name + '_queues.csv.gz')}
+	book.formatBook(0, levels).to_csv(outputs['book'], index=False)
+	book.getAllExecutions().to_csv(outputs['executions'], index=False)
+	bid_queues, ask_queues = book.getQueues(0, levels)
+	length_columns = ['l{}'.format(k) for k in range(1, levels + 1)]
+	queue_lengths = bid_queues[['Time'] + length_columns].rename(columns=lambda c: c if c == 'Time' else 'Bid_' + c)
+	for column in length_columns:
+		queue_lengths['Ask_' + column] = ask_queues[column].to_numpy()
+	queue_lengths.to_csv(outputs['queues'], index=False)
+
+	return {'file': path, 'status': 'ok', 'events': stats['events'], 'seconds': stats['seconds'],
+			'events_per_sec': stats['events_per_sec'], 'outputs': outputs}
+
+def safeReplayFile(path, out_dir, levels, chunk_size):
+	"""
+	Wraps replayFile so a failing file becomes a manifest entry instead of an exception.
+	"""
+	try:
+		return replayFile(path, out_dir, levels, chunk_size)
+	except Exception as error:
+		return {'file': path, 'status': 'failed', 'error': repr(error), 'traceback': traceback.format_exc()}
+
+def replaySegment(message_path, orderbook_path, first, last, out_dir, levels=5):
+	"""
+	Replays messages first..last-1 of one file, seeding the book from the LOBSTER orderbook
+	row before first. Runs inside a worker process.
+
+	Args:
+		message_path (str): LOBSTER message CSV.
+		orderbook_path (str): Matching LOBSTER orderbook_N.csv.
+		first (int): First message row of the segment.
+		last (int): Message row the segment stops before.
+		out_dir (str): Directory the segment's formatted book is written to.
+		levels (int): Number of book levels recorded and written.
+
+	Returns:
+		dict: Manifest entry with the segment bounds, status, event count and output path.
+	"""
+	name = os.path.splitext(os.path.basename(message_path))[0]
+	messages = readMessageRows(message_path, first, last)
+	book = Book(snapshot_policy=sp.TopLevels(levels))
+	if first > 0:
+		book.seedFromOrderbook(readOrderbookRow(orderbook_path, first - 1), time=messages['time'].iloc[0])
+	stats = book.replay(messages, start_index=first)
+
+	output = os.path.join(out_dir, '{}_{:09d}_book.csv.gz'.format(name, first))
+	book.formatBook(0, levels).to_csv(output, index=False)
+	return {'file': message_path, 'first': first, 'last': last, 'status': 'ok', 'events': stats['events'],
+			'seconds': stats['seconds'], 'events_per_sec': stats['events_per_sec'], 'outputs': {'book': output}}
+
+def runSegments(message_path, orderbook_path, out_dir, num_messages, num_segments, workers=None, levels=5):
+	"""
+	Splits one day into contiguous message segments and replays them in parallel,
+	each seeded from the orderbook row preceding it.
+
+	Args:
+		message_path (str): LOBSTER message CSV.
+		orderbook_path (str): Matching LOBSTER orderbook_N.csv; use the deepest file available,
+			since levels beyond its depth are not seeded.
+		out_dir (str): Directory for per-segment books and manifest.json.
+		num_messages (int): Number of messages in the file.
+		num_segments (int): Number of segments to split the day into.
+		workers (int): Number of worker processes, None for one per CPU.
+		levels (int): Number of book levels recorded and written.
+
+	Returns:
+		dict: Manifest with one entry per segment, in order.
+	"""
+	os.makedirs(out_dir, exist_ok=True)
+	bounds = [round(num_messages * k / num_segments) for k in range(num_segments + 1)]
+	entries = []
+	start = perf_counter()
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		futures = [pool.submit(replaySegment, message_path, orderbook_path, first, last, out_dir, levels)
+					for first, last in zip(bounds[:-1], bounds[1:])]
+		for (first, last), future in zip(zip(bounds[:-1], bounds[1:]), futures):
+			try:
+				entries.append(future.result())
+			except Exception as error:
+				entries.append({'file': message_path, 'first': first, 'last': last, 'status': 'failed', 'error': repr(error)})
+	elapsed = perf_counter() - start
+
+	total_events = sum(e.get('events', 0) for e in entries)
+	manifest = {'segments': entries,
+				'succeeded': sum(e['status'] == 'ok' for e in entries),
+				'failed': sum(e['status'] != 'ok' for e in entries),
+				'events': total_events,
+				'seconds': elapsed,
+				'events_per_sec': total_events / elapsed if elapsed > 0 else 0}
+	with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+		json.dump(manifest, f, indent=2)
+	return manifest
+
+def runBatch(paths, out_dir, workers=None, levels=5, chunk_size=500000):
+	"""
+	Fans message files out to a process pool and collects a manifest.
+
+	A file that raises is recorded as failed without affecting the others. Progress
+	and aggregate throughput are logged at WARNING level as each file completes.
+
+	Args:
+		paths (list): Message CSV paths.
+		out_dir (str): Directory for per-file results and manifest.json.
+		workers (int): Number of worker processes, None for one per CPU.
+		levels (int): Number of book levels recorded and written.
+		chunk_size (int): Rows per chunk when streaming each file.
+
+	Returns:
+		dict: Manifest with per-file entries and batch totals.
+	"""
+	os.makedirs(out_dir, exist_ok=True)
+	entries = []
+	total_events = 0
+	start = perf_counter()
+
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		futures = {pool.submit(safeReplayFile, path, out_dir, levels, chunk_size): path for path in paths}
+		for future in as_completed(futures):
+			try:
+				entry = future.result()
+			except BrokenProcessPool as error:
+				# a worker died outright (e.g. killed for memory); its file and any still queued fail
+				entry = {'file': futures[future], 'status': 'failed', 'error': repr(error)}
+			entries.append(entry)
+			total_events += entry.get('events', 0)
+			elapsed = perf_counter() - start
+			logger.warning("[%s/%s] %s %s - %.0f events/sec overall", len(entries), len(paths),
+						entry['status'], entry['file'], total_events / elapsed if elapsed > 0 else 0)
+
+	elapsed = perf_counter() - start
+	order = {path: k for k, path in enumerate(paths)}
+	manifest = {'files': sorted(entries, key=lambda e: order[e['file']]),
+				'succeeded': sum(e['status'] == 'ok' for e in entries),
+				'failed': sum(e['status'] != 'ok' for e in entries),
+				'events': total_events,
+				'seconds': elapsed,
+				'events_per_sec': total_events / elapsed if elapsed > 0 else 0,
+				'workers': workers if workers is not None else os.cpu_count()}
+	with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+		json.dump(manifest, f, indent=2)
+	return manifest
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Replay LOBSTER message files in parallel.')
+	parser.add_argument('out_dir')
+	parser.add_argument('files', nargs='+')
+	parser.add_argument('--workers', type=int, default=None)
+	parser.add_argument('--levels', type=int, default=5)
+	args = parser.parse_args()
+	result = runBatch(args.files, args.out_dir, args.workers, args.levels)
+	print('{succeeded} ok, {failed} failed, {events} events in {seconds:.1f}s ({events_per_sec:.0f} events/sec)'.format(**result))
@@ -0,0 +1,157 @@
+from time import perf_counter_ns
+
+EVENT_NAMES = {1: 'submit', 2: 'cancel', 3: 'delete', 4: 'execute', 5: 'hidden'}
+PHASES = ['lookup', 'queue_update', 'snapshot', 'bbo_update']
+NUM_BUCKETS = 40
+
+class BookStats:
+	"""
+	Per-event timing histograms and book-shape counters collected by an instrumented Book.
+
+	Each event is split into four phases: lookup (the price-level search a submission does
+	in the tree or ladder; cancels, deletes and executions reach their level through the
+	order and have no lookup), queue_update (the rest of the handler: queue, level and
+	history updates), snapshot and bbo_update. Phase times are counted in log2 nanosecond
+	buckets, bucket b holding times in [2**(b-1), 2**b) ns, so recording is a bit_length
+	and a list increment and memory does not grow with the replay.
+
+	Attributes:
+		histograms (dict): {event type: [bucket counts per phase]}.
+		totals (dict): {event type: [total nanoseconds per phase]}.
+		events (dict): {event type: number of events}.
+		max_depth (dict): {'bid'/'ask': largest tree height seen}.
+		max_levels (dict): {'bid'/'ask': largest number of levels seen}.
+		max_queue_length (int): Most orders seen queued at one level.
+		lookup_ns (int): Lookup time accumulated for the event in progress.
+	"""
+
+	def __init__(self):
+		"""Initializes a new, empty instance of BookStats."""
+		self.histograms = {t: [[0] * NUM_BUCKETS for _ in PHASES] for t in EVENT_NAMES}
+		self.totals = {t: [0] * len(PHASES) for t in EVENT_NAMES}
+		self.events = {t: 0 for t in EVENT_NAMES}
+		self.max_depth = {'bid': 0, 'ask': 0}
+		self.max_levels = {'bid': 0, 'ask': 0}
+		self.max_queue_length = 0
+		self.lookup_ns = 0
+
+	def timeLookups(self, side):
+		"""
+		Replaces the side's getLimit with a version that adds its run time to lookup_ns.
+
+		The wrapper is set on the instance, so uninstrumented books are untouched.
+
+		Args:
+			side (BinarySearchTree): A book side, tree or price ladder.
+		"""
+		get_limit = side.getLimit
+		def timedGetLimit(limit):
+			start = perf_counter_ns()
+			level = get_limit(limit)
+			self.lookup_ns += perf_counter_ns() - start
+			return level
+		side.getLimit = timedGetLimit
+
+	def record(self, event_type, start, handled, snapped, done):
+		"""
+		Adds one event's phase times from the four clock readings taken around it.
+
+		Args:
+			event_type (int): LOBSTER event type, 1 to 5.
+			start (int): perf_counter_ns before the handler.
+			handled (int): perf_counter_ns after the handler.
+			snapped (int): perf_counter_ns after the snapshot.
+			done (int): perf_counter_ns after the BBO update.
+		"""
+		histogram = self.histograms.get(event_type)
+		if histogram is None:
+			return
+		lookup = self.lookup_ns
+		self.lookup_ns = 0
+		totals = self.totals[event_type]
+		self.events[event_type] += 1
+		for phase, elapsed in enumerate((lookup, handled - start - lookup, snapped - handled, done - snapped)):
+			if phase == 0 and event_type != 1 and not elapsed:
+				continue
+			bucket = elapsed.bit_length()
+			histogram[phase][bucket if bucket < NUM_BUCKETS else NUM_BUCKETS - 1] += 1
+			totals[phase] += elapsed
+
+	def observeShape(self, book, event_type, order_id):
+		"""
+		Updates the running maxima of tree depth, level count and queue length.
+
+		Queues only grow on submissions, so the queue length is only read for those.
+
+		Args:
+			book (Book): The book that just processed the event.
+			event_type (int): LOBSTER event type, 1 to 5.
+			order_id (int): Order ID of the event.
+		"""
+		for name, side in (('bid', book.buy), ('ask', book.sell)):
+			if side.size > self.max_levels[name]:
+				self.max_levels[name] = side.size
+			depth = side.depth()
+			if depth > self.max_depth[name]:
+				self.max_depth[name] = depth
+		if event_type == 1:
+			order = book.orders.get(order_id)
+			if order is not None and order.limit is not None and order.limit.num_orders > self.max_queue_length:
+				self.max_queue_length = order.limit.num_orders
+
+	def timings(self):
+		"""
+		Summarizes the histograms per event type and phase.
+
+		Percentiles are read off the buckets, so each is the upper edge of the bucket it
+		falls in: exact to within a factor of two.
+
+		Returns:
+			dict: {event name: {'count': n, phase: {'count', 'mean_ns', 'p50_ns', 'p99_ns',
+				'max_ns', 'buckets'}}} for event types seen at least once.
+		"""
+		summary = {}
+		for event_type, name in EVENT_NAMES.items():
+			if not self.events[event_type]:
+				continue
+			summary[name] = {'count': self.events[event_type]}
+			for phase, phase_name in enumerate(PHASES):
+				buckets = self.histograms[event_type][phase]
+				count = sum(buckets)
+				if not count:
+					continue
+				summary[name][phase_name] = {'count': count,
+					'mean_ns': self.totals[event_type][phase] / count,
+					'p50_ns': bucketPercentile(buckets, count, 0.5),
+					'p99_ns': bucketPercentile(buckets, count, 0.99),
+					'max_ns': 2 ** max(b for b, n in enumerate(buckets) if n),
+					'buckets': list(buckets)}
+		return summary
+
+
+def bucketPercentile(buckets, count, q):
+	"""
+	Upper edge in nanoseconds of the log2 bucket holding quantile q.
+	"""
+	target = q * count
+	seen = 0
+	for bucket, n in enumerate(buckets):
+		seen += n
+		if seen >= target:
+			return 2 ** bucket
+	return 2 ** (len(buckets) - 1)
+
+def queueLengths(side):
+	"""
+	Distribution of the number of orders queued per level on one side.
+
+	Args:
+		side (BinarySearchTree): A book side, tree or price ladder.
+
+	Returns:
+		dict: {orders per level: number of levels}, sorted by queue length.
+	"""
+	counts = {}
+	for level in side.inOrderTraversal():
+		counts[level.num_orders] = counts.get(level.num_orders, 0) + 1
+	return dict(sorted(counts.items()))
@@ -0,0 +1,338 @@
+"""
+asyncio front end that feeds LOBSTER messages from a TCP or Unix socket into a Book.
+
+Messages arrive either as LOBSTER CSV lines (time,type,order_id,shares,price,direction)
+or as back-to-back fixed-width records in the binary format of message_reader.py.
+Whatever has been received is decoded in one vectorized step, applied to the book,
+and BBO changes and trades are published to subscribers through bounded queues. When
+a subscriber's queue is full the handler waits for it instead of reading further,
+so a slow consumer pushes back on the socket rather than growing memory.
+
+Usage (replays a file through a local stand-in publisher and prints a summary):
+	python src/feed_handler.py MESSAGE_FILE [--binary] [--unix PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+from collections import namedtuple
+from time import perf_counter_ns
+
+import numpy as np
+
+from order_book import Book, messageLists
+from message_reader import BINARY_RECORD, BINARY_HEADER, writeBinaryMessages
+from book_stats import NUM_BUCKETS, bucketPercentile
+from stream_output import Latest
+import snapshot_policy as sp
+import log
+
+logger = log.get_logger('Feed Handler')
+
+BboUpdate = namedtuple('BboUpdate', ['index', 'time', 'bid', 'bid_size', 'offer', 'offer_size'])
+TradeUpdate = namedtuple('TradeUpdate', ['index', 'time', 'price', 'shares', 'direction', 'hidden'])
+
+class FeedHandler:
+	"""
+	Reads messages from a stream, applies them to a book and publishes BBO and trade updates.
+
+	Attributes:
+		book (Book): The book messages are applied to.
+		wire_format (str): 'csv' or 'binary'.
+		price_scale (int): Divisor applied to received prices, None to keep integer prices.
+		read_size (int): Maximum bytes read from the socket per batch.
+		subscribers (list): One bounded asyncio.Queue per subscriber.
+		events (int): Number of messages applied so far.
+		unmatched_executions (int): Visible executions received for order IDs the book does
+			not hold. The book ignores them, so no TradeUpdate is published for them.
+		last_bbo (tuple): (bid, bid size, offer, offer size) last published.
+		latency_buckets (list): log2 nanosecond histogram of receive-to-BBO-publish latency.
+	"""
+
+	def __init__(self, book, wire_format='csv', price_scale=10000, read_size=65536):
+		"""
+		Initializes a new instance of FeedHandler.
+
+		Args:
+			book (Book): The book to drive. For a long-running feed use a book created with
+				retain_history=False and NoSnapshots, see Book.
+			wire_format (str): 'csv' for LOBSTER text lines, 'binary' for BINARY_RECORD records.
+			price_scale (int): Divisor applied to received prices, None to keep integer prices.
+			read_size (int): Maximum bytes read from the socket per batch.
+
+		Raises:
+			ValueError: If wire_format is not 'csv' or 'binary'.
+		"""
+		if wire_format not in ('csv', 'binary'):
+			raise ValueError("wire_format must be 'csv' or 'binary', got {!r}".format(wire_format))
+		self.book = book
+		self.wire_format = wire_format
+		self.price_scale = price_scale
+		self.read_size = read_size
+		self.subscribers = []
+		self.events = 0
+		self.unmatched_executions = 0
+		self.executions_seen = len(book.visible_executions)
+		self.last_bbo = (None, 0, None, 0)
+		self.latency_buckets = [0] * NUM_BUCKETS
+		self.latency_total = 0
+
+	def subscribe(self, maxsize=1024):
+		"""
+		Registers a subscriber.
+
+		Args:
+			maxsize (int): Number of updates the queue holds before the feed waits on it.
+
+		Returns:
+			asyncio.Queue: Receives BboUpdate and TradeUpdate tuples, then None when the feed ends.
+		"""
+		updates = asyncio.Queue(maxsize)
+		self.subscribers.append(updates)
+		return updates
+
+	async def connect(self, host, port):
+		"""
+		Connects to a TCP publisher and runs the feed until it closes.
+
+		Returns:
+			int: Number of messages applied.
+		"""
+		reader, writer = await asyncio.open_connection(host, port)
+		try:
+			return await self.run(reader)
+		finally:
+			writer.close()
+
+	async def connectUnix(self, path):
+		"""
+		Connects to a Unix socket publisher and runs the feed until it closes.
+
+		Returns:
+			int: Number of messages applied.
+		"""
+		reader, writer = await asyncio.open_unix_connection(path)
+		try:
+			return await self.run(reader)
+		finally:
+			writer.close()
+
+	async def run(self, reader):
+		"""
+		Reads, decodes and applies messages until the stream ends, then sends None to subscribers.
+
+		Args:
+			reader (asyncio.StreamReader): The message stream.
+
+		Returns:
+			int: Number of messages applied.
+		"""
+		pending = b''
+		while True:
+			data = await reader.read(self.read_size)
+			received = perf_counter_ns()
+			if not data:
+				break
+			columns, pending = self.decode(pending + data)
+			if columns is not None:
+				await self.apply(columns, received)
+		if pending.strip():
+			logger.warning("Feed ended with %s bytes of an incomplete message", len(pending))
+		for updates in self.subscribers:
+			await updates.put(None)
+		logger.info("Feed ended after %s messages", self.events)
+		return self.events
+
+	def decode(self, data):
+		"""
+		Decodes every complete message in data.
+
+		Args:
+			data (bytes): Received bytes, starting at a message boundary.
+
+		Returns:
+			tuple: ((times, types, order_ids, shares, prices, directions) arrays or None
+				if no message is complete, leftover bytes of a partial message).
+		"""
+		if self.wire_format == 'binary':
+			complete = len(data) - len(data) % BINARY_RECORD.itemsize
+			if complete == 0:
+				return None, data
+			records = np.frombuffer(data[:complete], dtype=BINARY_RECORD)
+			prices = records['price']
+			if self.price_scale is not None:
+				prices = prices / self.price_scale
+			columns = (records['time_ns'] / 1e9, records['type'], records['order_id'],
+						records['shares'], prices, records['direction'])
+			return columns, data[complete:]
+
+		end = data.rfind(b'\n') + 1
+		if end == 0:
+			return None, data
+		fields = np.array(data[:end].replace(b'\r', b'').replace(b'\n', b',').split(b',')[:-1], dtype=np.float64).reshape(-1, 6)
+		prices = fields[:, 4]
+		if self.price_scale is not None:
+			prices = prices / self.price_scale
+		columns = (fields[:, 0], fields[:, 1].astype(np.int64), fields[:, 2].astype(np.int64),
+					fields[:, 3].astype(np.int64), prices, fields[:, 5].astype(np.int64))
+		return columns, data[end:]
+
+	async def apply(self, columns, received):
+		"""
+		Applies a decoded batch to the book and publishes the updates it causes.
+
+		Args:
+			columns (tuple): Six message arrays as returned by decode.
+			received (int): perf_counter_ns when the batch's last bytes were read.
+		"""
+		times, types, order_ids, shares, prices, directions = messageLists(columns)
+		book = self.book
+		process_message = book.processMessage
+		for i, message in enumerate(zip(times, types, order_ids, shares, prices, directions), self.events):
+			process_message(*message, i)
+			event_type = message[1]
+			if event_type == 4:
+				execution = self.appliedExecution()
+				if execution is not None:
+					# price and shares as the book traded them, e.g. capped at a seeded placeholder's size
+					await self.publish(TradeUpdate(i, message[0], execution[2], execution[3], execution[4], False))
+				else:
+					self.unmatched_executions += 1
+			elif event_type == 5:
+				await self.publish(TradeUpdate(i, message[0], message[4], message[3], message[5], True))
+
+			best_bid = book.buy.maxLimit()
+			best_offer = book.sell.minLimit()
+			bbo = (best_bid.limit_price if best_bid is not None else None,
+					best_bid.total_volume if best_bid is not None else 0,
+					best_offer.limit_price if best_offer is not None else None,
+					best_offer.total_volume if best_offer is not None else 0)
+			if bbo != self.last_bbo:
+				self.last_bbo = bbo
+				await self.publish(BboUpdate(i, message[0], *bbo))
+				latency = perf_counter_ns() - received
+				self.latency_buckets[min(latency.bit_length(), NUM_BUCKETS - 1)] += 1
+				self.latency_total += latency
+		self.events += len(times)
+
+	def appliedExecution(self):
+		"""
+		Gets the visible execution the last message applied to the book.
+
+		Returns:
+			list: [time, order_id, price, shares, direction] as recorded by the book, None if
+				the message executed nothing (an order ID the book does not hold).
+		"""
+		executions = self.book.visible_executions
+		if isinstance(executions, Latest):
+			item = executions.take()
+			return None if item is None else item[0]
+		if len(executions) > self.executions_seen:
+			self.executions_seen = len(executions)
+			return executions[-1]
+		return None
+
+	async def publish(self, update):
+		"""
+		Hands an update to every subscriber, waiting on any whose queue is full.
+		"""
+		for updates in self.subscribers:
+			if updates.full():
+				await updates.put(update)
+			else:
+				updates.put_nowait(update)
+
+	def latency(self):
+		"""
+		Summarizes receive-to-BBO-publish latency.
+
+		Percentiles are the upper edge of the log2 bucket they fall in.
+
+		Returns:
+			dict: Count, mean, p50, p99 and max in nanoseconds, and the raw buckets.
+		"""
+		count = sum(self.latency_buckets)
+		if count == 0:
+			return {'count': 0}
+		return {'count': count,
+				'mean_ns': self.latency_total / count,
+				'p50_ns': bucketPercentile(self.latency_buckets, count, 0.5),
+				'p99_ns': bucketPercentile(self.latency_buckets, count, 0.99),
+				'max_ns': 2 ** max(b for b, n in enumerate(self.latency_buckets) if n),
+				'buckets': list(self.latency_buckets)}
+
+
+async def serveMessages(path, host='127.0.0.1', port=0, unix_path=None, binary=False, chunk_size=65536):
+	"""
+	Local stand-in publisher: sends a message file to every client that connects, then closes.
+
+	Args:
+		path (str): LOBSTER message CSV, or a file written by writeBinaryMessages if binary.
+		host (str): Interface to listen on for TCP.
+		port (int): TCP port, 0 to pick a free one.
+		unix_path (str): If given, listen on this Unix socket instead of TCP.
+		binary (bool): Send the binary records (the file header is skipped).
+		chunk_size (int): Bytes written per send.
+
+	Returns:
+		asyncio.Server: The running server.
+	"""
+	async def send(reader, writer):
+		with open(path, 'rb') as f:
+			if binary:
+				f.seek(BINARY_HEADER.itemsize)
+			while True:
+				data = f.read(chunk_size)
+				if not data:
+					break
+				writer.write(data)
+				await writer.drain()
+		writer.close()
+
+	if unix_path is not None:
+		return await asyncio.start_unix_server(send, unix_path)
+	return await asyncio.start_server(send, host, port)
+
+async def main(message_file, binary, unix_path):
+	"""
+	Replays a file through the stand-in publisher and a FeedHandler, returning a summary.
+	"""
+	path = message_file
+	if binary:
+		path = os.path.join(tempfile.mkdtemp(), 'messages.bin')
+		writeBinaryMessages(message_file, path)
+	server = await serveMessages(path, unix_path=unix_path, binary=binary)
+	book = Book(snapshot_policy=sp.NoSnapshots(), retain_history=False)
+	handler = FeedHandler(book, wire_format='binary' if binary else 'csv')
+	updates = handler.subscribe()
+	counts = {'bbo': 0, 'trade': 0}
+
+	async def consume():
+		while True:
+			update = await updates.get()
+			if update is None:
+				return
+			counts['bbo' if isinstance(update, BboUpdate) else 'trade'] += 1
+
+	consumer = asyncio.ensure_future(consume())
+	if unix_path is not None:
+		events = await handler.connectUnix(unix_path)
+	else:
+		events = await handler.connect(*server.sockets[0].getsockname()[:2])
+	await consumer
+	server.close()
+	await server.wait_closed()
+	latency = handler.latency()
+	latency.pop('buckets', None)
+	return {'events': events, 'orders_held': len(book.orders), 'bbo_updates': counts['bbo'], 'trades': counts['trade'],
+			'unmatched_executions': handler.unmatched_executions, 'latency': latency}
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Replay a LOBSTER message file through the asyncio feed handler.')
+	parser.add_argument('message_file')
+	parser.add_argument('--binary', action='store_true')
+	parser.add_argument('--unix', default=None)
+	args = parser.parse_args()
+	print(json.dumps(asyncio.run(main(args.message_file, args.binary, args.unix)), indent=2))
@@ -4,7 +4,7 @@
 # here we use the Order class as the node itself
 
 from order_obj import Order
-import log
+from queue_index import QueueIndex
 
 class LinkedList:
 	"""
@@ -13,82 +13,107 @@ class LinkedList:
 	Attributes:
 		head (Order): The first order in the linked list.
 		tail (Order): The last order in the linked list.
+		index (QueueIndex): Orders and shares by arrival slot, for queue position queries.
 	"""
+	__slots__ = ('head', 'tail', 'index')
 
 	def __init__(self):
 		"""Initializes a new instance of LinkedList."""
-		self.logger = log.get_logger('Level Linked List')
-
 		self.head = None
 		self.tail = None
+		self.index = QueueIndex()
 
 	def addOrder(self, new_order):
 		"""
-		Adds a new order to the linked list.
+		Appends a new order to the back of the queue in O(1) using the tail pointer.
 
 		Args:
 			new_order (Order): The order to be added.
 		"""
-		if self.head is None:
+		if self.index.full():
+			self.reindex()
+		new_order.slot = self.index.add(new_order.shares)
+		if self.tail is None:
 			self.head = new_order
 			self.tail = new_order
-			self.logger.info("${} limit created, ID: {} is head".format(new_order.price, new_order.id))
-			return
-		elif self.head.next is None:
-			self.head.next = new_order
-			self.tail = new_order
-			self.logger.info("${} has {} as head, {} is 2nd in the queue".format(new_order.price, self.head.id, new_order.id))
 			return
-		else:
-			current_node = self.head
-			while current_node.next:
-				current_node = current_node.next
-			current_node.next = new_order
-			new_order.prev = current_node
-			self.tail = new_order
-			self.logger.info("${} has added ID {} to the back of the queue".format(new_order.price, new_order.id))
-			return 
-  
+		new_order.prev = self.tail
+		self.tail.next = new_order
+		self.tail = new_order
+
 	def deleteOrder(self, order_to_delete):
 		"""
-		Deletes an order from the linked list.
+		Unlinks an order from the queue in O(1).
 
 		Args:
 			order_to_delete (Order): The order to be deleted.
 		"""
 		if self.head is None or order_to_delete is None:
 			return
-		
-		if self.head.id == order_to_delete.id:
+		self.index.remove(order_to_delete.slot)
+
+		if order_to_delete.prev is None:
 			self.head = order_to_delete.next
+		else:
+			order_to_delete.prev.next = order_to_delete.next
 
-		if order_to_delete.next is not None:
+		if order_to_delete.next is None:
+			self.tail = order_to_delete.prev
+		else:
 			order_to_delete.next.prev = order_to_delete.prev
 
-		if order_to_delete.prev is not None:
-			order_to_delete.prev.next = order_to_delete.next
-		
-		self.logger.info("Order {} deleted from ${} queue".format(order_to_delete.id, order_to_delete.price))
+		order_to_delete.prev = None
+		order_to_delete.next = None
 
-	def getOrderqueue(self, head_order):
+	def reduceShares(self, order, shares):
+		"""
+		Records a partial cancel or execution of a queued order in the index.
+
+		Args:
+			order (Order): The queued order.
+			shares (int): Shares removed from it.
+		"""
+		self.index.reduce(order.slot, shares)
+
+	def position(self, order):
+		"""
+		Gets the number of orders and shares ahead of a queued order in O(log n).
+
+		Args:
+			order (Order): The queued order.
+
+		Returns:
+			tuple: (orders ahead, shares ahead), (0, 0) at the front of the queue.
+		"""
+		return self.index.ahead(order.slot)
+
+	def reindex(self):
+		"""
+		Renumbers the queued orders into fresh slots once the index has run out.
+		"""
+		values = self.index.values
+		shares = []
+		node = self.head
+		while node is not None:
+			shares.append(values[node.slot])
+			node.slot = len(shares) - 1
+			node = node.next
+		self.index.rebuild(shares)
+
+	def getOrderqueue(self):
 		"""
 		Itterates through the order queue and appends data to a list
 
 		Returns:
-			List of orders
+			List of orders, a single [id, price, shares] if only one order is queued
 		"""
-		self.head = head_order
-		orders = []
 		if self.head is None:
 			return
 		elif self.head.next is None:
 			return [self.head.id, self.head.price, self.head.shares]
-		else:
-			self.temp = self.head
-			while self.temp is not None:
-				orders.append([self.temp.id, self.temp.price, self.temp.shares])
-				self.temp = self.head.next
-				self.head = self.temp
-			return orders
-
-
+		orders = []
+		node = self.head
+		while node is not None:
+			orders.append([node.id, node.price, node.shares])
+			node = node.next
+		return orders
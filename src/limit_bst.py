@@ -2,96 +2,40 @@ import level_linked_list as ll
 from order_obj import Order
 import log
 
-class BinarySearchTree:
+logger = log.get_logger('Limit BST')
+
+class Limit:
 	"""
-	Represents a binary search tree used in a limit order book.
+	Represents a single price level (node) in the limit tree.
 
 	Attributes:
-		limit_price (float): The price of the order.
+		limit_price (float): The price of the level.
 		num_orders (int): Number of orders at this limit.
 		total_volume (int): Total volume at this limit.
-		left_child (BinarySearchTree): Left child node in the binary tree.
-		right_child (BinarySearchTree): Right child node in the binary tree.
-		parent (BinarySearchTree): Parent node in the binary tree.
+		left_child (Limit): Left child node in the tree.
+		right_child (Limit): Right child node in the tree.
+		parent (Limit): Parent node in the tree.
+		height (int): Height of the subtree rooted at this node, used for balancing.
 		order_queue (LinkedList): Linked list to store orders at this limit.
 	"""
-	
-	def __init__(self, order_price=None):
+	__slots__ = ('limit_price', 'num_orders', 'total_volume', 'left_child', 'right_child', 'parent', 'height', 'order_queue')
+
+	def __init__(self, limit_price):
 		"""
-		Initializes a new instance of BinarySearchTree.
+		Initializes a new instance of Limit.
 
 		Args:
-			order_price (float): The price of the order.
+			limit_price (float): The price of the level.
 		"""
-		self.logger = log.get_logger('Limit BST')
-
-		self.limit_price = order_price
+		self.limit_price = limit_price
 		self.num_orders = 0
 		self.total_volume = 0
 		self.left_child = None
 		self.right_child = None
 		self.parent = None
+		self.height = 1
 		self.order_queue = ll.LinkedList()
 
-### Event handlers
-
-	def handleNewOrder(self, new_order):
-		"""
-		Handles a new order submission.
-
-		Args:
-			new_order (Order): The order object to be added.
-		"""
-		if self.checkLimit(new_order.price):
-			limit_to_add_order = self.getLimit(new_order.price)
-			limit_to_add_order.addOrderHelper(new_order)
-		else:
-			self.addLimit(new_order)
-
-	def handleCancellation(self, order_to_cancel, shares_to_subtract_from_limit_total):
-		"""
-		Handles cancellation of an existing order.
-
-		Args:
-			order_to_cancel (Order): The order object to be canceled.
-			shares_to_subtract_from_limit_total (int): Number of shares to cancel.
-		"""
-		if self.checkLimit(order_to_cancel.price):
-			limit_to_cancel_order = self.getLimit(order_to_cancel.price)
-			limit_to_cancel_order.cancelOrderHelper(shares_to_subtract_from_limit_total)
-		else:
-			self.logger.info("Limit {} does not exist".format(order_to_cancel.price))
-
-	def handleDeletion(self, order_to_delete):
-		"""
-		Handles deletion of an existing order.
-
-		Args:
-			order_to_delete (Order): The order object to be deleted.
-		"""
-		if self.checkLimit(order_to_delete.price):
-			limit_to_delete_order = self.getLimit(order_to_delete.price)
-			limit_to_delete_order.deleteOrderHelper(order_to_delete)
-			if (limit_to_delete_order.total_volume == 0) & (limit_to_delete_order.num_orders == 0):
-				self.deleteLimit(limit_to_delete_order.limit_price)
-				self.logger.info("No orders at limit {}: limit deleted from book".format(limit_to_delete_order.limit_price))
-		else:
-			self.logger.info("Limit {} does not exist".format(order_to_delete.price))
-
-	def handleVisibleExecution(self, order_to_execute, shares_executed):
-		"""
-		Handles execution of an order.
-
-		Args:
-			order_to_execute (Order): The order object to be executed.
-			shares_executed (int): Number of shares to execute.
-		"""
-		if self.checkLimit(order_to_execute.price):
-			limit_to_execute_order = self.getLimit(order_to_execute.price)
-			limit_to_execute_order.executeOrderHelper(shares_executed)
-		else:
-			self.logger.info("Limit {} does not exist".format(order_to_execute.price))
-
 ### Helper Functions
 
 	def addOrderHelper(self, new_order):
@@ -102,16 +46,19 @@ class BinarySearchTree:
 			new_order (Order): The order object to be added.
 		"""
 		self.addOrderToQueue(new_order)
+		new_order.limit = self
 		self.increaseVolumeAtLimit(new_order.shares)
 		self.increaseNumOrdersAtLimit()
 
-	def cancelOrderHelper(self, shares_to_cancel):
+	def cancelOrderHelper(self, order_to_cancel, shares_to_cancel):
 		"""
 		Helper function to cancel an order.
 
 		Args:
+			order_to_cancel (Order): The order being partially canceled.
 			shares_to_cancel (int): Number of shares to cancel.
 		"""
+		self.order_queue.reduceShares(order_to_cancel, shares_to_cancel)
 		self.reduceVolumeAtLimit(shares_to_cancel)
 
 	def deleteOrderHelper(self, order_to_delete):
@@ -122,80 +69,23 @@ class BinarySearchTree:
 			order_to_delete (Order): The order object to be deleted.
 		"""
 		self.deleteOrderFromQueue(order_to_delete)
+		order_to_delete.limit = None
 		self.reduceVolumeAtLimit(order_to_delete.shares)
 		self.reduceNumOrdersAtLimit()
 
-	def executeOrderHelper(self, shares_to_execute):
+	def executeOrderHelper(self, order_to_execute, shares_to_execute):
 		"""
 		Helper function to execute an order.
 
 		Args:
+			order_to_execute (Order): The order being executed.
 			shares_to_execute (int): Number of shares to execute.
 		"""
+		self.order_queue.reduceShares(order_to_execute, shares_to_execute)
 		self.reduceVolumeAtLimit(shares_to_execute)
 
 ### Attribute change functions
 
-	def addLimit(self, new_order):
-		"""
-		Adds a new limit to the tree and sets the given order at the head of the queue.
-
-		Args:
-			new_order (Order): The order object to be added.
-		"""
-		if new_order.price < self.limit_price:
-			if self.left_child is not None:
-				self.left_child.addLimit(new_order)
-			else:
-				self.logger.info("Creating new limit")
-				self.left_child = BinarySearchTree(new_order.price)
-				self.left_child.addOrderHelper(new_order)
-				self.left_child.parent = self
-				return
-		if new_order.price > self.limit_price:
-			if self.right_child is not None:
-				self.right_child.addLimit(new_order)
-			else:
-				self.logger.info("Creating new limit")
-				self.right_child = BinarySearchTree(new_order.price)
-				self.right_child.addOrderHelper(new_order)
-				self.right_child.parent = self
-				return
-			
-	def deleteLimit(self, limit):
-		"""
-		Deletes a limit from the tree.
-
-		Args:
-			limit (float): The price of the limit to be deleted.
-		"""
-		# Find the node in the left subtree if the limit is less than root value
-		if limit < self.limit_price:
-			self.left_child = self.left_child.deleteLimit(limit)
-		# Find the node in the right subtree if the limit is greater than root value
-		elif limit > self.limit_price:
-			self.right_child = self.right_child.deleteLimit(limit)
-		# Delete the node if root.value == limit
-		else: 
-			# Case 1: Node has no child or only one child
-			if not self.right_child:
-				return self.left_child
-			elif not self.left_child:
-				return self.right_child
-			# Case 2: Node has two children
-			# Find the in-order predecessor (maximum value in the left subtree)
-			temp_val = self.right_child
-			while temp_val.left_child:
-				temp_val = temp_val.left_child
-			# Update the current node val with the successor val
-			self.limit_price = temp_val.limit_price
-			self.num_orders = temp_val.num_orders
-			self.total_volume = temp_val.total_volume
-			self.order_queue = temp_val.order_queue
-			# Delete the in-order predecessor from the left subtree
-			self.right_child = self.right_child.deleteLimit(temp_val.limit_price)
-		return self
-
 	def addOrderToQueue(self, new_order):
 		"""
 		Adds an order to the queue.
@@ -205,7 +95,7 @@ class BinarySearchTree:
 		"""
 		self.order_queue.addOrder(new_order)
 		return
-	
+
 	def deleteOrderFromQueue(self, order_to_delete):
 		"""
 		Deletes an order from the queue.
@@ -215,7 +105,7 @@ class BinarySearchTree:
 		"""
 		self.order_queue.deleteOrder(order_to_delete)
 		return
-	
+
 	def reduceVolumeAtLimit(self, shares):
 		"""
 		Reduces the total volume at the limit.
@@ -224,8 +114,7 @@ class BinarySearchTree:
 			shares (int): Number of shares to reduce.
 		"""
 		self.total_volume = self.total_volume - shares
-		self.logger.info("Total vol at {} has been reduced by {}".format(self.limit_price, shares))
-	
+
 	def increaseVolumeAtLimit(self, shares):
 		"""
 		Increases the total volume at the limit.
@@ -234,17 +123,282 @@ class BinarySearchTree:
 			shares (int): Number of shares to increase.
 		"""
 		self.total_volume = self.total_volume + shares
-		self.logger.info("Total vol at {} has been increased by {}".format(self.limit_price, shares))
 
 	def reduceNumOrdersAtLimit(self):
 		"""Reduces the number of orders at the limit by 1."""
 		self.num_orders = self.num_orders - 1
-		self.logger.info("Num orders at {} has been reduced by 1".format(self.limit_price))
 
 	def increaseNumOrdersAtLimit(self):
 		"""Increases the number of orders at the limit by 1."""
 		self.num_orders = self.num_orders + 1
-		self.logger.info("Num orders at {} has been increased by 1".format(self.limit_price))
+
+
+class BinarySearchTree:
+	"""
+	Represents one side of a limit order book as a self-balancing (AVL) binary search tree
+	of Limit nodes keyed on price.
+
+	All lookups, inserts and deletes are iterative and O(log n) in the number of levels,
+	so trending markets that add prices in monotonic runs no longer degrade the tree.
+	The lowest and highest levels are tracked as they are inserted and deleted so the
+	best price on either side is available without a traversal.
+
+	Attributes:
+		root (Limit): Root node of the tree, None when the side is empty.
+		size (int): Number of levels currently in the tree.
+		min_limit (Limit): Lowest priced level in the tree.
+		max_limit (Limit): Highest priced level in the tree.
+	"""
+
+	def __init__(self):
+		"""Initializes a new, empty instance of BinarySearchTree."""
+		self.root = None
+		self.size = 0
+		self.min_limit = None
+		self.max_limit = None
+
+### Event handlers
+
+	def handleNewOrder(self, new_order):
+		"""
+		Handles a new order submission.
+
+		Args:
+			new_order (Order): The order object to be added.
+		"""
+		limit_to_add_order = self.getLimit(new_order.price)
+		if limit_to_add_order is not None:
+			limit_to_add_order.addOrderHelper(new_order)
+		else:
+			self.addLimit(new_order)
+
+	def handleCancellation(self, order_to_cancel, shares_to_subtract_from_limit_total):
+		"""
+		Handles cancellation of an existing order.
+
+		The order carries a reference to its level so the tree is not searched.
+
+		Args:
+			order_to_cancel (Order): The order object to be canceled.
+			shares_to_subtract_from_limit_total (int): Number of shares to cancel.
+		"""
+		limit_to_cancel_order = order_to_cancel.limit
+		if limit_to_cancel_order is not None:
+			limit_to_cancel_order.cancelOrderHelper(order_to_cancel, shares_to_subtract_from_limit_total)
+		else:
+			logger.info("Limit %s does not exist", order_to_cancel.price)
+
+	def handleDeletion(self, order_to_delete):
+		"""
+		Handles deletion of an existing order.
+
+		The order carries a reference to its level so the tree is only touched
+		if the level is left empty and has to be removed.
+
+		Args:
+			order_to_delete (Order): The order object to be deleted.
+		"""
+		limit_to_delete_order = order_to_delete.limit
+		if limit_to_delete_order is not None:
+			limit_to_delete_order.deleteOrderHelper(order_to_delete)
+			if (limit_to_delete_order.total_volume == 0) & (limit_to_delete_order.num_orders == 0):
+				self.removeLimit(limit_to_delete_order)
+		else:
+			logger.info("Limit %s does not exist", order_to_delete.price)
+
+	def handleVisibleExecution(self, order_to_execute, shares_executed):
+		"""
+		Handles execution of an order.
+
+		The order carries a reference to its level so the tree is not searched.
+
+		Args:
+			order_to_execute (Order): The order object to be executed.
+			shares_executed (int): Number of shares to execute.
+		"""
+		limit_to_execute_order = order_to_execute.limit
+		if limit_to_execute_order is not None:
+			limit_to_execute_order.executeOrderHelper(order_to_execute, shares_executed)
+		else:
+			logger.info("Limit %s does not exist", order_to_execute.price)
+
+### Attribute change functions
+
+	def addLimit(self, new_order):
+		"""
+		Adds a new limit to the tree and sets the given order at the head of the queue.
+
+		Args:
+			new_order (Order): The order object to be added.
+
+		Returns:
+			Limit: The newly created limit, or the existing one if the price is already present.
+		"""
+		price = new_order.price
+		parent = None
+		node = self.root
+		while node is not None:
+			parent = node
+			if price < node.limit_price:
+				node = node.left_child
+			elif price > node.limit_price:
+				node = node.right_child
+			else:
+				node.addOrderHelper(new_order)
+				return node
+
+		new_limit = Limit(price)
+		new_limit.addOrderHelper(new_order)
+		new_limit.parent = parent
+		if parent is None:
+			self.root = new_limit
+		elif price < parent.limit_price:
+			parent.left_child = new_limit
+		else:
+			parent.right_child = new_limit
+		if self.min_limit is None or price < self.min_limit.limit_price:
+			self.min_limit = new_limit
+		if self.max_limit is None or price > self.max_limit.limit_price:
+			self.max_limit = new_limit
+		self.size += 1
+		self.rebalance(parent)
+		return new_limit
+
+	def deleteLimit(self, limit):
+		"""
+		Deletes a limit from the tree.
+
+		Nodes are relinked rather than having their contents copied, so the level
+		references held by resting orders stay valid after the delete.
+
+		Args:
+			limit (float): The price of the limit to be deleted.
+		"""
+		node = self.getLimit(limit)
+		if node is not None:
+			self.removeLimit(node)
+
+	def removeLimit(self, node):
+		"""
+		Unlinks the given level from the tree.
+
+		Args:
+			node (Limit): The level to be removed.
+		"""
+		if node is self.min_limit:
+			self.min_limit = self.successor(node)
+		if node is self.max_limit:
+			self.max_limit = self.predecessor(node)
+
+		if node.left_child is None:
+			rebalance_from = node.parent
+			self.transplant(node, node.right_child)
+		elif node.right_child is None:
+			rebalance_from = node.parent
+			self.transplant(node, node.left_child)
+		else:
+			# Node has two children: splice in the in-order successor
+			successor = node.right_child
+			while successor.left_child is not None:
+				successor = successor.left_child
+			if successor.parent is not node:
+				rebalance_from = successor.parent
+				self.transplant(successor, successor.right_child)
+				successor.right_child = node.right_child
+				successor.right_child.parent = successor
+			else:
+				rebalance_from = successor
+			self.transplant(node, successor)
+			successor.left_child = node.left_child
+			successor.left_child.parent = successor
+			successor.height = node.height
+
+		node.left_child = None
+		node.right_child = None
+		node.parent = None
+		self.size -= 1
+		self.rebalance(rebalance_from)
+
+### Balancing functions
+
+	def transplant(self, old, new):
+		"""
+		Replaces the subtree rooted at old with the subtree rooted at new.
+
+		Args:
+			old (Limit): The node being replaced.
+			new (Limit): The replacement node, may be None.
+		"""
+		if old.parent is None:
+			self.root = new
+		elif old is old.parent.left_child:
+			old.parent.left_child = new
+		else:
+			old.parent.right_child = new
+		if new is not None:
+			new.parent = old.parent
+
+	def rotateLeft(self, node):
+		"""
+		Rotates the subtree rooted at node to the left.
+
+		Args:
+			node (Limit): Root of the subtree to rotate.
+
+		Returns:
+			Limit: The new root of the subtree.
+		"""
+		pivot = node.right_child
+		node.right_child = pivot.left_child
+		if pivot.left_child is not None:
+			pivot.left_child.parent = node
+		self.transplant(node, pivot)
+		pivot.left_child = node
+		node.parent = pivot
+		updateHeight(node)
+		updateHeight(pivot)
+		return pivot
+
+	def rotateRight(self, node):
+		"""
+		Rotates the subtree rooted at node to the right.
+
+		Args:
+			node (Limit): Root of the subtree to rotate.
+
+		Returns:
+			Limit: The new root of the subtree.
+		"""
+		pivot = node.left_child
+		node.left_child = pivot.right_child
+		if pivot.right_child is not None:
+			pivot.right_child.parent = node
+		self.transplant(node, pivot)
+		pivot.right_child = node
+		node.parent = pivot
+		updateHeight(node)
+		updateHeight(pivot)
+		return pivot
+
+	def rebalance(self, node):
+		"""
+		Walks from node up to the root restoring heights and the AVL balance condition.
+
+		Args:
+			node (Limit): The lowest node whose subtree changed, may be None.
+		"""
+		while node is not None:
+			updateHeight(node)
+			balance = height(node.left_child) - height(node.right_child)
+			if balance > 1:
+				if height(node.left_child.left_child) < height(node.left_child.right_child):
+					self.rotateLeft(node.left_child)
+				node = self.rotateRight(node)
+			elif balance < -1:
+				if height(node.right_child.right_child) < height(node.right_child.left_child):
+					self.rotateRight(node.right_child)
+				node = self.rotateLeft(node)
+			node = node.parent
 
 ### Misc Functions
 
@@ -258,17 +412,12 @@ class BinarySearchTree:
 		Returns:
 			bool: True if the limit exists, False otherwise.
 		"""
-		if limit == self.limit_price:
-			self.logger.info('limit {} exists'.format(limit))
+		if self.getLimit(limit) is not None:
+			logger.info('limit %s exists', limit)
 			return True
-		if (limit < self.limit_price) & (self.left_child is not None):
-			return self.left_child.checkLimit(limit)
-		elif (limit > self.limit_price) & (self.right_child is not None):
-			return self.right_child.checkLimit(limit)
-		else:
-			self.logger.info('limit {} does not exist'.format(limit))
-			return False
-		
+		logger.info('limit %s does not exist', limit)
+		return False
+
 	def getLimit(self, limit):
 		"""
 		Gets the limit object for the given limit price.
@@ -277,29 +426,179 @@ class BinarySearchTree:
 			limit (float): The price of the limit to be retrieved.
 
 		Returns:
-			BinarySearchTree: The limit object if found, None otherwise.
-		"""
-		if limit == self.limit_price:
-			return self
-		if (limit < self.limit_price) & (self.left_child is not None):
-			return self.left_child.getLimit(limit)
-		elif (limit > self.limit_price) & (self.right_child is not None):
-			return self.right_child.getLimit(limit)
-		else:
-			return False
+			Limit: The limit object if found, None otherwise.
+		"""
+		node = self.root
+		while node is not None:
+			if limit < node.limit_price:
+				node = node.left_child
+			elif limit > node.limit_price:
+				node = node.right_child
+			else:
+				return node
+		return None
+
+	def ceilingLimit(self, limit):
+		"""
+		Gets the lowest level priced at or above the given price.
+
+		Args:
+			limit (float): The price to search from.
+
+		Returns:
+			Limit: The matching level, None if every level is below the price.
+		"""
+		found = None
+		node = self.root
+		while node is not None:
+			if limit < node.limit_price:
+				found = node
+				node = node.left_child
+			elif limit > node.limit_price:
+				node = node.right_child
+			else:
+				return node
+		return found
+
+	def successor(self, node):
+		"""
+		Gets the next level above the given one.
+
+		Args:
+			node (Limit): The level to step from.
+
+		Returns:
+			Limit: The next higher level, None if node is the highest.
+		"""
+		if node.right_child is not None:
+			node = node.right_child
+			while node.left_child is not None:
+				node = node.left_child
+			return node
+		parent = node.parent
+		while parent is not None and node is parent.right_child:
+			node = parent
+			parent = parent.parent
+		return parent
+
+	def predecessor(self, node):
+		"""
+		Gets the next level below the given one.
+
+		Args:
+			node (Limit): The level to step from.
+
+		Returns:
+			Limit: The next lower level, None if node is the lowest.
+		"""
+		if node.left_child is not None:
+			node = node.left_child
+			while node.right_child is not None:
+				node = node.right_child
+			return node
+		parent = node.parent
+		while parent is not None and node is parent.left_child:
+			node = parent
+			parent = parent.parent
+		return parent
+
+	def minLimit(self):
+		"""
+		Gets the lowest level holding at least one order.
+
+		Returns:
+			Limit: The lowest non-empty level, None if there is none.
+		"""
+		node = self.min_limit
+		while node is not None and node.num_orders == 0:
+			node = self.successor(node)
+		return node
+
+	def maxLimit(self):
+		"""
+		Gets the highest level holding at least one order.
+
+		Returns:
+			Limit: The highest non-empty level, None if there is none.
+		"""
+		node = self.max_limit
+		while node is not None and node.num_orders == 0:
+			node = self.predecessor(node)
+		return node
+
+	def lowestLimits(self, x):
+		"""
+		Gets up to x non-empty levels walking up from the lowest price.
+
+		Args:
+			x (int): The number of levels to retrieve.
+
+		Returns:
+			list: Levels in ascending price order.
+		"""
+		elements = []
+		node = self.min_limit
+		while node is not None and len(elements) < x:
+			if node.num_orders != 0:
+				elements.append(node)
+			node = self.successor(node)
+		return elements
+
+	def highestLimits(self, x):
+		"""
+		Gets up to x non-empty levels walking down from the highest price.
+
+		Args:
+			x (int): The number of levels to retrieve.
+
+		Returns:
+			list: Levels in descending price order.
+		"""
+		elements = []
+		node = self.max_limit
+		while node is not None and len(elements) < x:
+			if node.num_orders != 0:
+				elements.append(node)
+			node = self.predecessor(node)
+		return elements
+
+	def depth(self):
+		"""
+		Returns the height of the tree, 0 when empty.
+		"""
+		return height(self.root)
 
 	def inOrderTraversal(self):
 		"""
 		Performs in-order traversal of the binary tree.
 
 		Returns:
-			list: A list containing nodes in in-order traversal.
+			list: A list containing non-empty nodes in ascending price order.
 		"""
 		elements = []
-		if self.left_child:
-			elements += self.left_child.inOrderTraversal()
-		if self.num_orders != 0:
-			elements.append(self)
-		if self.right_child:
-			elements += self.right_child.inOrderTraversal()
+		stack = []
+		node = self.root
+		while stack or node is not None:
+			while node is not None:
+				stack.append(node)
+				node = node.left_child
+			node = stack.pop()
+			if node.num_orders != 0:
+				elements.append(node)
+			node = node.right_child
 		return elements
+
+
+def height(node):
+	"""
+	Height of the subtree rooted at node, 0 for None.
+	"""
+	return node.height if node is not None else 0
+
+def updateHeight(node):
+	"""
+	Recomputes the cached height of node from its children.
+	"""
+	left = node.left_child.height if node.left_child is not None else 0
+	right = node.right_child.height if node.right_child is not None else 0
+	node.height = (left if left > right else right) + 1
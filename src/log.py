@@ -1,15 +1,142 @@
 # taken from https://stackoverflow.com/questions/45701478/log-from-multiple-python-files-into-single-log-file-in-python#:~:text=Say%20you%20have%20two%20python,your%20master%20file%20master.py%20.&text=Then%20executing%20master.py%20will,py%20and%20py2.py%20).
+#
+# Handlers are configured once per process and once per logger name, so creating many
+# book objects does not pile up handlers. Hot-path log calls use %-style arguments so no
+# string is formatted unless the level is enabled.
 
 import logging
+import queue
+import threading
+
+LOG_FORMAT = '%(asctime)s  %(name)8s  %(levelname)5s  %(message)s'
+
+_configured = False
+_named = set()
+_lock = threading.Lock()
 
 def get_logger(name):
-    log_format = '%(asctime)s  %(name)8s  %(levelname)5s  %(message)s'
-    logging.basicConfig(level=logging.WARNING,
-                        format=log_format,
-                        filename='dev.log',
-                        filemode='w')
-    console = logging.StreamHandler()
-    console.setLevel(logging.WARNING)
-    console.setFormatter(logging.Formatter(log_format))
-    logging.getLogger(name).addHandler(console)
-    return logging.getLogger(name)
\ No newline at end of file
+    """
+    Gets a named logger, configuring the dev.log file handler and the logger's
+    console handler the first time they are needed.
+
+    Args:
+        name (str): Logger name.
+
+    Returns:
+        Logger: The configured logger.
+    """
+    global _configured
+    with _lock:
+        if not _configured:
+            logging.basicConfig(level=logging.WARNING,
+                                format=LOG_FORMAT,
+                                filename='dev.log',
+                                filemode='w')
+            _configured = True
+        if name not in _named:
+            console = logging.StreamHandler()
+            console.setLevel(logging.WARNING)
+            console.setFormatter(logging.Formatter(LOG_FORMAT))
+            logging.getLogger(name).addHandler(console)
+            _named.add(name)
+    return logging.getLogger(name)
+
+
+class TraceWriter:
+    """
+    Buffered background writer for a structured per-event debug trace.
+
+    Records are tuples collected in memory by the caller's thread; every `batch_size`
+    records the batch is handed to a writer thread, which formats it as CSV and writes
+    it out. The hot path therefore only appends to a list.
+
+    The file is opened up front, so a bad path fails in the constructor. If writing
+    fails later the thread keeps draining batches (so the caller never blocks) and the
+    error is re-raised by the next write() or by close().
+
+    Attributes:
+        path (str): File the trace is written to.
+        columns (list): Column names written as the header row.
+        error (BaseException): Exception raised by the writer thread, None if none.
+    """
+
+    def __init__(self, path, columns, batch_size=4096):
+        """
+        Initializes a new TraceWriter and starts its writer thread.
+
+        Args:
+            path (str): File the trace is written to, overwritten if it exists.
+            columns (list): Column names for the header row.
+            batch_size (int): Number of records buffered before they are handed off.
+
+        Raises:
+            OSError: If the file cannot be opened.
+        """
+        self.path = path
+        self.columns = columns
+        self.batch_size = batch_size
+        self.batch = []
+        self.error = None
+        self.file = open(path, 'w')
+        self.batches = queue.Queue(maxsize=64)
+        self.writer = threading.Thread(target=self.run, name='trace-writer', daemon=True)
+        self.writer.start()
+
+    def write(self, record):
+        """
+        Adds one record to the trace.
+
+        Args:
+            record (tuple): Values in the same order as columns.
+        """
+        batch = self.batch
+        batch.append(record)
+        if len(batch) >= self.batch_size:
+            if self.error is not None:
+                raise self.error
+            self.batches.put(batch)
+            self.batch = []
+
+    def run(self):
+        """Writer thread: formats and writes batches until close() sends None."""
+        f = self.file
+        try:
+            f.write(','.join(self.columns) + '\n')
+        except Exception as e:
+            self.error = e
+        while True:
+            batch = self.batches.get()
+            if batch is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                f.write(''.join(','.join(map(str, record)) + '\n' for record in batch))
+            except Exception as e:
+                self.error = e
+        try:
+            f.close()
+        except Exception as e:
+            if self.error is None:
+                self.error = e
+
+    def close(self):
+        """
+        Flushes any buffered records and waits for the writer thread to finish.
+
+        Raises:
+            Exception: Whatever the writer thread failed with, if it failed.
+        """
+        if self.batch:
+            self.batches.put(self.batch)
+            self.batch = []
+        self.batches.put(None)
+        self.writer.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
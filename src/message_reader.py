@@ -0,0 +1,268 @@
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+
+MESSAGE_COLUMNS = ['time', 'type', 'order_id', 'shares', 'price', 'direction']
+MARKET_OPEN = 9.5*60*60
+MARKET_CLOSE = 16*60*60
+
+# Fixed-width binary message record: int64 ns timestamp, int8 type, int64 id,
+# int32 shares, int64 price in LOBSTER ticks (dollars x 10000), int8 direction.
+BINARY_MAGIC = b'LOBMSG01'
+BINARY_HEADER = np.dtype([('magic', 'S8'), ('count', '<u8')])
+BINARY_RECORD = np.dtype([('time_ns', '<i8'), ('type', 'i1'), ('order_id', '<i8'),
+						('shares', '<i4'), ('price', '<i8'), ('direction', 'i1')])
+
+def readMessages(path, start_time=MARKET_OPEN, end_time=MARKET_CLOSE, price_scale=10000):
+	"""
+	Reads a LOBSTER message file and keeps only messages inside the time window.
+
+	Args:
+		path (str): Path to the message CSV.
+		start_time (float): First time to keep, in seconds after midnight.
+		end_time (float): Last time to keep, in seconds after midnight.
+		price_scale (int): Divisor applied to prices. None keeps LOBSTER's integer
+			prices, for use with a Book running on integer ticks.
+
+	Returns:
+		DataFrame: Messages with columns time, type, order_id, shares, price, direction.
+	"""
+	messages = pd.read_csv(path, names=MESSAGE_COLUMNS)
+	messages = messages[(messages['time'] >= start_time) & (messages['time'] <= end_time)]
+	if price_scale is not None:
+		messages['price'] = messages['price']/price_scale
+	return messages.reset_index(drop=True)
+
+def readMessageRows(path, first, last, price_scale=10000):
+	"""
+	Reads messages first (inclusive) to last (exclusive) by row number, with no time filter,
+	so row numbers line up with the matching orderbook file.
+
+	Args:
+		path (str): Path to the message CSV.
+		first (int): First row to read.
+		last (int): Row to stop before.
+		price_scale (int): Divisor applied to prices, None to keep integer prices.
+
+	Returns:
+		DataFrame: Messages with columns time, type, order_id, shares, price, direction.
+	"""
+	messages = pd.read_csv(path, names=MESSAGE_COLUMNS, skiprows=first, nrows=last-first)
+	if price_scale is not None:
+		messages['price'] = messages['price']/price_scale
+	return messages
+
+def readOrderbookRow(path, k):
+	"""
+	Reads row k of a LOBSTER orderbook_N.csv file, the book after message k.
+
+	Args:
+		path (str): Path to the orderbook CSV.
+		k (int): Row number.
+
+	Returns:
+		ndarray: [Ask_1, Ask_1_Size, Bid_1, Bid_1_Size, ...] with integer prices.
+	"""
+	return pd.read_csv(path, header=None, skiprows=k, nrows=1).to_numpy()[0]
+
+def readOrderbookChunks(path, chunk_size=100000, levels=None, prefetch=2):
+	"""
+	Streams a LOBSTER orderbook_N.csv file in fixed-size chunks of integer rows.
+
+	Args:
+		path (str): Path to the orderbook CSV.
+		chunk_size (int): Number of rows parsed per chunk.
+		levels (int): Keep only the first levels levels per side, None for all.
+		prefetch (int): Number of parsed chunks to buffer ahead of the caller, 0 to parse inline.
+
+	Yields:
+		ndarray: (rows, 4*levels) int64 array laid out [Ask_1, Ask_1_Size, Bid_1, Bid_1_Size, ...].
+
+	Raises:
+		ValueError: If the file has fewer than levels levels.
+	"""
+	chunks = parseOrderbookChunks(path, chunk_size, levels)
+	if prefetch > 0:
+		chunks = prefetchChunks(chunks, prefetch)
+	yield from chunks
+
+def parseOrderbookChunks(path, chunk_size, levels):
+	"""
+	Parses orderbook chunks on the calling thread. See readOrderbookChunks.
+	"""
+	width = None if levels is None else 4*levels
+	reader = pd.read_csv(path, header=None, chunksize=chunk_size, dtype=np.int64)
+	try:
+		for chunk in reader:
+			if width is not None and chunk.shape[1] < width:
+				raise ValueError('{} has {} levels, {} requested'.format(path, chunk.shape[1]//4, levels))
+			yield chunk.to_numpy()[:, :width]
+	finally:
+		reader.close()
+
+def readMessageChunks(path, chunk_size=100000, start_time=MARKET_OPEN, end_time=MARKET_CLOSE, price_scale=10000, prefetch=2):
+	"""
+	Streams a LOBSTER message file in fixed-size chunks.
+
+	Each chunk is filtered to the time window and price scaled on its own, so memory
+	use depends on chunk_size rather than file size. Because message files are in time
+	order, reading stops at the first chunk that ends past end_time. With prefetch > 0
+	the next chunks are parsed on a background thread while the caller works on the
+	current one.
+
+	Args:
+		path (str): Path to the message CSV.
+		chunk_size (int): Number of rows parsed per chunk.
+		start_time (float): First time to keep, in seconds after midnight.
+		end_time (float): Last time to keep, in seconds after midnight.
+		price_scale (int): Divisor applied to prices, None to keep integer prices.
+		prefetch (int): Number of parsed chunks to buffer ahead of the caller, 0 to parse inline.
+
+	Yields:
+		tuple: (times, types, order_ids, shares, prices, directions) NumPy arrays for one chunk.
+	"""
+	chunks = parseChunks(path, chunk_size, start_time, end_time, price_scale)
+	if prefetch > 0:
+		chunks = prefetchChunks(chunks, prefetch)
+	yield from chunks
+
+def parseChunks(path, chunk_size, start_time, end_time, price_scale):
+	"""
+	Parses, filters and scales message chunks on the calling thread. See readMessageChunks.
+	"""
+	reader = pd.read_csv(path, names=MESSAGE_COLUMNS, chunksize=chunk_size)
+	try:
+		for chunk in reader:
+			times = chunk['time'].to_numpy()
+			keep = (times >= start_time) & (times <= end_time)
+			if keep.any():
+				chunk = chunk[keep]
+				prices = chunk['price'].to_numpy()
+				if price_scale is not None:
+					prices = prices/price_scale
+				yield (chunk['time'].to_numpy(), chunk['type'].to_numpy(), chunk['order_id'].to_numpy(),
+					chunk['shares'].to_numpy(), prices, chunk['direction'].to_numpy())
+			if len(times) and times[-1] > end_time:
+				break
+	finally:
+		reader.close()
+
+def prefetchChunks(chunks, depth):
+	"""
+	Runs a chunk generator on a background thread, buffering up to depth chunks.
+
+	Exceptions raised while parsing are re-raised in the caller. If the caller stops
+	early the background thread is told to stop at its next chunk.
+
+	Args:
+		chunks (iterator): Chunk generator to run in the background.
+		depth (int): Maximum number of chunks buffered ahead.
+
+	Yields:
+		tuple: Chunks in the order produced.
+	"""
+	buffer = queue.Queue(maxsize=depth)
+	stop = threading.Event()
+	done = object()
+
+	def produce():
+		try:
+			for chunk in chunks:
+				while not stop.is_set():
+					try:
+						buffer.put(chunk, timeout=0.1)
+						break
+					except queue.Full:
+						pass
+				if stop.is_set():
+					return
+			buffer.put(done)
+		except BaseException as error:
+			buffer.put(error)
+
+	worker = threading.Thread(target=produce, name='lobster-prefetch', daemon=True)
+	worker.start()
+	try:
+		while True:
+			item = buffer.get()
+			if item is done:
+				return
+			if isinstance(item, BaseException):
+				raise item
+			yield item
+	finally:
+		stop.set()
+
+def writeBinaryMessages(csv_path, binary_path, chunk_size=1000000):
+	"""
+	Converts a LOBSTER message CSV to the compact fixed-width binary format.
+
+	The whole file is converted (no time filter) with integer prices, streaming in
+	chunks so memory does not depend on file size.
+
+	Args:
+		csv_path (str): Path to the message CSV.
+		binary_path (str): Path of the binary file to write.
+		chunk_size (int): Number of rows converted per chunk.
+
+	Returns:
+		int: Number of messages written.
+	"""
+	count = 0
+	with open(binary_path, 'wb') as f:
+		f.write(np.zeros(1, dtype=BINARY_HEADER).tobytes())
+		for times, types, order_ids, shares, prices, directions in parseChunks(csv_path, chunk_size, -np.inf, np.inf, None):
+			records = np.empty(len(times), dtype=BINARY_RECORD)
+			records['time_ns'] = np.round(times * 1e9)
+			records['type'] = types
+			records['order_id'] = order_ids
+			records['shares'] = shares
+			records['price'] = prices
+			records['direction'] = directions
+			f.write(records.tobytes())
+			count += len(records)
+		f.seek(0)
+		f.write(np.array([(BINARY_MAGIC, count)], dtype=BINARY_HEADER).tobytes())
+	return count
+
+def loadBinaryMessages(binary_path, start_time=MARKET_OPEN, end_time=MARKET_CLOSE, price_scale=10000):
+	"""
+	Memory-maps a binary message file written by writeBinaryMessages.
+
+	Nothing is parsed: the time window is found by binary search on the mapped
+	timestamps and the integer columns are returned as views of the map, so startup
+	cost is independent of file size and pages are read straight from the page cache.
+
+	Args:
+		binary_path (str): Path to the binary message file.
+		start_time (float): First time to keep, in seconds after midnight.
+		end_time (float): Last time to keep, in seconds after midnight.
+		price_scale (int): Divisor applied to prices, None to keep integer prices.
+
+	Returns:
+		tuple: (times, types, order_ids, shares, prices, directions) arrays, accepted by Book.replay.
+
+	Raises:
+		ValueError: If the file is not in the expected format.
+	"""
+	header = np.fromfile(binary_path, dtype=BINARY_HEADER, count=1)
+	if len(header) == 0 or header['magic'][0] != BINARY_MAGIC:
+		raise ValueError('{} is not a binary LOBSTER message file'.format(binary_path))
+	count = int(header['count'][0])
+	if count == 0:
+		records = np.empty(0, dtype=BINARY_RECORD)
+	else:
+		records = np.memmap(binary_path, dtype=BINARY_RECORD, mode='r', offset=BINARY_HEADER.itemsize, shape=(count,))
+
+	time_ns = records['time_ns']
+	first = np.searchsorted(time_ns, int(round(start_time * 1e9)), side='left')
+	last = np.searchsorted(time_ns, int(round(end_time * 1e9)), side='right')
+	records = records[first:last]
+
+	times = records['time_ns'] / 1e9
+	prices = records['price']
+	if price_scale is not None:
+		prices = prices / price_scale
+	return (times, records['type'], records['order_id'], records['shares'], prices, records['direction'])
@@ -1,10 +1,91 @@
 import limit_bst as tree
+from price_ladder import PriceLadder
+from snapshot_policy import SnapshotPolicy
+from snapshot_store import SnapshotStore
+from order_journal import OrderJournal
+from book_stats import BookStats, queueLengths
+from stream_output import BookRecord, Discard, Latest
 from  order_obj import Order
 import numpy as np
 import pandas as pd
-from datetime import datetime
+from array import array
+from functools import lru_cache
+from time import perf_counter, perf_counter_ns
+import logging
 import log
 
+# LOBSTER's padding for levels beyond the book: ask price, bid price (size 0)
+EMPTY_ASK = 9999999999
+EMPTY_BID = -9999999999
+
+def toClockTime(seconds):
+	"""
+	Converts LOBSTER times (seconds after midnight) to time-of-day objects in one vectorized step.
+
+	The engine keeps raw float seconds everywhere and only the DataFrame accessors call this,
+	so conversion is independent of the local timezone and costs nothing per event.
+
+	Args:
+		seconds (array-like): Times in seconds after midnight.
+
+	Returns:
+		ndarray: datetime.time objects, microsecond resolution.
+	"""
+	micros = np.round(np.asarray(seconds, dtype=np.float64) * 1e6).astype(np.int64)
+	return pd.to_datetime(micros, unit='us').time
+
+@lru_cache(maxsize=None)
+def bookColumns(levels):
+	"""
+	Column names of formatBook for the given depth: Ask_k, Ask_k_Vol, Ask_k_Ord, Bid_k, Bid_k_Vol, Bid_k_Ord per level.
+	"""
+	colnames = []
+	for i in range(1, levels+1):
+		colnames += ['Ask_{}'.format(i), 'Ask_{}_Vol'.format(i), 'Ask_{}_Ord'.format(i),
+					'Bid_{}'.format(i), 'Bid_{}_Vol'.format(i), 'Bid_{}_Ord'.format(i)]
+	return tuple(colnames)
+
+@lru_cache(maxsize=None)
+def sideColumns(side, levels):
+	"""
+	The formatBook columns of one side ('Ask' or 'Bid') for the given depth.
+	"""
+	return tuple(name for name in bookColumns(levels) if name.startswith(side))
+
+@lru_cache(maxsize=None)
+def lobsterColumns(levels):
+	"""
+	Column names of a LOBSTER orderbook_N.csv: Ask_k, Ask_k_Size, Bid_k, Bid_k_Size per level.
+	"""
+	colnames = []
+	for i in range(1, levels+1):
+		colnames += ['Ask_{}'.format(i), 'Ask_{}_Size'.format(i), 'Bid_{}'.format(i), 'Bid_{}_Size'.format(i)]
+	return tuple(colnames)
+
+@lru_cache(maxsize=None)
+def queueColumns(side, levels):
+	"""
+	Column names of formatQueues for one side, deepest level first, then the queue lengths column.
+	"""
+	return tuple('{}_{}'.format(side, k) for k in range(levels, 0, -1)) + ('{}_Q_lens'.format(side),)
+
+def messageLists(messages):
+	"""
+	Converts a block of messages to six Python lists, one per column.
+
+	Args:
+		messages (DataFrame or tuple): Either a DataFrame whose first six columns are
+			time, type, order id, shares, price and direction, or a tuple of six arrays in that order.
+
+	Returns:
+		list: [times, types, order_ids, shares, prices, directions]
+	"""
+	if isinstance(messages, pd.DataFrame):
+		columns = [messages.iloc[:, k].to_numpy() for k in range(6)]
+	else:
+		columns = messages
+	return [np.asarray(c).tolist() for c in columns]
+
 class Book:
 	"""
 	Represents a limit order book.
@@ -15,36 +96,106 @@ class Book:
 		best_bid (Order): The best bid order in the book.
 		best_offer (Order): The best offer order in the book.
 		orders (dict): All orders keyed by their IDs.
+		placeholders (dict): Synthetic orders seeded from a LOBSTER orderbook row, keyed on (direction, price)
+		journal (OrderJournal): Columnar lifecycle of every order event
 		visible_executions [list]: All visible executions 
-		event_times [list]: Event times used later to index the formatted orderbook
-		book_snapshot [list]: in order traversal of the book after each event
+		event_times (array): Raw event times (seconds after midnight, float64) of every event processed
+		book_snapshot (SnapshotStore): levels recorded according to the snapshot policy, with their event time
 		hidden_executions [list]: All hidden executions
+		tick_size (int): Tick size when the book runs on integer prices, None for float prices
+		snapshot_policy (SnapshotPolicy): Decides when snapshots are recorded and at what depth
+		trace (TraceWriter): Optional structured per-event debug trace, None when disabled
+		instrumentation (BookStats): Per-phase timing histograms and shape maxima, None when disabled
+		retain_history (bool): False when histories are not kept and events are read through stream()
+		record_queues (bool): Whether order queues are captured with snapshots (never without history)
+		callbacks (dict): Subscribed callbacks by kind, see subscribe()
+		verbose (bool): Whether per-event INFO messages are logged, read from the logger's level when the book is created
 	"""
+
+	TRACE_COLUMNS = ['i', 'time', 'type', 'order_id', 'shares', 'price', 'direction', 'best_bid', 'best_offer']
+	SUBSCRIPTIONS = ('bbo', 'level', 'execution', 'top_order')
 	
-	def __init__(self):
+	def __init__(self, tick_size=None, ladder_window=256, snapshot_policy=None, trace_path=None, instrument=False, retain_history=True):
 		"""
 		Initializes a new instance of Book.
 
 		Sets up logging configuration and initializes necessary attributes.
+
+		Args:
+			tick_size (int): If given, the book works on integer tick prices (e.g. raw LOBSTER
+				prices with tick_size=100) and each side keeps a dense price ladder near the touch.
+			ladder_window (int): Number of ticks held in each side's ladder when tick_size is set.
+			snapshot_policy (SnapshotPolicy): When to record snapshots, see snapshot_policy.py.
+				Defaults to the top 5 levels per side after every event, the depth formatBook
+				has always produced; deeper output needs an explicit policy, e.g. TopLevels(50).
+			trace_path (str): If given, a CSV trace of every event and the BBO after it is
+				written here by a background thread. Call closeTrace() when done.
+			instrument (bool): Time each event's phases into histograms and track tree depth,
+				level count and queue length maxima, see stats(). When False the
+				uninstrumented processMessage runs and there is no overhead.
+			retain_history (bool): If False the book keeps no snapshots, queues, event times,
+				order journal or submission/cancellation/deletion/execution lists, and
+				results are read one event at a time through stream(). Orders are dropped
+				from orders as soon as they leave the book, so memory follows the resting
+				book whether it is driven by stream, replay or a feed handler.
 		"""
 		self.logger = log.get_logger('Order Book')
+		# checked once so disabled per-event messages cost one attribute test, not a logging call
+		self.verbose = self.logger.isEnabledFor(logging.INFO)
 
 		# main variables
-		self.buy = tree.BinarySearchTree(-9999999999)
-		self.sell = tree.BinarySearchTree(9999999999)
+		self.tick_size = tick_size
+		if tick_size is None:
+			self.buy = tree.BinarySearchTree()
+			self.sell = tree.BinarySearchTree()
+		else:
+			self.buy = PriceLadder(tick_size, ladder_window, 1)
+			self.sell = PriceLadder(tick_size, ladder_window, -1)
+		self.snapshot_policy = snapshot_policy if snapshot_policy is not None else SnapshotPolicy(5)
+		self.trace = log.TraceWriter(trace_path, self.TRACE_COLUMNS) if trace_path is not None else None
 		self.best_bid = None
 		self.best_offer = None
 		self.orders = {}
+		self.placeholders = {}
+		self.placeholder_count = 0
+		self.journal = OrderJournal()
 
 		# Storage variables
-		self.book_snapshot = []
-		self.event_times = []
-		self.visible_executions = []
-		self.hidden_executions = []
-		self.submissions = []
-		self.cancelations = []
-		self.deletions = []
-		self.queues = []
+		self.retain_history = retain_history
+		# queues are only built if something keeps them
+		self.record_queues = retain_history and self.snapshot_policy.record_queues
+		if retain_history:
+			self.book_snapshot = SnapshotStore(self.snapshot_policy.depth or 5)
+			self.event_times = array('d')
+			self.visible_executions = []
+			self.hidden_executions = []
+			self.submissions = []
+			self.cancelations = []
+			self.deletions = []
+			self.queues = []
+		else:
+			# the handlers append as usual; these keep at most the current event's output
+			self.journal = Discard()
+			self.book_snapshot = Latest()
+			self.event_times = Discard()
+			self.visible_executions = Latest()
+			self.hidden_executions = Latest()
+			self.submissions = Discard()
+			self.cancelations = Discard()
+			self.deletions = Discard()
+			self.queues = Discard()
+
+		self.instrumentation = None
+		if instrument:
+			self.instrumentation = BookStats()
+			self.instrumentation.timeLookups(self.buy)
+			self.instrumentation.timeLookups(self.sell)
+			self.processMessage = self.processMessageInstrumented
+
+		self.callbacks = {kind: [] for kind in self.SUBSCRIPTIONS}
+		self.process_message_unnotified = None
+		self.top_levels = 0
+		self.last_bbo = (None, 0, None, 0)
 
 	def  handleEvent(self, event, i):
 		"""
@@ -53,129 +204,657 @@ class Book:
 		Args:
 			event (Event): The event object to be processed.
 			i (int): Identifier for the event.
+		"""
+		self.processMessage(event.time, event.type, event.order_id, event.shares, event.price, event.direction, i)
+
+	def processMessage(self, time, event_type, order_id, shares, price, direction, i):
+		"""
+		Applies a single LOBSTER message to the book from its raw fields.
+
+		Args:
+			time (float): Event time in seconds after midnight.
+			event_type (int): LOBSTER event type, 1 to 5.
+			order_id (int): Order ID.
+			shares (int): Number of shares in the event.
+			price (float): Price of the event.
+			direction (int): 1 for buy, -1 for sell.
+			i (int): Identifier for the event.
+		"""
+		self.applyMessage(time, event_type, order_id, shares, price, direction, i)
 
-		Raises:
-			ValueError: If the event type is not recognized.
-		"""
-		if event.type == 1:
-			self.logger.info('{} New Order Submission'.format(i))
-			self.newLimitOrderSubmission(event)
-		elif event.type == 2:
-			self.logger.info('{} Order Cancelation'.format(i))
-			self.cancelationOfExistingLimitOrder(event)
-		elif event.type == 3:
-			self.logger.info('{} Order Deleteion'.format(i))
-			self.deletionOfExistingLimitOrder(event)
-		elif event.type == 4:
-			self.logger.info('{} Visible Order Execution'.format(i))
-			self.orderExecution(event)
-		elif event.type == 5:
-			self.logger.info('{} Hidden Order Execution'.format(i))
-			self.hiddentExecution(event)
-		
 		# aggregate info for use later
-		event_time = datetime.fromtimestamp(event.time).time() 
-		self.event_times.append(event_time)
-		self.book_snapshot.append([self.getAllLevels(), event_time])
-		self.queues.append([self.getL5orderqueues(), event_time])
+		self.event_times.append(time)
+		levels = self.snapshot_policy.capture(self, time)
+		if levels is not None:
+			self.book_snapshot.append(time, levels[0], levels[1])
+			if self.record_queues:
+				self.queues.append([self.getOrderqueues(self.snapshot_policy.queue_depth), time])
+		self.updateNbbo()
+		if self.trace is not None:
+			self.trace.write((i, time, event_type, order_id, shares, price, direction, self.best_bid, self.best_offer))
+
+	def processMessageInstrumented(self, time, event_type, order_id, shares, price, direction, i):
+		"""
+		processMessage with each phase timed into self.instrumentation.
+
+		Set as the book's processMessage when it is created with instrument=True.
+		"""
+		start = perf_counter_ns()
+		self.applyMessage(time, event_type, order_id, shares, price, direction, i)
+		handled = perf_counter_ns()
+
+		self.event_times.append(time)
+		levels = self.snapshot_policy.capture(self, time)
+		if levels is not None:
+			self.book_snapshot.append(time, levels[0], levels[1])
+			if self.record_queues:
+				self.queues.append([self.getOrderqueues(self.snapshot_policy.queue_depth), time])
+		snapped = perf_counter_ns()
+		self.updateNbbo()
+		done = perf_counter_ns()
+		if self.trace is not None:
+			self.trace.write((i, time, event_type, order_id, shares, price, direction, self.best_bid, self.best_offer))
+
+		self.instrumentation.record(event_type, start, handled, snapped, done)
+		self.instrumentation.observeShape(self, event_type, order_id)
+
+	def subscribe(self, kind, callback, levels=5):
+		"""
+		Registers a callback that fires only when the thing it watches changes.
+
+		Kinds and their callback arguments:
+			'bbo': (time, bid, bid_size, offer, offer_size) when the best price or size on either side changes.
+			'level': (time, direction, price, volume, num_orders) when a level's volume or order
+				count changes; volume and count are 0 when the level was removed.
+			'execution': (time, price, shares, direction, hidden) for every visible or hidden execution.
+			'top_order': (time, order_id, direction, price, shares, rank, added) when an order joins
+				or leaves one of the best `levels` levels of its side; rank 0 is the best level.
+				This includes every order of a level pushed out by a new better level (rank
+				levels - 1, added False) or pulled in when a level above it empties (added True).
+
+		The first subscription wraps processMessage, so books without subscribers pay nothing.
+		Subscribe before calling replay or stream.
+
+		Args:
+			kind (str): One of 'bbo', 'level', 'execution', 'top_order'.
+			callback (callable): Called with the arguments above.
+			levels (int): Depth watched by a 'top_order' callback.
+
+		Raises:
+			ValueError: If kind is not recognised.
+		"""
+		if kind not in self.callbacks:
+			raise ValueError('Unknown subscription {!r}, expected one of {}'.format(kind, self.SUBSCRIPTIONS))
+		if kind == 'top_order':
+			self.callbacks[kind].append((callback, levels))
+			self.top_levels = max(self.top_levels, levels)
+		else:
+			self.callbacks[kind].append(callback)
+		if self.process_message_unnotified is None:
+			self.process_message_unnotified = self.processMessage
+			self.processMessage = self.processMessageNotifying
+
+	def processMessageNotifying(self, time, event_type, order_id, shares, price, direction, i):
+		"""
+		processMessage followed by whichever subscribed callbacks the event triggered.
+
+		Only the level the event touched is inspected, so events deep in the book cost one
+		comparison per kind rather than a diff of the book.
+		"""
+		callbacks = self.callbacks
+		order = None
+		level = None
+		before = None
+		removed = None
+		if event_type == 2 or event_type == 3 or event_type == 4:
+			order = self.orders.get(order_id)
+			if order is None and self.placeholders:
+				order = self.placeholders.get((direction, price))
+			if order is not None and order.limit is not None:
+				level = order.limit
+				before = (level.total_volume, level.num_orders)
+				if callbacks['top_order'] and event_type != 2:
+					removed = (order.id, order.direction, order.price, order.shares, self.topRank(level, order.direction))
+
+		self.process_message_unnotified(time, event_type, order_id, shares, price, direction, i)
+
+		if event_type == 1:
+			order = self.orders.get(order_id)
+			if order is not None and order.limit is not None:
+				level = order.limit
+				before = (level.total_volume - order.shares, level.num_orders - 1)
+				if callbacks['top_order']:
+					rank = self.topRank(level, direction)
+					self.notifyTopOrder(time, order.id, direction, order.price, order.shares, rank, True)
+					if rank is not None and level.num_orders == 1:
+						self.notifyShiftedLevel(time, direction, rank, False)
+		elif removed is not None and order.limit is None:
+			self.notifyTopOrder(time, *removed, False)
+			if removed[4] is not None and level.num_orders == 0:
+				self.notifyShiftedLevel(time, removed[1], removed[4], True)
+
+		if level is not None and callbacks['level'] and (level.total_volume, level.num_orders) != before:
+			for callback in callbacks['level']:
+				callback(time, order.direction, level.limit_price, level.total_volume, level.num_orders)
+
+		if callbacks['execution']:
+			if event_type == 4 and order is not None:
+				for callback in callbacks['execution']:
+					callback(time, order.price, shares, order.direction, False)
+			elif event_type == 5:
+				for callback in callbacks['execution']:
+					callback(time, price, shares, direction, True)
+
+		if callbacks['bbo']:
+			best_bid = self.buy.maxLimit()
+			best_offer = self.sell.minLimit()
+			bbo = (best_bid.limit_price if best_bid is not None else None,
+					best_bid.total_volume if best_bid is not None else 0,
+					best_offer.limit_price if best_offer is not None else None,
+					best_offer.total_volume if best_offer is not None else 0)
+			if bbo != self.last_bbo:
+				self.last_bbo = bbo
+				for callback in callbacks['bbo']:
+					callback(time, *bbo)
+
+	def topRank(self, level, direction):
+		"""
+		Position of a level among the best top_levels levels of its side.
+
+		Returns:
+			int: 0 for the best level, None if the level is deeper than top_levels.
+		"""
+		best = self.buy.highestLimits(self.top_levels) if direction == 1 else self.sell.lowestLimits(self.top_levels)
+		for rank, candidate in enumerate(best):
+			if candidate is level:
+				return rank
+		return None
+
+	def notifyShiftedLevel(self, time, direction, rank, added):
+		"""
+		Reports the orders of the level that crossed each 'top_order' callback's depth
+		when a level was created (added False) or removed (added True) at rank.
+		"""
+		best = self.buy.highestLimits(self.top_levels + 1) if direction == 1 else self.sell.lowestLimits(self.top_levels + 1)
+		for callback, levels in self.callbacks['top_order']:
+			if rank >= levels:
+				continue
+			# a new level pushes the one now at rank `levels` out; a removed one pulls rank levels - 1 in
+			shifted = levels if not added else levels - 1
+			if shifted >= len(best):
+				continue
+			order = best[shifted].order_queue.head
+			while order is not None:
+				callback(time, order.id, direction, order.price, order.shares, levels - 1, added)
+				order = order.next
+
+	def notifyTopOrder(self, time, order_id, direction, price, shares, rank, added):
+		"""
+		Calls each 'top_order' callback whose depth covers rank.
+		"""
+		if rank is None:
+			return
+		for callback, levels in self.callbacks['top_order']:
+			if rank < levels:
+				callback(time, order_id, direction, price, shares, rank, added)
+
+	def applyMessage(self, time, event_type, order_id, shares, price, direction, i):
+		"""
+		Dispatches a single LOBSTER message to its event handler.
+
+		Args:
+			time (float): Event time in seconds after midnight.
+			event_type (int): LOBSTER event type, 1 to 5.
+			order_id (int): Order ID.
+			shares (int): Number of shares in the event.
+			price (float): Price of the event.
+			direction (int): 1 for buy, -1 for sell.
+			i (int): Identifier for the event.
+		"""
+		verbose = self.verbose
+		if event_type == 1:
+			if verbose:
+				self.logger.info('%s New Order Submission', i)
+			self.newLimitOrderSubmission(time, order_id, shares, price, direction)
+		elif self.placeholders and event_type in (2, 3, 4) and order_id not in self.orders and (direction, price) in self.placeholders:
+			if verbose:
+				self.logger.info('%s Event for unseen ID %s applied to seeded level %s', i, order_id, price)
+			self.placeholderEvent(time, event_type, shares, self.placeholders[(direction, price)])
+		elif event_type == 2:
+			if verbose:
+				self.logger.info('%s Order Cancelation', i)
+			self.cancelationOfExistingLimitOrder(time, order_id, shares)
+		elif event_type == 3:
+			if verbose:
+				self.logger.info('%s Order Deleteion', i)
+			self.deletionOfExistingLimitOrder(time, order_id, shares)
+		elif event_type == 4:
+			if verbose:
+				self.logger.info('%s Visible Order Execution', i)
+			self.orderExecution(time, order_id, shares)
+		elif event_type == 5:
+			if verbose:
+				self.logger.info('%s Hidden Order Execution', i)
+			self.hiddentExecution(time, shares, price, direction)
+
+	def stats(self):
+		"""
+		Reports the book's current shape and, if instrumented, where event time is spent.
+
+		Shape figures are read from the book on each call. Timings and maxima are only
+		collected when the book was created with instrument=True; otherwise they are None.
+
+		Returns:
+			dict: 'orders' (size of the orders dict), and per side ('bid', 'ask') the current
+				'depth' (tree height), 'levels' and 'queue_lengths' ({orders per level:
+				levels}). When instrumented also 'max_depth', 'max_levels',
+				'max_queue_length' and 'timings', see BookStats.timings.
+		"""
+		stats = {'orders': len(self.orders)}
+		for name, side in (('bid', self.buy), ('ask', self.sell)):
+			stats[name] = {'depth': side.depth(), 'levels': side.size, 'queue_lengths': queueLengths(side)}
+		instrumentation = self.instrumentation
+		if instrumentation is None:
+			stats['timings'] = None
+			return stats
+		for name in ('bid', 'ask'):
+			stats[name]['max_depth'] = instrumentation.max_depth[name]
+			stats[name]['max_levels'] = instrumentation.max_levels[name]
+		stats['max_queue_length'] = instrumentation.max_queue_length
+		stats['timings'] = instrumentation.timings()
+		return stats
+
+	def closeTrace(self):
+		"""
+		Flushes and closes the per-event trace, if one is open.
+		"""
+		if self.trace is not None:
+			self.trace.close()
+			self.trace = None
+
+	def replay(self, messages, start_index=0, checkpoint_every=None, checkpoint_path=None):
+		"""
+		Feeds a block of LOBSTER messages through the book without building Event objects.
+
+		Each column is converted to a Python list once up front, so the loop does no
+		per-message pandas or NumPy scalar access.
+
+		Args:
+			messages (DataFrame or tuple): Either a DataFrame whose first six columns are
+				time, type, order id, shares, price and direction, or a tuple of six arrays in that order.
+			start_index (int): Identifier given to the first message; later messages count up from it.
+			checkpoint_every (int): If given, save a checkpoint after every N-th event index.
+			checkpoint_path (str): Path pattern for checkpoints, formatted with the event index,
+				e.g. 'ckpt/AAPL_{:08d}.npz'.
+
+		Returns:
+			dict: Number of events, elapsed seconds and events per second.
+		"""
+		times, types, order_ids, shares, prices, directions = messageLists(messages)
+
+		process_message = self.processMessage
+		start = perf_counter()
+		if checkpoint_every is None:
+			for i, message in enumerate(zip(times, types, order_ids, shares, prices, directions), start_index):
+				process_message(*message, i)
+		else:
+			for i, message in enumerate(zip(times, types, order_ids, shares, prices, directions), start_index):
+				process_message(*message, i)
+				if (i + 1) % checkpoint_every == 0:
+					self.saveCheckpoint(checkpoint_path.format(i), i)
+		elapsed = perf_counter() - start
+
+		num_events = len(times)
+		stats = {'events': num_events,
+				'seconds': elapsed,
+				'events_per_sec': num_events / elapsed if elapsed > 0 else float('inf')}
+		self.logger.info("Replayed %s events in %.3fs (%.0f events/sec)", num_events, elapsed, stats['events_per_sec'])
+		return stats
+
+	def replayChunks(self, chunks):
+		"""
+		Replays a stream of message batches, e.g. from message_reader.readMessageChunks.
+
+		Args:
+			chunks (iterable): Batches accepted by replay, processed in order.
+
+		Returns:
+			dict: Number of events, elapsed seconds (including time spent waiting on the
+				reader) and events per second across all batches.
+		"""
+		num_events = 0
+		start = perf_counter()
+		for chunk in chunks:
+			num_events += self.replay(chunk, start_index=num_events)['events']
+		elapsed = perf_counter() - start
+
+		stats = {'events': num_events,
+				'seconds': elapsed,
+				'events_per_sec': num_events / elapsed if elapsed > 0 else float('inf')}
+		self.logger.info("Replayed %s events in %.3fs (%.0f events/sec)", num_events, elapsed, stats['events_per_sec'])
+		return stats
+
+	def stream(self, messages, start_index=0):
+		"""
+		Feeds a block of LOBSTER messages through the book, yielding a record per event.
+
+		A record is yielded for every event the snapshot policy captured and for every
+		visible or hidden execution, so e.g. Sampled(every_events=100, depth=5) yields
+		every 100th book plus each trade. The book must be created with
+		retain_history=False, see __init__.
+
+		Args:
+			messages (DataFrame or tuple): As for replay.
+			start_index (int): Identifier given to the first message; later messages count up from it.
+
+		Yields:
+			BookRecord: (index, time, type, bids, asks, execution), see stream_output.py.
+
+		Raises:
+			ValueError: If the book retains history.
+		"""
+		if self.retain_history:
+			raise ValueError('stream needs a Book created with retain_history=False')
+		times, types, order_ids, shares, prices, directions = messageLists(messages)
+
+		process_message = self.processMessage
+		snapshots = self.book_snapshot
+		visible_executions = self.visible_executions
+		hidden_executions = self.hidden_executions
+		for i, message in enumerate(zip(times, types, order_ids, shares, prices, directions), start_index):
+			process_message(*message, i)
+			time, event_type = message[0], message[1]
+
+			execution = None
+			visible = visible_executions.take()
+			hidden = hidden_executions.take()
+			if visible is not None:
+				_, execution_id, price, traded, direction = visible[0]
+				execution = (execution_id, price, traded, direction)
+			elif hidden is not None:
+				_, price, traded, direction = hidden[0]
+				execution = (None, price, traded, direction)
+
+			snapshot = snapshots.take()
+			if snapshot is not None:
+				yield BookRecord(i, time, event_type, snapshot[1], snapshot[2], execution)
+			elif execution is not None:
+				yield BookRecord(i, time, event_type, None, None, execution)
+
+	def streamChunks(self, chunks):
+		"""
+		Streams records from a sequence of message batches, e.g. from message_reader.readMessageChunks.
+
+		Args:
+			chunks (iterable): Batches accepted by stream, processed in order.
+
+		Yields:
+			BookRecord: As for stream, indexed across all batches.
+		"""
+		num_events = 0
+		for chunk in chunks:
+			yield from self.stream(chunk, start_index=num_events)
+			num_events += len(chunk) if isinstance(chunk, pd.DataFrame) else len(chunk[0])
+
+	def seedFromOrderbook(self, row, time=0.0, price_scale=10000):
+		"""
+		Initializes both trees from one row of a LOBSTER orderbook_N.csv file.
+
+		Each non-empty level gets a single synthetic placeholder order (negative ID) holding
+		the level's full size. Later cancels, deletes and executions for orders the book
+		never saw are applied to the placeholder at their price, so volume that was resting
+		before the replay started drains correctly instead of being left behind.
+
+		To replay a segment starting at message k, seed from orderbook row k - 1 (the book
+		after message k - 1) and replay messages k onwards.
+
+		Args:
+			row (array-like): [Ask_1, Ask_1_Size, Bid_1, Bid_1_Size, Ask_2, ...] as in the LOBSTER file.
+			time (float): Entry time given to the placeholders, seconds after midnight.
+			price_scale (int): Divisor applied to prices, None to keep integer prices.
+		"""
+		row = np.asarray(row).tolist()
+		for level in range(len(row) // 4):
+			ask_price, ask_size, bid_price, bid_size = row[4*level:4*level+4]
+			for direction, price, size in ((-1, ask_price, ask_size), (1, bid_price, bid_size)):
+				# LOBSTER pads missing levels with +/-9999999999 and size 0
+				if size <= 0 or abs(price) >= 9999999999:
+					continue
+				price = price/price_scale if price_scale is not None else int(price)
+				self.placeholder_count += 1
+				placeholder_id = -self.placeholder_count
+				self.newLimitOrderSubmission(time, placeholder_id, int(size), price, direction)
+				self.placeholders[(direction, price)] = self.orders[placeholder_id]
 		self.updateNbbo()
 
+	def placeholderEvent(self, time, event_type, shares, placeholder):
+		"""
+		Applies a cancel, delete or execution for an unseen order to the seeded placeholder at its level.
+
+		Args:
+			time (float): Event time in seconds after midnight.
+			event_type (int): 2, 3 or 4.
+			shares (int): Shares removed from the level by the event.
+			placeholder (Order): The placeholder order at the event's price.
+		"""
+		shares = min(shares, placeholder.shares)
+		if event_type == 4:
+			self.orderExecution(time, placeholder.id, shares)
+		else:
+			self.cancelationOfExistingLimitOrder(time, placeholder.id, shares)
+			if placeholder.shares == 0:
+				self.deletionOfExistingLimitOrder(time, placeholder.id, 0)
+		if placeholder.limit is None:
+			del self.placeholders[(placeholder.direction, placeholder.price)]
+
+	def saveCheckpoint(self, path, event_index):
+		"""
+		Writes the book's state to a compressed .npz file so a replay can resume from it.
+
+		The state is every resting order in queue order, each level's volume and order
+		count, the BBO, the event index and the number of placeholders seeded so far
+		(resting placeholders are the negative IDs). Histories (snapshots, executions, journal)
+		are not included; a resumed book starts those fresh.
+
+		Args:
+			path (str): File to write.
+			event_index (int): Index of the last event applied; resume from event_index + 1.
+		"""
+		order_columns = [[], [], [], [], []]
+		level_columns = [[], [], [], [], []]
+		for direction, side in ((1, self.buy), (-1, self.sell)):
+			for level in side.inOrderTraversal():
+				level_columns[0].append(level.limit_price)
+				level_columns[1].append(level.total_volume)
+				level_columns[2].append(level.num_orders)
+				level_columns[3].append(direction)
+				queued = 0
+				order = level.order_queue.head
+				while order is not None:
+					order_columns[0].append(order.id)
+					order_columns[1].append(order.entryTime)
+					order_columns[2].append(order.shares)
+					order_columns[3].append(order.price)
+					order_columns[4].append(direction)
+					queued += 1
+					order = order.next
+				level_columns[4].append(queued)
+
+		np.savez_compressed(path,
+			order_id=np.array(order_columns[0], dtype=np.int64),
+			order_time=np.array(order_columns[1], dtype=np.float64),
+			order_shares=np.array(order_columns[2], dtype=np.int64),
+			order_price=np.array(order_columns[3]),
+			order_direction=np.array(order_columns[4], dtype=np.int8),
+			level_price=np.array(level_columns[0]),
+			level_volume=np.array(level_columns[1], dtype=np.int64),
+			level_orders=np.array(level_columns[2], dtype=np.int64),
+			level_direction=np.array(level_columns[3], dtype=np.int8),
+			level_queued=np.array(level_columns[4], dtype=np.int64),
+			event_index=np.int64(event_index),
+			placeholder_count=np.int64(self.placeholder_count),
+			tick_size=np.int64(self.tick_size if self.tick_size is not None else 0))
+		self.logger.info("Checkpoint at event %s written to %s", event_index, path)
+
+	@classmethod
+	def loadCheckpoint(cls, path, **kwargs):
+		"""
+		Builds a new Book from a checkpoint written by saveCheckpoint.
+
+		Args:
+			path (str): Checkpoint file.
+			**kwargs: Passed to Book(), e.g. snapshot_policy. tick_size defaults to the
+				checkpointed book's.
+
+		Returns:
+			tuple: (Book, next event index to replay from).
+		"""
+		state = np.load(path)
+		tick_size = int(state['tick_size'])
+		kwargs.setdefault('tick_size', tick_size if tick_size else None)
+		book = cls(**kwargs)
+
+		order_ids = state['order_id'].tolist()
+		order_times = state['order_time'].tolist()
+		order_shares = state['order_shares'].tolist()
+		order_prices = state['order_price'].tolist()
+		order_directions = state['order_direction'].tolist()
+		row = 0
+		for price, volume, num_orders, direction, queued in zip(state['level_price'].tolist(), state['level_volume'].tolist(),
+				state['level_orders'].tolist(), state['level_direction'].tolist(), state['level_queued'].tolist()):
+			side = book.buy if direction == 1 else book.sell
+			level = None
+			for k in range(row, row + queued):
+				order = Order(order_times[k], order_ids[k], order_shares[k], order_prices[k], order_directions[k])
+				book.orders[order.id] = order
+				if order.id < 0:
+					book.placeholders[(order.direction, order.price)] = order
+				if level is None:
+					level = side.addLimit(order)
+				else:
+					level.addOrderHelper(order)
+			row += queued
+			if level is not None:
+				level.total_volume = volume
+				level.num_orders = num_orders
+
+		if 'placeholder_count' in state.files:
+			book.placeholder_count = int(state['placeholder_count'])
+		else:
+			book.placeholder_count = -min(order_ids, default=0)
+		book.updateNbbo()
+		next_index = int(state['event_index']) + 1
+		book.logger.info("Book restored from %s, resume at event %s", path, next_index)
+		return book, next_index
 
-	def newLimitOrderSubmission(self, event):
+	def newLimitOrderSubmission(self, time, order_id, shares, price, direction):
 		"""
 		Processes a new limit order submission event.
 
 		Args:
-			event (Event): The event object representing the new order submission.
+			time (float): Event time in seconds after midnight.
+			order_id (int): ID of the new order.
+			shares (int): Number of shares in the order.
+			price (float): Limit price of the order.
+			direction (int): 1 for buy, -1 for sell.
 		"""
 		# turn event into order object 
-		new_order = Order(event)
-		# created first entry in life array:
-		new_order.life.append([event.time, event.shares, event.type]) 
+		new_order = Order(time, order_id, shares, price, direction)
 		# add to order dict keyd on id
 		self.orders[new_order.id] = new_order
-		self.logger.info("Adding ID {} at {}, vol {}, in {} tree".format(new_order.id, new_order.price, new_order.shares, new_order.getDirection()))
+		self.journal.append(order_id, time, 1, shares, shares)
+		if self.verbose:
+			self.logger.info("Adding ID %s at %s, vol %s, in %s tree", new_order.id, new_order.price, new_order.shares, new_order.getDirection())
 		# check if buy or sell then add to approporiate tree
-		if event.direction == 1:
+		if direction == 1:
 			self.buy.handleNewOrder(new_order)
-		elif event.direction == -1:
+		elif direction == -1:
 			self.sell.handleNewOrder(new_order)
 		# add to new submissions
-		self.submissions.append([datetime.fromtimestamp(event.time).time(), new_order.id, new_order.price, new_order.shares, new_order.direction])
+		self.submissions.append([time, new_order.id, new_order.price, new_order.shares, new_order.direction])
 
-	def cancelationOfExistingLimitOrder(self, event):
+	def cancelationOfExistingLimitOrder(self, time, order_id, shares):
 		"""
 		Cancels an existing limit order.
 
 		Args:
-			event (Event): The event object representing the order cancellation.
+			time (float): Event time in seconds after midnight.
+			order_id (int): ID of the order to partially cancel.
+			shares (int): Number of shares cancelled.
 		"""
 		# get the ID of the order to partially cancel and get the order from the dict
-		order_to_cancel = self.orders.get(event.order_id)
-		shares_to_subtract_from_limit_total = event.shares
+		order_to_cancel = self.orders.get(order_id)
+		shares_to_subtract_from_limit_total = shares
 		# check if order exists
 		if order_to_cancel is not None:
-			# update order life 
-			order_to_cancel.life.append([event.time, event.shares, event.type])
 			if order_to_cancel.shares != 0:
-				self.logger.info("Canceling {} shares for ID {} at {} in {} tree".format(shares_to_subtract_from_limit_total, order_to_cancel.id, order_to_cancel.price, order_to_cancel.getDirection()))
+				if self.verbose:
+					self.logger.info("Canceling %s shares for ID %s at %s in %s tree", shares_to_subtract_from_limit_total, order_to_cancel.id, order_to_cancel.price, order_to_cancel.getDirection())
 				if order_to_cancel.direction == 1:
 					self.buy.handleCancellation(order_to_cancel, shares_to_subtract_from_limit_total)
 				elif order_to_cancel.direction == -1:
 					self.sell.handleCancellation(order_to_cancel, shares_to_subtract_from_limit_total)
 				# reduce the number of shares at this order by those in the event 
 				order_to_cancel.shares = order_to_cancel.shares - shares_to_subtract_from_limit_total
-				# update the order in the dict
-				self.orders[order_to_cancel.id] = order_to_cancel
 				# edit the number of total shares at that level in the book
-				self.logger.info("ID {} has {} shares remaining".format(order_to_cancel.id, order_to_cancel.shares))
+				if self.verbose:
+					self.logger.info("ID %s has %s shares remaining", order_to_cancel.id, order_to_cancel.shares)
+			# update order life 
+			self.journal.append(order_id, time, 2, shares, order_to_cancel.shares)
 			# keep track of cancellations
-			self.cancelations.append([datetime.fromtimestamp(event.time).time(), order_to_cancel.id, order_to_cancel.price, shares_to_subtract_from_limit_total, order_to_cancel.direction])
+			self.cancelations.append([time, order_to_cancel.id, order_to_cancel.price, shares_to_subtract_from_limit_total, order_to_cancel.direction])
 		else:
-			self.logger.info("ID {} does not exist".format(event.order_id))
+			self.logger.info("ID %s does not exist", order_id)
 
-	def deletionOfExistingLimitOrder(self, event):
+	def deletionOfExistingLimitOrder(self, time, order_id, shares):
 		"""
 		Deletes an existing limit order.
 
 		Args:
-			event (Event): The event object representing the order deletion.
+			time (float): Event time in seconds after midnight.
+			order_id (int): ID of the order to delete.
+			shares (int): Number of shares in the deletion message.
 		"""
 		# get the ID of the order to delete and get the order from the dict
-		order_to_delete = self.orders.get(event.order_id)
+		order_to_delete = self.orders.get(order_id)
 		# check if order exists
 		if order_to_delete is not None:
 			# update order life 
 			# we call deletion if we execute an entire order, so we handle for orders with 0 shares
 			if order_to_delete.shares != 0:
-				order_to_delete.life.append([event.time, event.shares, event.type])
+				self.journal.append(order_id, time, 3, shares, 0)
 			# pass order to book to delete from relevant queue
-			self.logger.info("Deleting ID {} at {} from queue in {} tree".format(order_to_delete.id, order_to_delete.price, order_to_delete.getDirection()))
+			if self.verbose:
+				self.logger.info("Deleting ID %s at %s from queue in %s tree", order_to_delete.id, order_to_delete.price, order_to_delete.getDirection())
 			if order_to_delete.direction == 1:
 				self.buy.handleDeletion(order_to_delete)
 			elif order_to_delete.direction == -1:
 				self.sell.handleDeletion(order_to_delete)
 			# keep track of deletions
-			self.deletions.append([datetime.fromtimestamp(event.time).time(), order_to_delete.id, order_to_delete.price, order_to_delete.shares, order_to_delete.direction])
+			self.deletions.append([time, order_to_delete.id, order_to_delete.price, order_to_delete.shares, order_to_delete.direction])
+			# without history nothing refers to an order once it has left the book
+			if not self.retain_history:
+				del self.orders[order_id]
 		else:
-			self.logger.info("ID {} does not exist".format(event.order_id))
+			self.logger.info("ID %s does not exist", order_id)
 
-	def orderExecution(self, event):
+	def orderExecution(self, time, order_id, shares):
 		"""
 		Executes an order.
 
 		Args:
-			event (Event): The event object representing the order execution.
+			time (float): Event time in seconds after midnight.
+			order_id (int): ID of the resting order being executed.
+			shares (int): Number of shares traded.
 		"""
 		# get id of order to execute and num shares to execute
-		order_to_execute = self.orders.get(event.order_id)
-		shares_traded = event.shares
+		order_to_execute = self.orders.get(order_id)
+		shares_traded = shares
 		# check if order exists
 		if order_to_execute is not None:
-			# update order life
-			order_to_execute.life.append([event.time, event.shares, event.type])
 			# determine the direction we are executing and send to respective buy or sell tree
-			self.logger.info("Executing {} shares for ID {} at {} in {} tree".format(shares_traded, order_to_execute.id, order_to_execute.price, order_to_execute.getDirection()))
+			if self.verbose:
+				self.logger.info("Executing %s shares for ID %s at %s in %s tree", shares_traded, order_to_execute.id, order_to_execute.price, order_to_execute.getDirection())
 			if order_to_execute.direction == 1:
 				self.buy.handleVisibleExecution(order_to_execute, shares_traded)
 			elif order_to_execute.direction == -1:
@@ -184,21 +863,29 @@ class Book:
 			# reduce shares at ID
 			if order_to_execute.shares > 0:
 				order_to_execute.shares = order_to_execute.shares - shares_traded
-			else:
-				self.logger.info("ID {} has 0 shares remaining".format(order_to_execute.id))
-			# update the order in dict with new vlaues
-			self.orders[order_to_execute.id] = order_to_execute
-			self.logger.info("ID {} has {} shares remaining".format(order_to_execute.id, order_to_execute.shares))
+			if self.verbose:
+				self.logger.info("ID %s has %s shares remaining", order_to_execute.id, order_to_execute.shares)
+			# update order life
+			self.journal.append(order_id, time, 4, shares, order_to_execute.shares)
 			# Add to trades list
-			self.visible_executions.append([datetime.fromtimestamp(event.time).time(), order_to_execute.id, order_to_execute.price, shares_traded, order_to_execute.direction])
+			self.visible_executions.append([time, order_to_execute.id, order_to_execute.price, shares_traded, order_to_execute.direction])
 			# if there are 0 shares for this ID then remove the order from the queue
 			if order_to_execute.shares == 0:
-				self.deletionOfExistingLimitOrder(event)
+				self.deletionOfExistingLimitOrder(time, order_id, shares)
 		else:
-			self.logger.info("ID {} does not exist".format(event.order_id))
+			self.logger.info("ID %s does not exist", order_id)
 
-	def hiddentExecution(self, event):
-		self.hidden_executions.append([datetime.fromtimestamp(event.time).time(), event.price, event.shares, event.direction])
+	def hiddentExecution(self, time, shares, price, direction):
+		"""
+		Records an execution against hidden liquidity, which never rests in the book.
+
+		Args:
+			time (float): Event time in seconds after midnight.
+			shares (int): Number of shares traded.
+			price (float): Execution price.
+			direction (int): Side of the hidden order, 1 for buy, -1 for sell.
+		"""
+		self.hidden_executions.append([time, price, shares, direction])
 		
 	def getNbbo(self):
 		"""
@@ -211,19 +898,12 @@ class Book:
 	
 	def updateNbbo(self):
 		"""
-		Updates the BBO based on the given order.
-
-		Args:
-			order (Order): The order object used to update NBBO.
+		Updates the BBO from the best level each tree keeps track of.
 		"""
-		if len(self.buy.inOrderTraversal()) == 0:
-			self.best_bid = None
-		else:
-			self.best_bid = self.buy.inOrderTraversal()[-1].limit_price
-		if len(self.sell.inOrderTraversal()) == 0:
-			self.best_offer = None
-		else:
-			self.best_offer = self.sell.inOrderTraversal()[0].limit_price
+		best_bid = self.buy.maxLimit()
+		best_offer = self.sell.minLimit()
+		self.best_bid = best_bid.limit_price if best_bid is not None else None
+		self.best_offer = best_offer.limit_price if best_offer is not None else None
 		
 	def getXLevels(self, x):
 		"""
@@ -235,8 +915,8 @@ class Book:
 		Returns:
 			list: A list containing top X buy levels and top X sell levels.
 		"""
-		b = self.buy.inOrderTraversal()[-x:]
-		o = self.sell.inOrderTraversal()[:x]
+		b = self.buy.highestLimits(x)[::-1]
+		o = self.sell.lowestLimits(x)
 
 		b = [[i.limit_price, i.total_volume, i.num_orders] for i in b]
 		o = [[i.limit_price, i.total_volume, i.num_orders] for i in o]
@@ -252,13 +932,27 @@ class Book:
 		Returns:
 			list: A list containing top X buy levels and top X sell levels.
 		"""
-		b = self.buy.inOrderTraversal()[-x:]
-		o = self.sell.inOrderTraversal()[:x]
+		b = self.buy.highestLimits(x)[::-1]
+		o = self.sell.lowestLimits(x)
 
 		b = [i.limit_price for i in b]
 		o = [i.limit_price for i in o]
 		return [b, o]
 	
+	def getLevels(self, x):
+		"""
+		Retrieves the top X levels, or every level when x is None.
+
+		Args:
+			x (int): The number of levels to retrieve, None for all.
+
+		Returns:
+			list: A list containing buy levels and sell levels.
+		"""
+		if x is None:
+			return self.getAllLevels()
+		return self.getXLevels(x)
+
 	def getAllLevels(self):
 		"""
 		Retrieves all levels from buy and sell trees.
@@ -302,25 +996,22 @@ class Book:
 			List: Bid L5 order queue
 			List: Ask L5 order queue
 		"""
-		book_levels = self.getXLevelspricesonly(5)
-		bids = book_levels[0]
-		asks = book_levels[1]
+		return self.getOrderqueues(5)
 
-		ask_queues = []
-		bid_queues = []
+	def getOrderqueues(self, levels):
+		"""
+		Gets all the order queues up to the given number of levels in the book
 
-		for i in asks:
-			if i == None:
-				ask_queues.append(None)
-			else:
-				ask_queues.append(self.getOrdersatlimit(i))	
+		Returns:
+			List: Bid order queues, deepest level first
+			List: Ask order queues, best level first
+		"""
+		bids = self.buy.highestLimits(levels)[::-1]
+		asks = self.sell.lowestLimits(levels)
+
+		bid_queues = [level.order_queue.getOrderqueue() for level in bids]
+		ask_queues = [level.order_queue.getOrderqueue() for level in asks]
 
-		for j in bids:
-			if j == None:
-				bid_queues.append(None)
-			else:
-				bid_queues.append(self.getOrdersatlimit(j))
-	
 		return [bid_queues, ask_queues]
 	
 	def getOrdersatlimit(self, limit):
@@ -330,16 +1021,34 @@ class Book:
 		Returns:
 			list: A list containing all the orders at a given level, index 0 being first in queue
 		"""
-		if self.buy.checkLimit(limit) == True:
-			limit_to_get_queue = self.buy.getLimit(limit)
-		elif self.sell.checkLimit(limit) == True:
+		limit_to_get_queue = self.buy.getLimit(limit)
+		if limit_to_get_queue is None:
 			limit_to_get_queue = self.sell.getLimit(limit)
-		else:
-			self.logger.info("Limit {} does not exist".format(limit))
+		if limit_to_get_queue is None:
+			self.logger.info("Limit %s does not exist", limit)
 			return
 		
 		return limit_to_get_queue.order_queue.getOrderqueue()
 	
+	def queuePosition(self, order_id):
+		"""
+		Gets an order's place in its level's queue in O(log queue length).
+
+		Backed by a Fenwick tree per level over arrival slots, so it stays exact through
+		cancels and partial executions of orders ahead.
+
+		Args:
+			order_id (int): ID of a resting order.
+
+		Returns:
+			tuple: (rank, shares ahead), rank 0 at the front of the queue; None if the
+				order is not resting in the book.
+		"""
+		order = self.orders.get(order_id)
+		if order is None or order.limit is None:
+			return None
+		return order.limit.order_queue.position(order)
+
 	def getVisibleExecutions(self, split):
 		"""
 		Pull all executions recorded
@@ -350,6 +1059,7 @@ class Book:
 		"""
 		split = split
 		visible_executions = pd.DataFrame(self.visible_executions, columns=['Time', 'ID', 'Price', 'Shares', 'Direction'])
+		visible_executions['Time'] = toClockTime(visible_executions['Time'])
 		
 		if split == True:
 			visible_sells = visible_executions[visible_executions['Direction']==-1]
@@ -368,6 +1078,7 @@ class Book:
 		"""
 		split = split
 		hidden_executions = pd.DataFrame(self.hidden_executions, columns=['Time', 'Price', 'Shares', 'Direction'])
+		hidden_executions['Time'] = toClockTime(hidden_executions['Time'])
 		
 		if split == True:
 			hidden_sells = hidden_executions[hidden_executions['Direction']==-1]
@@ -392,16 +1103,37 @@ class Book:
 		merged_executions = pd.concat([hidden, visible]).sort_values(by='Time')
 		return merged_executions
 	
+	def getOrderLife(self, order_id):
+		"""
+		Gets every recorded event for one order from the journal
+
+		Returns:
+			list: [time, shares, type] for each event, submission first
+		"""
+		return self.journal.history(order_id)
+
+	def getOrderLifetimes(self):
+		"""
+		Lifetime, executed/cancelled shares and fill ratio of every order submitted
+
+		Returns:
+			DataFrame: One row per order ID, see OrderJournal.lifetimes
+		"""
+		return self.journal.lifetimes()
+
 	def getSubmissions(self):
 		submissions = pd.DataFrame(self.submissions, columns=['Time', 'ID', 'Price', 'Shares', 'Direction'])
+		submissions['Time'] = toClockTime(submissions['Time'])
 		return submissions
 
 	def getDeletions(self):
 		deletions = pd.DataFrame(self.deletions, columns=['Time', 'ID', 'Price', 'Shares', 'Direction'])
+		deletions['Time'] = toClockTime(deletions['Time'])
 		return deletions
 
 	def getCancellations(self):
 		cancelations = pd.DataFrame(self.cancelations, columns=['Time', 'ID', 'Price', 'Shares', 'Direction'])
+		cancelations['Time'] = toClockTime(cancelations['Time'])
 		return cancelations
 	
 
@@ -412,111 +1144,23 @@ class Book:
 
 	def formatBook(self, start_from, levels):
 		"""
-		Helper method to take the book snapshot list and format it to match the LOBSTER output
+		Helper method to take the book snapshot store and format it to match the LOBSTER output
 
 		Returns:
 			DataFrame: DF in the same format as Lobster
 		"""
-		levels = levels
-		start_from = start_from
-		book_stripped, self.time = self.stripTime(self.book_snapshot)
-		symetric_book = self.symetricBook(book_stripped, self.time)
-		book = self.outputBook(symetric_book, start_from, levels)
-		return book
+		return self.outputBook(start_from, levels)
 	
-	def  stripTime(self, book_snapshot):
-		"""
-		Take the orderbook snapshot list and seperate the order info and time stamps
-
-		Returns:
-			[List]: nested list of only price, volume, and orders after each event
-			[List]: Time stamps associated with each event
-		"""
-		book = []
-		time = []
-		for i in range(len(book_snapshot)):
-			book.append(book_snapshot[i][0])
-			time.append(book_snapshot[i][1])
-		return book, time
-
-	def symetricBook(self, book_stripped, time_list):
+	def outputBook(self, start_from, levels):
 		"""
-		Takes the orderbook only data and formats it to keep only 5 levels at any time
-		If, for example, there are only 2 levels with orders, the reamining 3 levels 
-		are filled with [0, 0, 0]
-
-		Returns:
-			[List]: nested list of 5 levels on each side of order book
-		"""
-
-		symetric_book = []
-		count = 0
-		for x in book_stripped:
-			bid = x[0]
-			ask = x[1]
-
-			if len(bid) <= 5:
-				bid = bid[::-1]
-				for y in range((5-len(bid))):
-					bid.append([0, 0, 0])
-			elif len(bid) > 5:
-				bid = bid[::-1]
-				bid = bid[:5]
-			
-			if len(ask) <= 5:
-				for z in range((5-len(ask))):
-					ask.append([0, 0, 0])
-			elif len(ask) > 5:
-				ask = ask[:5]
-			time = time_list[count]
-
-			symetric_book.append([time, ask, bid])
-			count += 1
-
-		return symetric_book
-	
-	def outputBook(self, symetric_book, start_from, levels):
-		"""
-		Takes symetrical nested list and coverts to DF correctly labeled
+		Reshapes the snapshot store into a DF correctly labeled
 
 		Returns:
 			DataFrame: LOBSTER formatted df
 		"""
-		
-		colnames = ['Ask_1','Ask_1_Vol','Ask_1_Ord',
-			  		'Bid_1','Bid_1_Vol','Bid_1_Ord',
-					'Ask_2','Ask_2_Vol','Ask_2_Ord',
-					'Bid_2','Bid_2_Vol','Bid_2_Ord',
-					'Ask_3','Ask_3_Vol','Ask_3_Ord',
-					'Bid_3','Bid_3_Vol','Bid_3_Ord',
-					'Ask_4','Ask_4_Vol','Ask_4_Ord',
-					'Bid_4','Bid_4_Vol','Bid_4_Ord',
-					'Ask_5','Ask_5_Vol','Ask_5_Ord',
-					'Bid_5','Bid_5_Vol','Bid_5_Ord']
-		df_rows = []
-		idx = []
-		for snap_shot in symetric_book:
-			idx.append(snap_shot[0])
-			ask = snap_shot[1]
-			bid = snap_shot[2]
-			df_row = []
-			for level in range(len(ask)):
-				df_row.append(ask[level])
-				df_row.append(bid[level])
-			a = np.array(df_row)
-			a = a.flatten()
-			a = list(a)
-			df_rows.append(a)
-
-		df_rows = df_rows[start_from:]
-		time = idx
-		time = time[start_from:]
-
-		cols_to_drop = [x for x in range((6*levels), 30)]
-
-		my_output = pd.DataFrame(df_rows, columns = colnames)
-		my_output['Time'] = time
-		my_output = my_output.drop(my_output.columns[cols_to_drop],axis=1)
+		my_output = pd.DataFrame(self.book_snapshot.table(start_from, levels), columns=list(bookColumns(levels)), copy=False)
+		times = self.book_snapshot.times[start_from:self.book_snapshot.size]
+		my_output['Time'] = toClockTime(times)
 		
 		return my_output
 	
@@ -530,19 +1174,37 @@ class Book:
 
 		levels = int(len(formatted_book.columns)/6)
 
-		asks_to_drop = []
-		bids_to_drop = []
-		for i in range(levels):
-			asks_to_drop += ['Ask_{}'.format(i+1),'Ask_{}_Vol'.format(i+1),'Ask_{}_Ord'.format(i+1)]
-			bids_to_drop += ['Bid_{}'.format(i+1),'Bid_{}_Vol'.format(i+1),'Bid_{}_Ord'.format(i+1)]
+		asks = formatted_book.drop(columns=list(sideColumns('Bid', levels)))
+		bids = formatted_book.drop(columns=list(sideColumns('Ask', levels)))
+
+		return bids, asks
 
-		asks = formatted_book
-		bids = formatted_book
+	def lobsterBook(self, start_from, levels):
+		"""
+		Gets the recorded snapshots in exactly the layout of a LOBSTER orderbook_N.csv
 
-		asks = asks.drop(columns=bids_to_drop)
-		bids = bids.drop(columns=asks_to_drop)
+		Prices are LOBSTER integers (dollars x 10000, or the book's own integer ticks),
+		missing levels are padded with 9999999999 / -9999999999 and size 0, and there is no
+		time column, so book.lobsterBook(0, 50).to_csv(path, header=False, index=False)
+		writes a file comparable line by line with orderbook_50.csv.
 
-		return bids, asks
+		Returns:
+			DataFrame: 4 * levels columns named as in lobsterColumns
+		"""
+		table = self.book_snapshot.table(start_from, levels)
+		rows = len(table)
+		# (rows, level, side, field) with side ask/bid and field price/volume
+		levels_view = table.reshape(rows, levels, 2, 3)[..., :2]
+		prices = levels_view[..., 0]
+		if self.tick_size is None:
+			prices = prices * 10000
+		output = np.empty((rows, levels, 2, 2), dtype=np.int64)
+		output[..., 0] = np.round(prices)
+		output[..., 1] = np.round(levels_view[..., 1])
+		empty = output[..., 1] == 0
+		output[..., 0, 0][empty[..., 0]] = EMPTY_ASK
+		output[..., 1, 0][empty[..., 1]] = EMPTY_BID
+		return pd.DataFrame(output.reshape(rows, 4 * levels), columns=list(lobsterColumns(levels)))
 	
 	def getMid(self, bids, asks):
 		"""
@@ -558,19 +1220,23 @@ class Book:
 	
 	def getQueues(self, start_from, level):
 		"""
-		Get the queue lengths and orders in each queue for either 1 or 5 levels
+		Get the queue lengths and orders in each queue for the top `level` levels
+
+		Levels deeper than the snapshot policy's queue_depth were not recorded and come
+		back empty with length 0.
 
 		Returns:
 			DataFrame: Bid queues and their lengths 
 			DataFrame: Ask queues and their lengths 
 		"""
 
-		bid_queues, ask_queues = self.formatQueues()
-		bid_queues['Time'] = self.event_times
-		ask_queues['Time'] = self.event_times
+		bid_queues, ask_queues = self.formatQueues(level)
+		queue_times = toClockTime([q[1] for q in self.queues])
+		bid_queues['Time'] = queue_times
+		ask_queues['Time'] = queue_times
 
-		bid_queue_lens = self.queueFromatHelper(bid_queues['Bid_Q_lens'])
-		ask_queue_lens = self.queueFromatHelper(ask_queues['Ask_Q_lens'])
+		bid_queue_lens = self.queueFromatHelper(bid_queues['Bid_Q_lens'], level)
+		ask_queue_lens = self.queueFromatHelper(ask_queues['Ask_Q_lens'], level)
 
 		bid_queues = pd.concat([bid_queues, bid_queue_lens], axis=1).drop(columns=['Bid_Q_lens'])
 		ask_queues = pd.concat([ask_queues, ask_queue_lens], axis=1).drop(columns=['Ask_Q_lens'])
@@ -578,92 +1244,49 @@ class Book:
 		bid_queues = bid_queues[start_from:]
 		ask_queues = ask_queues[start_from:]
 
-		if level == 1:
-			bid_queues = bid_queues.drop(columns=['Bid_5', 'Bid_4', 'Bid_3', 'Bid_2', 'l5', 'l4', 'l3', 'l2'])
-			ask_queues = ask_queues.drop(columns=['Ask_5', 'Ask_4', 'Ask_3', 'Ask_2', 'l5', 'l4', 'l3', 'l2'])
-			return bid_queues, ask_queues
-		else:
-			return bid_queues, ask_queues
+		return bid_queues, ask_queues
 		
-	def queueFromatHelper(self, data):
-		l1 = []
-		l2 = []
-		l3 = []
-		l4 = []
-		l5 = []
-		for x in range(len(data)):
-			l1.append(data[x][-1])
-			l2.append(data[x][-2])
-			l3.append(data[x][-3])
-			l4.append(data[x][-4])
-			l5.append(data[x][-5])
+	def queueFromatHelper(self, data, levels=5):
+		"""
+		Splits per-row queue length lists into one column per level by array slicing.
 
-		return pd.DataFrame({"l1":l1, "l2":l2, "l3":l3, "l4":l4, "l5":l5})
+		Args:
+			data (Series): [len of deepest level ... len Bid_1] (or asks) per row, best level last.
+			levels (int): Number of levels in each list.
 
+		Returns:
+			DataFrame: l1 (best) to l<levels> queue lengths per row.
+		"""
+		if len(data) == 0:
+			return pd.DataFrame({"l{}".format(k): [] for k in range(1, levels+1)})
+		lens = np.array(data.tolist())
+		return pd.DataFrame({"l{}".format(k): lens[:, -k] for k in range(1, levels+1)})
 
-	def formatQueues(self):
+	def formatQueues(self, levels=5):
 		"""
-		Get the queue lengths and orders in each queue for 5 price levels
+		Get the queue lengths and orders in each queue for the top `levels` price levels
+
+		Queues keep the order they were recorded in: bids deepest level first, asks best
+		level first. Sides with fewer levels are padded at the front with None and length 0,
+		and recorded levels beyond the best `levels` are dropped. A queue holding a single
+		order is a flat [id, price, shares] and counts as 1.
 
 		Returns:
-			DataFrame: L5 Bid queues and their lengths 
-			DataFrame: L5 Ask queues and their lengths 
+			DataFrame: Bid queues and their lengths 
+			DataFrame: Ask queues and their lengths 
 		"""
 		formatted_bid_queues = []
 		formatted_ask_queues = []
-		
-		for i in self.queues:
-			entire_book = i[0]
-			bid_qs = entire_book[0]
-			ask_qs = entire_book[1]
-			symetric_bids = []
-			symetric_asks = []
-			bid_lens = []
-			ask_lens = []
-
-			if len(bid_qs) != 5:
-				for a in range(5-len(bid_qs)):
-					symetric_bids.append(None)
-					bid_lens.append(0)
-				for b in bid_qs:
-					symetric_bids.append(b)
-					if type(b[0]) != list:
-						bid_lens.append(1)
-					else:
-						bid_lens.append(len(b))
-			else:
-				for c in bid_qs:
-					symetric_bids.append(c)
-					if type(c[0]) != list:
-						bid_lens.append(1)
-					else:
-						bid_lens.append(len(c))
-			symetric_bids.append(bid_lens)
-
-			if len(ask_qs) != 5:
-				for x in range(5-len(ask_qs)):
-					symetric_asks.append(None)
-					ask_lens.append(0)
-				for y in ask_qs:
-					symetric_asks.append(y)
-					if type(y[0]) != list:
-						ask_lens.append(1)
-					else:
-						ask_lens.append(len(y))
-			else:
-				for z in ask_qs:
-					symetric_asks.append(z)
-					if type(z[0]) != list:
-						ask_lens.append(1)
-					else:
-						ask_lens.append(len(z))
-			symetric_asks.append(ask_lens)
-
-			formatted_bid_queues.append(symetric_bids)
-			formatted_ask_queues.append(symetric_asks)
-
-		bid_queues = pd.DataFrame(formatted_bid_queues, columns = ['Bid_5', 'Bid_4', 'Bid_3', 'Bid_2', 'Bid_1', 'Bid_Q_lens'])
-		ask_queues = pd.DataFrame(formatted_ask_queues, columns = ['Ask_5', 'Ask_4', 'Ask_3', 'Ask_2', 'Ask_1', 'Ask_Q_lens'])
+		for entire_book, _ in self.queues:
+			bid_qs = entire_book[0][-levels:] if len(entire_book[0]) > levels else entire_book[0]
+			ask_qs = entire_book[1][:levels]
+			for side_qs, formatted in ((bid_qs, formatted_bid_queues), (ask_qs, formatted_ask_queues)):
+				pad = levels - len(side_qs)
+				lens = [0] * pad + [len(q) if type(q[0]) == list else 1 for q in side_qs]
+				formatted.append([None] * pad + side_qs + [lens])
+
+		bid_queues = pd.DataFrame(formatted_bid_queues, columns = list(queueColumns('Bid', levels)))
+		ask_queues = pd.DataFrame(formatted_ask_queues, columns = list(queueColumns('Ask', levels)))
 		return bid_queues, ask_queues
 	
 ##############
@@ -672,59 +1295,64 @@ class Book:
 
 	def groupAttributes(self, bids, asks):
 		"""
-		This function takes bid and ask attributes (side, vol, level, time) and creates a df containing 
-		lists of each for each time increment.
+		This function takes bid and ask attributes (side, vol, level, time) and creates a df
+		in long format for graphing: for each time increment the bid levels (deepest
+		first) followed by the ask levels (best first).
+
+		The depth is that of the frames, as split by splitBidsAsks. The wide level columns
+		are stacked into (rows, levels) arrays and raveled, so no row is accessed on its own.
 
 		Returns:
 			DataFrame: grouped attributes of the book at each time increment
 		"""
+		levels = sum(1 for column in bids.columns if column.endswith('_Vol'))
+		b_levels = range(levels, 0, -1)
+		a_levels = range(1, levels + 1)
+		b_name = ['Best Best' if k == 1 else 'Bid {}'.format(k) for k in b_levels]
+		a_name = ['Best ask' if k == 1 else 'Ask {}'.format(k) for k in a_levels]
+		rows = len(bids)
+
+		bid_vols = bids[['Bid_{}_Vol'.format(k) for k in b_levels]].to_numpy()
+		bid_prices = bids[['Bid_{}'.format(k) for k in b_levels]].to_numpy()
+		ask_vols = asks[['Ask_{}_Vol'.format(k) for k in a_levels]].to_numpy()
+		ask_prices = asks[['Ask_{}'.format(k) for k in a_levels]].to_numpy()
+
+		return self.longFormat(bids['Time'].to_numpy(),
+							bid_vols, np.broadcast_to(np.array(b_name, dtype=object), (rows, levels)), bid_prices,
+							ask_vols, np.broadcast_to(np.array(a_name, dtype=object), (rows, levels)), ask_prices)
 
-		b_name = ['Bid 5', 'Bid 4', 'Bid 3', 'Bid 2', 'Best Best']
-		a_name = ['Best ask', 'Ask 2', 'Ask 3', 'Ask 4', 'Ask 5']
-
-		transpose_bids = []
-		transpose_asks = []
-
-		for i in range(len(bids)):
-
-			bid_time = bids.iloc[i]['Time']
-			bid_prices = [bids.iloc[i].Bid_5, bids.iloc[i].Bid_4, bids.iloc[i].Bid_3, bids.iloc[i].Bid_2, bids.iloc[i].Bid_1]
-			bid_vols = [bids.iloc[i].Bid_5_Vol, bids.iloc[i].Bid_4_Vol, bids.iloc[i].Bid_3_Vol, bids.iloc[i].Bid_2_Vol, bids.iloc[i].Bid_1_Vol]
-			bid_levels = b_name
-			transpose_bids.append([bid_time, bid_vols, bid_prices, bid_levels])
+	def flattenBook(self, transpose_bids, transpose_asks):
+		"""
+		Squash each row of per-time bid and ask lists (Time, *_vol, *_Prices, *_level) into
+		one row per level so we can graph the output
 
-			ask_time = asks.iloc[i]['Time']
-			ask_prices = [asks.iloc[i].Ask_1, asks.iloc[i].Ask_2, asks.iloc[i].Ask_3, asks.iloc[i].Ask_4, asks.iloc[i].Ask_5]
-			ask_vols = [asks.iloc[i].Ask_1_Vol, asks.iloc[i].Ask_2_Vol, asks.iloc[i].Ask_3_Vol, asks.iloc[i].Ask_4_Vol, asks.iloc[i].Ask_5_Vol]
-			ask_levels = a_name
-			transpose_asks.append([ask_time, ask_vols, ask_prices, ask_levels])
+		Every row's lists must have the same length.
 
-		transpose_bids = pd.DataFrame(transpose_bids, columns=['Time','Bid_vol','Bid_Prices','Bid_level'])
-		transpose_asks = pd.DataFrame(transpose_asks, columns=['Time','Ask_vol','Ask_Prices','Ask_level'])
+		Returns:
+			DataFrame: transposed book to graph with
+		"""
+		def stacked(frame, column):
+			return np.array(frame[column].tolist(), dtype=object).reshape(len(frame), -1)
 
-		flat_book = self.flattenBook(transpose_bids, transpose_asks)
-		return flat_book
+		return self.longFormat(transpose_bids['Time'].to_numpy(),
+							stacked(transpose_bids, 'Bid_vol'), stacked(transpose_bids, 'Bid_level'), stacked(transpose_bids, 'Bid_Prices'),
+							stacked(transpose_asks, 'Ask_vol'), stacked(transpose_asks, 'Ask_level'), stacked(transpose_asks, 'Ask_Prices'))
 
-	def flattenBook(self, transpose_bids, transpose_asks):
+	def longFormat(self, times, bid_vols, bid_names, bid_prices, ask_vols, ask_names, ask_prices):
 		"""
-		Squash each row in the above method by time so we can graph the output
+		Melts (rows, levels) arrays of each side into the long graphing frame.
 
 		Returns:
-			DataFrame: transposed book to graph with
+			DataFrame: Time, Vol, Level, Price, Side; per row the bid levels then the ask levels.
 		"""
-		flattened_limits = []
-		for i in range(len(transpose_bids)):
-			ts = transpose_bids.iloc[i]['Time']
-			bs = transpose_bids.iloc[i]['Bid_vol']
-			ns = transpose_bids.iloc[i]['Bid_level']
-			ps = transpose_bids.iloc[i]['Bid_Prices']
-			for j in range(len(bs)):
-				flattened_limits.append([ts, bs[j], ns[j], ps[j], 'Bid'])
-			bs = transpose_asks.iloc[i]['Ask_vol']
-			ns = transpose_asks.iloc[i]['Ask_level']
-			ps = transpose_asks.iloc[i]['Ask_Prices']
-			for k in range(len(bs)):
-				flattened_limits.append([ts, bs[k], ns[k], ps[k], 'Ask'])
-
-		flattened_limits = pd.DataFrame(flattened_limits, columns=['Time', 'Vol', 'Level', 'Price', 'Side'])
+		bid_count = bid_vols.shape[1]
+		per_row = bid_count + ask_vols.shape[1]
+		sides = np.array(['Bid'] * bid_count + ['Ask'] * (per_row - bid_count), dtype=object)
+		flattened_limits = pd.DataFrame({'Time': np.repeat(times, per_row),
+			'Vol': np.concatenate([bid_vols, ask_vols], axis=1).ravel(),
+			'Level': np.concatenate([bid_names, ask_names], axis=1).ravel(),
+			'Price': np.concatenate([bid_prices, ask_prices], axis=1).ravel(),
+			'Side': np.tile(sides, len(times))})
+		if flattened_limits['Vol'].dtype == object:
+			flattened_limits = flattened_limits.infer_objects()
 		return flattened_limits
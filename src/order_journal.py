@@ -0,0 +1,147 @@
+from array import array
+import numpy as np
+import pandas as pd
+
+class OrderJournal:
+	"""
+	Append-only columnar log of every order lifecycle event.
+
+	Each column is a typed array and appending does nothing else: no per-order
+	bookkeeping is kept while events are recorded. The first lookup sorts the row numbers
+	by order ID once (a stable argsort, so each order's rows stay oldest first) and later
+	lookups binary search that index. Rows appended after it was built are found by a
+	vectorized scan of the unindexed tail, and the index is rebuilt once that tail has
+	grown longer than the indexed part, so sorting costs stay amortized.
+
+	Attributes:
+		order_id (array): Order ID per row.
+		time (array): Event time per row, seconds after midnight.
+		event_type (array): LOBSTER event type per row.
+		shares (array): Shares in the event.
+		remaining (array): Shares left on the order after the event.
+		sorted_rows (ndarray): Indexed row numbers ordered by order ID, None until the first lookup.
+		sorted_ids (ndarray): Order ID of each entry of sorted_rows.
+	"""
+
+	def __init__(self):
+		"""Initializes a new, empty OrderJournal."""
+		self.order_id = array('q')
+		self.time = array('d')
+		self.event_type = array('b')
+		self.shares = array('q')
+		self.remaining = array('q')
+		self.sorted_rows = None
+		self.sorted_ids = None
+
+	def __len__(self):
+		return len(self.order_id)
+
+	def append(self, order_id, time, event_type, shares, remaining):
+		"""
+		Records one lifecycle event.
+
+		Args:
+			order_id (int): Order the event applies to.
+			time (float): Event time in seconds after midnight.
+			event_type (int): LOBSTER event type.
+			shares (int): Shares in the event.
+			remaining (int): Shares left on the order afterwards.
+		"""
+		# int() so rows built from float-typed DataFrame rows still fit the integer columns
+		self.order_id.append(int(order_id))
+		self.time.append(time)
+		self.event_type.append(event_type)
+		self.shares.append(int(shares))
+		self.remaining.append(int(remaining))
+
+	def rows(self, order_id):
+		"""
+		Gets the rows recorded for one order, oldest first.
+
+		Args:
+			order_id (int): Order to look up.
+
+		Returns:
+			list: Row numbers, empty if the order was never seen.
+		"""
+		ids = np.frombuffer(self.order_id, dtype=np.int64)
+		indexed = 0 if self.sorted_rows is None else len(self.sorted_rows)
+		if self.sorted_rows is None or len(ids) - indexed > indexed:
+			self.reindex(ids)
+			indexed = len(ids)
+		lo = np.searchsorted(self.sorted_ids, order_id, side='left')
+		hi = np.searchsorted(self.sorted_ids, order_id, side='right')
+		found = self.sorted_rows[lo:hi].tolist()
+		if indexed < len(ids):
+			found.extend((np.flatnonzero(ids[indexed:] == order_id) + indexed).tolist())
+		return found
+
+	def reindex(self, ids):
+		"""
+		Rebuilds the order ID index over every row recorded so far.
+
+		Args:
+			ids (ndarray): The order_id column.
+		"""
+		self.sorted_rows = np.argsort(ids, kind='stable')
+		self.sorted_ids = ids[self.sorted_rows]
+
+	def history(self, order_id):
+		"""
+		Gets one order's lifecycle.
+
+		Args:
+			order_id (int): Order to look up.
+
+		Returns:
+			list: [time, shares, type] for each event, oldest first.
+		"""
+		return [[self.time[r], self.shares[r], self.event_type[r]] for r in self.rows(order_id)]
+
+	def columns(self):
+		"""
+		Gets zero-copy NumPy views of the journal columns.
+
+		Returns:
+			dict: Column name to ndarray.
+		"""
+		return {'order_id': np.frombuffer(self.order_id, dtype=np.int64),
+				'time': np.frombuffer(self.time, dtype=np.float64),
+				'event_type': np.frombuffer(self.event_type, dtype=np.int8),
+				'shares': np.frombuffer(self.shares, dtype=np.int64),
+				'remaining': np.frombuffer(self.remaining, dtype=np.int64)}
+
+	def toFrame(self):
+		"""
+		Returns the journal as a DataFrame, one row per event.
+		"""
+		if len(self) == 0:
+			return pd.DataFrame({name: [] for name in ('order_id', 'time', 'event_type', 'shares', 'remaining')})
+		return pd.DataFrame(self.columns())
+
+	def lifetimes(self):
+		"""
+		Summarises every order that was submitted during the journal.
+
+		Returns:
+			DataFrame: Indexed by order ID with entry and end time, lifetime in seconds
+				(NaN while the order is still resting), submitted, executed and cancelled
+				shares, and fill ratio (executed / submitted).
+		"""
+		journal = self.toFrame()
+		submitted = journal[journal['event_type'] == 1].set_index('order_id')
+		grouped = journal.groupby('order_id')
+
+		ended = journal[journal['remaining'] == 0].groupby('order_id')['time'].min()
+		executed = journal['shares'].where(journal['event_type'] == 4, 0).groupby(journal['order_id']).sum()
+		cancelled = journal['shares'].where(journal['event_type'] == 2, 0).groupby(journal['order_id']).sum()
+
+		summary = pd.DataFrame({'entry_time': submitted['time'],
+								'end_time': ended.reindex(submitted.index),
+								'submitted': submitted['shares'],
+								'executed': executed.reindex(submitted.index),
+								'cancelled': cancelled.reindex(submitted.index),
+								'events': grouped.size().reindex(submitted.index)})
+		summary['lifetime'] = summary['end_time'] - summary['entry_time']
+		summary['fill_ratio'] = summary['executed'] / summary['submitted']
+		return summary
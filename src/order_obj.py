@@ -1,36 +1,43 @@
-import copy
-
 class Order:
 	"""
 	Represents an order in the limit order book.
 
+	Orders use __slots__ since millions can be resident at once. Their lifecycle
+	is kept in the book's OrderJournal rather than on the order.
+
 	Attributes:
 		entryTime (object): The time when the order was entered.
-		type (object): The type of the order.
 		id (object): The unique identifier of the order.
 		shares (object): The number of shares in the order.
 		price (object): The price of the order.
 		direction (object): The direction of the order.
 		next (Order): Reference to the next order in the linked list.
 		prev (Order): Reference to the previous order in the linked list.
-		life (list): Each event following submission recorded here
+		limit (Limit): The price level the order is resting at, None once removed from the book.
+		slot (int): The order's arrival slot in its level's queue index.
 	"""
-	def __init__(self, data):
+	__slots__ = ('entryTime', 'id', 'shares', 'price', 'direction', 'next', 'prev', 'limit', 'slot')
+
+	def __init__(self, time, order_id, shares, price, direction):
 		"""
 		Initializes a new instance of Order.
 
 		Args:
-			data (list): A list containing order data.
+			time (float): Submission time in seconds after midnight.
+			order_id (int): Unique identifier of the order.
+			shares (int): Number of shares in the order.
+			price (float): Limit price of the order.
+			direction (int): 1 for buy, -1 for sell.
 		"""
-		self.entryTime = copy.copy(data.time)
-		# self.type = copy.copy(data.type)
-		self.id = copy.copy(data.order_id)
-		self.shares = copy.copy(data.shares)
-		self.price = copy.copy(data.price)
-		self.direction = copy.copy(data.direction)
+		self.entryTime = time
+		self.id = order_id
+		self.shares = shares
+		self.price = price
+		self.direction = direction
 		self.next = None
 		self.prev = None
-		self.life = []
+		self.limit = None
+		self.slot = None
 
 	def getOrder(self):
 		"""
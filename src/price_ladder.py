@@ -0,0 +1,315 @@
+import limit_bst as tree
+import log
+
+logger = log.get_logger('Price Ladder')
+
+class PriceLadder(tree.BinarySearchTree):
+	"""
+	One side of the book on integer tick prices: a dense array of levels around the best
+	price, with the balanced tree holding only the levels outside it.
+
+	A level inside the window of `window` ticks lives only in slots, at index
+	(price - base) // tick_size, so creating, finding and removing it is a list index
+	rather than a tree descent and rebalance. The lowest and highest occupied slots are
+	tracked as levels come and go, so the best level is known without a search. Prices
+	outside the window, or off the tick grid, are kept in the inherited tree, and
+	walks in price order merge the two.
+
+	The window is recentered on the side's best price only when that price leaves it:
+	a new level better than anything in the window, or the window emptying while deeper
+	levels remain in the tree. Levels are then moved between the array and the tree.
+
+	Attributes:
+		tick_size (int): Price increment between adjacent slots.
+		window (int): Number of slots in the dense array.
+		direction (int): 1 for the bid side (best is highest), -1 for the ask side.
+		base (int): Price of slot 0, None until the first level arrives.
+		top (int): Price just past the last slot.
+		slots (list): Levels in the window indexed by tick offset from base, None where empty.
+		low (int): Lowest occupied slot, None when the window is empty.
+		high (int): Highest occupied slot, None when the window is empty.
+		size (int): Number of levels on the side, in the window and in the tree.
+	"""
+
+	def __init__(self, tick_size, window, direction=1):
+		"""
+		Initializes a new, empty instance of PriceLadder.
+
+		Args:
+			tick_size (int): Price increment between adjacent slots.
+			window (int): Number of slots in the dense array.
+			direction (int): 1 for the bid side, -1 for the ask side.
+		"""
+		super().__init__()
+		self.tick_size = tick_size
+		self.window = window
+		self.direction = direction
+		self.base = None
+		self.top = None
+		self.slots = [None] * window
+		self.low = None
+		self.high = None
+
+	def slotIndex(self, limit):
+		"""
+		Maps a price to its slot in the window.
+
+		Args:
+			limit (int): The price to map.
+
+		Returns:
+			int: The slot index, None if the price is outside the window or off the tick grid.
+		"""
+		if self.base is None:
+			return None
+		index, remainder = divmod(limit - self.base, self.tick_size)
+		if remainder or index < 0 or index >= self.window:
+			return None
+		return index
+
+	def getLimit(self, limit):
+		"""
+		Gets the limit object for the given limit price.
+
+		Args:
+			limit (int): The price of the limit to be retrieved.
+
+		Returns:
+			Limit: The limit object if found, None otherwise.
+		"""
+		base = self.base
+		if base is not None:
+			index, remainder = divmod(limit - base, self.tick_size)
+			if not remainder and 0 <= index < self.window:
+				return self.slots[index]
+		return super().getLimit(limit)
+
+	def addLimit(self, new_order):
+		"""
+		Adds a new level holding new_order to its slot, or to the tree outside the window.
+
+		Args:
+			new_order (Order): The order object to be added.
+
+		Returns:
+			Limit: The level the order was added to.
+		"""
+		price = new_order.price
+		if self.base is None:
+			self.recenter(price)
+		index = self.slotIndex(price)
+		if index is None:
+			size = self.size
+			new_limit = super().addLimit(new_order)
+			# a new level better than the whole window, or on an empty window, is the new best price
+			if self.size != size and (self.low is None or ((price >= self.top) if self.direction == 1 else (price < self.base))):
+				self.recenter(price)
+			return new_limit
+
+		new_limit = self.slots[index]
+		if new_limit is not None:
+			new_limit.addOrderHelper(new_order)
+			return new_limit
+		new_limit = tree.Limit(price)
+		new_limit.addOrderHelper(new_order)
+		self.slots[index] = new_limit
+		if self.low is None:
+			self.low = self.high = index
+		elif index < self.low:
+			self.low = index
+		elif index > self.high:
+			self.high = index
+		self.size += 1
+		return new_limit
+
+	def removeLimit(self, node):
+		"""
+		Removes the given level from its slot, or from the tree if it is outside the window.
+
+		Args:
+			node (Limit): The level to be removed.
+		"""
+		index = self.slotIndex(node.limit_price)
+		if index is None or self.slots[index] is not node:
+			super().removeLimit(node)
+			return
+
+		slots = self.slots
+		slots[index] = None
+		self.size -= 1
+		if self.low == self.high:
+			self.low = self.high = None
+			# the best price has left the window for the tree
+			if self.root is not None:
+				self.recenter(self.max_limit.limit_price if self.direction == 1 else self.min_limit.limit_price)
+		elif index == self.low:
+			index += 1
+			while slots[index] is None:
+				index += 1
+			self.low = index
+		elif index == self.high:
+			index -= 1
+			while slots[index] is None:
+				index -= 1
+			self.high = index
+
+	def recenter(self, center):
+		"""
+		Moves the window so the given price sits in its middle, moving levels between
+		the array and the tree.
+
+		Args:
+			center (int): The price to center on, normally the side's best price.
+		"""
+		levels = [level for level in self.slots if level is not None]
+		levels.extend(super().inOrderTraversal())
+		levels.sort(key=lambda level: level.limit_price)
+
+		self.base = (center // self.tick_size - self.window // 2) * self.tick_size
+		self.top = self.base + self.window * self.tick_size
+		self.slots = [None] * self.window
+		self.low = self.high = None
+		outside = []
+		for level in levels:
+			index = self.slotIndex(level.limit_price)
+			if index is None:
+				outside.append(level)
+				continue
+			level.left_child = level.right_child = level.parent = None
+			level.height = 1
+			self.slots[index] = level
+			if self.low is None:
+				self.low = index
+			self.high = index
+		self.rebuild(outside)
+		self.size = len(levels)
+		logger.info("Ladder recentered on %s, base %s", center, self.base)
+
+	def rebuild(self, levels):
+		"""
+		Replaces the tree with a perfectly balanced one holding levels.
+
+		Args:
+			levels (list): Levels in ascending price order.
+		"""
+		def build(lo, hi, parent):
+			if lo >= hi:
+				return None
+			mid = (lo + hi) // 2
+			node = levels[mid]
+			node.parent = parent
+			node.left_child = build(lo, mid, node)
+			node.right_child = build(mid + 1, hi, node)
+			tree.updateHeight(node)
+			return node
+
+		self.root = build(0, len(levels), None)
+		self.min_limit = levels[0] if levels else None
+		self.max_limit = levels[-1] if levels else None
+
+	def minLimit(self):
+		"""
+		Gets the lowest level holding at least one order.
+
+		Returns:
+			Limit: The lowest non-empty level, None if there is none.
+		"""
+		node = self.min_limit
+		if node is not None and node.num_orders == 0:
+			node = super().minLimit()
+		low = self.low
+		if low is None:
+			return node
+		level = self.slots[low]
+		if node is not None and node.limit_price < level.limit_price:
+			return node
+		return level
+
+	def maxLimit(self):
+		"""
+		Gets the highest level holding at least one order.
+
+		Returns:
+			Limit: The highest non-empty level, None if there is none.
+		"""
+		node = self.max_limit
+		if node is not None and node.num_orders == 0:
+			node = super().maxLimit()
+		high = self.high
+		if high is None:
+			return node
+		level = self.slots[high]
+		if node is not None and node.limit_price > level.limit_price:
+			return node
+		return level
+
+	def lowestLimits(self, x):
+		"""
+		Gets up to x non-empty levels walking up from the lowest price.
+
+		Args:
+			x (int): The number of levels to retrieve.
+
+		Returns:
+			list: Levels in ascending price order.
+		"""
+		elements = []
+		slots = self.slots
+		index = self.low
+		high = self.high if index is not None else -1
+		node = self.min_limit
+		while len(elements) < x:
+			while index is not None and index <= high and slots[index] is None:
+				index += 1
+			slot = slots[index] if index is not None and index <= high else None
+			if node is not None and (slot is None or node.limit_price < slot.limit_price):
+				level = node
+				node = self.successor(node)
+			elif slot is not None:
+				level = slot
+				index += 1
+			else:
+				break
+			if level.num_orders != 0:
+				elements.append(level)
+		return elements
+
+	def highestLimits(self, x):
+		"""
+		Gets up to x non-empty levels walking down from the highest price.
+
+		Args:
+			x (int): The number of levels to retrieve.
+
+		Returns:
+			list: Levels in descending price order.
+		"""
+		elements = []
+		slots = self.slots
+		index = self.high
+		low = self.low if index is not None else self.window
+		node = self.max_limit
+		while len(elements) < x:
+			while index is not None and index >= low and slots[index] is None:
+				index -= 1
+			slot = slots[index] if index is not None and index >= low else None
+			if node is not None and (slot is None or node.limit_price > slot.limit_price):
+				level = node
+				node = self.predecessor(node)
+			elif slot is not None:
+				level = slot
+				index -= 1
+			else:
+				break
+			if level.num_orders != 0:
+				elements.append(level)
+		return elements
+
+	def inOrderTraversal(self):
+		"""
+		Lists every non-empty level, in the window and in the tree.
+
+		Returns:
+			list: Levels in ascending price order.
+		"""
+		return self.lowestLimits(self.size)
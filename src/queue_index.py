@@ -0,0 +1,124 @@
+class QueueIndex:
+	"""
+	Order-statistics index over one level's queue: Fenwick trees of order counts and shares by arrival slot.
+
+	Each order gets the next slot when it joins the back of the queue, so slot order is
+	queue order. Removing an order or reducing its shares is a point update, and the number
+	of orders and shares ahead of a slot is a prefix sum, all O(log capacity). Slots are
+	never reused; when they run out the owning queue renumbers its live orders with
+	rebuild(), which also sizes the index to twice the live count.
+
+	Attributes:
+		counts (list): Fenwick tree (1-based) of live orders per slot.
+		shares (list): Fenwick tree (1-based) of shares per slot.
+		values (list): Shares currently held at each slot, 0 once removed.
+		next_slot (int): Slot given to the next order to join.
+		live (int): Number of orders in the index.
+	"""
+	__slots__ = ('counts', 'shares', 'values', 'next_slot', 'live')
+
+	def __init__(self, capacity=8):
+		"""
+		Initializes a new, empty instance of QueueIndex.
+
+		Args:
+			capacity (int): Number of slots before a rebuild is needed.
+		"""
+		self.counts = [0] * (capacity + 1)
+		self.shares = [0] * (capacity + 1)
+		self.values = [0] * capacity
+		self.next_slot = 0
+		self.live = 0
+
+	def full(self):
+		"""
+		Returns True if every slot has been handed out.
+		"""
+		return self.next_slot == len(self.values)
+
+	def add(self, shares):
+		"""
+		Gives the next slot to an order joining the back of the queue.
+
+		Args:
+			shares (int): Shares of the order.
+
+		Returns:
+			int: The order's slot.
+		"""
+		slot = self.next_slot
+		self.next_slot += 1
+		self.live += 1
+		self.values[slot] = shares
+		self.update(slot, 1, shares)
+		return slot
+
+	def reduce(self, slot, shares):
+		"""
+		Removes shares from the order at slot, e.g. for a partial cancel or execution.
+		"""
+		self.values[slot] -= shares
+		self.update(slot, 0, -shares)
+
+	def remove(self, slot):
+		"""
+		Takes the order at slot, and whatever shares it still holds, out of the index.
+		"""
+		self.update(slot, -1, -self.values[slot])
+		self.values[slot] = 0
+		self.live -= 1
+
+	def update(self, slot, count, shares):
+		"""
+		Adds count orders and shares shares at slot.
+		"""
+		counts = self.counts
+		tree = self.shares
+		size = len(tree)
+		i = slot + 1
+		while i < size:
+			counts[i] += count
+			tree[i] += shares
+			i += i & -i
+
+	def ahead(self, slot):
+		"""
+		Number of orders and shares queued ahead of slot.
+
+		Returns:
+			tuple: (orders ahead, shares ahead).
+		"""
+		counts = self.counts
+		tree = self.shares
+		orders = 0
+		shares = 0
+		i = slot
+		while i > 0:
+			orders += counts[i]
+			shares += tree[i]
+			i -= i & -i
+		return orders, shares
+
+	def rebuild(self, shares):
+		"""
+		Re-indexes the live orders into slots 0..n-1 in O(n) with room for as many again.
+
+		Args:
+			shares (list): Shares of each live order in queue order; order k takes slot k.
+		"""
+		capacity = max(8, 2 * len(shares))
+		counts = [0] * (capacity + 1)
+		tree = [0] * (capacity + 1)
+		for k, value in enumerate(shares, 1):
+			counts[k] = 1
+			tree[k] = value
+		for i in range(1, capacity + 1):
+			parent = i + (i & -i)
+			if parent <= capacity:
+				counts[parent] += counts[i]
+				tree[parent] += tree[i]
+		self.counts = counts
+		self.shares = tree
+		self.values = list(shares) + [0] * (capacity - len(shares))
+		self.next_slot = len(shares)
+		self.live = len(shares)
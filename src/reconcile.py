@@ -0,0 +1,212 @@
+"""
+Streams a LOBSTER message file through a Book and checks the top N levels after every
+event against the matching orderbook_N.csv row.
+
+Both files are read in lockstep chunks and the book's levels are written into a fixed
+buffer that is compared to the orderbook chunk in one vectorized step. The book is a
+Book(retain_history=False) and only counters and the first divergence are kept, so
+the reconciler's own memory is set by chunk_size and N.
+
+The book is seeded from orderbook row 0 (the book after message 0) and compared from
+row 1 on, so files that start mid-day reconcile; --no-seed replays from an empty book.
+
+Usage:
+	python src/reconcile.py MESSAGE_FILE ORDERBOOK_FILE [--levels N] [--chunk-size ROWS] [--no-seed]
+
+Exits with status 1 if any row differs, so it can be used as a regression gate.
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from order_book import Book, EMPTY_ASK, EMPTY_BID
+from snapshot_policy import SnapshotPolicy
+from message_reader import readMessageChunks, readOrderbookChunks, readOrderbookRow
+import log
+
+logger = log.get_logger('Reconcile')
+
+class Reconciler(SnapshotPolicy):
+	"""
+	Snapshot policy that compares the book to LOBSTER orderbook rows instead of storing snapshots.
+
+	After each event the top N levels are written into a row of a fixed buffer laid out like
+	the orderbook file: [Ask_1, Ask_1_Size, Bid_1, Bid_1_Size, Ask_2, ...]. compare() checks
+	the filled rows against a chunk of the orderbook file and empties the buffer, so it must
+	be called at least every chunk_size events; reconcile() replays in chunks of that size.
+
+	Attributes:
+		depth (int): Number of levels per side compared.
+		price_scale (int): Factor from book prices to LOBSTER integer prices, 1 for a tick book.
+		first_row (int): File row number of the first row compared.
+		rows (int): Number of rows compared so far.
+		mismatched_rows (int): Number of rows where any compared level differs.
+		level_errors (ndarray): (2, depth) mismatch counts, ask side first, best level first.
+		first_divergence (dict): Row, time and differing levels of the first mismatch, None if none.
+	"""
+
+	def __init__(self, depth=5, price_scale=10000, chunk_size=100000):
+		"""
+		Initializes a new instance of Reconciler.
+
+		Args:
+			depth (int): Number of levels per side compared.
+			price_scale (int): Factor from book prices to LOBSTER integer prices, 1 for a tick book.
+			chunk_size (int): Number of rows buffered between compare() calls.
+		"""
+		super().__init__(depth, record_queues=False)
+		self.price_scale = price_scale
+		self.buffer = np.full((chunk_size, 4*depth), np.nan)
+		self.times = np.empty(chunk_size)
+		self.filled = 0
+		self.first_row = 0
+		self.rows = 0
+		self.mismatched_rows = 0
+		self.level_errors = np.zeros((2, depth), dtype=np.int64)
+		self.first_divergence = None
+
+	def capture(self, book, event_time):
+		"""
+		Writes the book's top levels into the next buffer row and records no snapshot.
+
+		Returns:
+			None: Nothing is stored by the book.
+
+		Raises:
+			ValueError: If chunk_size events were captured since the last compare().
+		"""
+		if self.filled == len(self.times):
+			raise ValueError('Reconciler buffer is full: call compare() at least every {} events'.format(len(self.times)))
+		row = self.buffer[self.filled]
+		row.fill(np.nan)
+		k = 0
+		for level in book.sell.lowestLimits(self.depth):
+			row[k] = level.limit_price
+			row[k + 1] = level.total_volume
+			k += 4
+		k = 2
+		for level in book.buy.highestLimits(self.depth):
+			row[k] = level.limit_price
+			row[k + 1] = level.total_volume
+			k += 4
+		self.times[self.filled] = event_time
+		self.filled += 1
+		return None
+
+	def compare(self, orderbook):
+		"""
+		Compares the buffered rows to the matching orderbook rows and empties the buffer.
+
+		Args:
+			orderbook (ndarray): Orderbook rows for the buffered events, at least 4*depth columns.
+				Rows beyond the number buffered are ignored.
+		"""
+		n = min(self.filled, len(orderbook))
+		expected = np.asarray(orderbook[:n, :4*self.depth], dtype=np.int64)
+		actual = self.buffer[:n]
+		missing = np.isnan(actual)
+		actual = np.where(missing, 0, actual)
+		actual[:, 0::2] *= self.price_scale
+		actual = np.round(actual).astype(np.int64)
+		actual[:, 0::4][missing[:, 0::4]] = EMPTY_ASK
+		actual[:, 2::4][missing[:, 2::4]] = EMPTY_BID
+
+		# a level differs if its price or size does, unless it is empty on both sides (padding varies)
+		actual_levels = actual.reshape(n, self.depth, 2, 2)
+		expected_levels = expected.reshape(n, self.depth, 2, 2)
+		both_empty = (actual_levels[..., 1] == 0) & (expected_levels[..., 1] == 0)
+		differs = (actual_levels != expected_levels).any(axis=3) & ~both_empty
+		bad_rows = differs.any(axis=(1, 2))
+		self.level_errors += differs.sum(axis=0).T
+		self.mismatched_rows += int(bad_rows.sum())
+		if self.first_divergence is None and bad_rows.any():
+			r = int(np.argmax(bad_rows))
+			self.first_divergence = {'row': self.first_row + self.rows + r,
+									'time': float(self.times[r]),
+									'levels': [{'side': ('ask', 'bid')[s], 'level': int(k) + 1,
+												'expected': expected[r, 4*k + 2*s:4*k + 2*s + 2].tolist(),
+												'actual': actual[r, 4*k + 2*s:4*k + 2*s + 2].tolist()}
+												for k, s in zip(*np.nonzero(differs[r]))]}
+			logger.warning("First divergence at row %s (time %.9f)", self.first_divergence['row'], self.first_divergence['time'])
+		self.rows += n
+		self.filled = 0
+
+	def report(self):
+		"""
+		Summarizes the comparison so far.
+
+		Returns:
+			dict: Rows compared, mismatched rows and rate, the first divergence, and per-level
+				mismatch counts and rates for each side (best level first).
+		"""
+		rows = max(self.rows, 1)
+		return {'rows': self.rows,
+				'levels': self.depth,
+				'mismatched_rows': self.mismatched_rows,
+				'mismatch_rate': self.mismatched_rows / rows,
+				'first_divergence': self.first_divergence,
+				'level_errors': {'ask': self.level_errors[0].tolist(), 'bid': self.level_errors[1].tolist()},
+				'level_error_rates': {'ask': (self.level_errors[0] / rows).tolist(), 'bid': (self.level_errors[1] / rows).tolist()}}
+
+def reconcile(message_path, orderbook_path, levels=5, chunk_size=100000, tick_size=None, seed=True):
+	"""
+	Replays a message file and reconciles every event against its orderbook file.
+
+	Row k of the orderbook file is the book after message k, so neither file is time filtered.
+	A LOBSTER window opens with liquidity already resting, so by default the book is seeded
+	from row 0 (see Book.seedFromOrderbook) and messages and rows are compared from 1 on.
+	Comparison stops at the end of the shorter file.
+
+	Args:
+		message_path (str): LOBSTER message CSV.
+		orderbook_path (str): Matching LOBSTER orderbook_N.csv with N >= levels.
+		levels (int): Number of levels per side compared.
+		chunk_size (int): Rows read from each file per step.
+		tick_size (int): If given, the book runs on integer tick prices (see Book).
+		seed (bool): Seed the book from orderbook row 0; False replays from an empty book.
+
+	Returns:
+		dict: Reconciler.report() plus replay throughput.
+	"""
+	price_scale = None if tick_size is not None else 10000
+	reconciler = Reconciler(levels, price_scale or 1, chunk_size)
+	book = Book(tick_size=tick_size, snapshot_policy=reconciler, retain_history=False)
+	messages = readMessageChunks(message_path, chunk_size, start_time=-np.inf, end_time=np.inf, price_scale=price_scale)
+	orderbooks = readOrderbookChunks(orderbook_path, chunk_size, levels)
+
+	events = 0
+	seconds = 0.0
+	for chunk, orderbook in zip(messages, orderbooks):
+		if seed and reconciler.first_row == 0:
+			# row 0 is the book after message 0, so replay and compare from 1
+			book.seedFromOrderbook(readOrderbookRow(orderbook_path, 0), time=float(chunk[0][0]), price_scale=price_scale)
+			chunk = [column[1:] for column in chunk]
+			orderbook = orderbook[1:]
+			reconciler.first_row = 1
+		n = min(len(chunk[0]), len(orderbook))
+		stats = book.replay([column[:n] for column in chunk], start_index=reconciler.first_row + events)
+		reconciler.compare(orderbook)
+		events += stats['events']
+		seconds += stats['seconds']
+		if n < len(chunk[0]):
+			break
+
+	report = reconciler.report()
+	report.update({'events': events, 'seeded': reconciler.first_row == 1, 'events_per_sec': events / seconds if seconds > 0 else 0})
+	return report
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Reconcile a replayed book against a LOBSTER orderbook file.')
+	parser.add_argument('message_file')
+	parser.add_argument('orderbook_file')
+	parser.add_argument('--levels', type=int, default=5)
+	parser.add_argument('--chunk-size', type=int, default=100000)
+	parser.add_argument('--tick-size', type=int, default=None)
+	parser.add_argument('--no-seed', action='store_true', help='replay from an empty book instead of seeding from row 0')
+	args = parser.parse_args()
+	result = reconcile(args.message_file, args.orderbook_file, args.levels, args.chunk_size, args.tick_size, not args.no_seed)
+	print(json.dumps(result, indent=2))
+	sys.exit(1 if result['mismatched_rows'] else 0)
@@ -0,0 +1,140 @@
+class SnapshotPolicy:
+	"""
+	Decides when the book records a snapshot and how many levels it keeps.
+
+	The base policy records after every event at the depth it is given; there is no default
+	depth, since every recorded level costs memory on every event. Subclasses override
+	shouldRecord and/or set depth.
+
+	Attributes:
+		depth (int): Number of levels per side to record, None for the full book.
+		record_queues (bool): Whether order queues are recorded alongside each snapshot.
+		queue_depth (int): Number of levels per side whose order queues are recorded.
+	"""
+
+	def __init__(self, depth, record_queues=True, queue_depth=5):
+		"""
+		Initializes a new instance of SnapshotPolicy.
+
+		Args:
+			depth (int): Number of levels per side to record (up to LOBSTER's 50), None for the full book.
+			record_queues (bool): Whether to record order queues with each snapshot.
+			queue_depth (int): Number of levels per side whose queues are recorded, up to 50.
+		"""
+		self.depth = depth
+		self.record_queues = record_queues
+		self.queue_depth = queue_depth
+
+	def capture(self, book, event_time):
+		"""
+		Called by the book after each event.
+
+		Args:
+			book (Book): The book that just processed an event.
+			event_time (float): Event time in seconds after midnight.
+
+		Returns:
+			list: [bids, asks] levels to record, or None to skip this event.
+		"""
+		if not self.shouldRecord(book, event_time):
+			return None
+		return book.getLevels(self.depth)
+
+	def shouldRecord(self, book, event_time):
+		"""
+		Returns True if a snapshot should be taken after the current event.
+		"""
+		return True
+
+
+class NoSnapshots(SnapshotPolicy):
+	"""Never records snapshots or queues."""
+
+	def __init__(self):
+		"""Initializes a new instance of NoSnapshots."""
+		super().__init__(depth=0, record_queues=False)
+
+	def capture(self, book, event_time):
+		return None
+
+
+class TopLevels(SnapshotPolicy):
+	"""Records the top N levels per side after every event."""
+
+	def __init__(self, depth, record_queues=True, queue_depth=5):
+		"""
+		Initializes a new instance of TopLevels.
+
+		Args:
+			depth (int): Number of levels per side to record.
+			record_queues (bool): Whether to record order queues with each snapshot.
+			queue_depth (int): Number of levels per side whose queues are recorded.
+		"""
+		super().__init__(depth, record_queues, queue_depth)
+
+
+class Sampled(SnapshotPolicy):
+	"""
+	Records a snapshot every k events and/or every t seconds of event time.
+
+	Attributes:
+		every_events (int): Record on every k-th event, None to disable.
+		every_seconds (float): Record once at least t seconds have passed since the last snapshot, None to disable.
+	"""
+
+	def __init__(self, every_events=None, every_seconds=None, depth=None, record_queues=True, queue_depth=5):
+		"""
+		Initializes a new instance of Sampled.
+
+		Args:
+			every_events (int): Record on every k-th event.
+			every_seconds (float): Minimum event-time gap between snapshots, in seconds.
+			depth (int): Number of levels per side to record, None for the full book.
+			record_queues (bool): Whether to record order queues with each snapshot.
+			queue_depth (int): Number of levels per side whose queues are recorded.
+
+		Raises:
+			ValueError: If neither every_events nor every_seconds is given.
+		"""
+		if every_events is None and every_seconds is None:
+			raise ValueError('Sampled needs every_events and/or every_seconds')
+		super().__init__(depth, record_queues, queue_depth)
+		self.every_events = every_events
+		self.every_seconds = every_seconds
+		self.events_seen = 0
+		self.last_time = None
+
+	def shouldRecord(self, book, event_time):
+		self.events_seen += 1
+		if self.every_events is not None and self.events_seen % self.every_events == 0:
+			self.last_time = event_time
+			return True
+		if self.every_seconds is not None and (self.last_time is None or event_time - self.last_time >= self.every_seconds):
+			self.last_time = event_time
+			return True
+		return False
+
+
+class OnTopChange(SnapshotPolicy):
+	"""
+	Records a snapshot only when the price, volume or order count of the top N levels changed.
+	"""
+
+	def __init__(self, depth, record_queues=True, queue_depth=5):
+		"""
+		Initializes a new instance of OnTopChange.
+
+		Args:
+			depth (int): Number of levels per side to watch and record.
+			record_queues (bool): Whether to record order queues with each snapshot.
+			queue_depth (int): Number of levels per side whose queues are recorded.
+		"""
+		super().__init__(depth, record_queues, queue_depth)
+		self.last_levels = None
+
+	def capture(self, book, event_time):
+		levels = book.getLevels(self.depth)
+		if levels == self.last_levels:
+			return None
+		self.last_levels = levels
+		return levels
@@ -0,0 +1,94 @@
+import numpy as np
+
+ASK = 0
+BID = 1
+
+class SnapshotStore:
+	"""
+	Growable columnar store of book snapshots.
+
+	Levels live in one preallocated float64 array of shape (capacity, depth, 2, 3):
+	snapshot, level (best first), side (ask, bid) and field (price, volume, orders).
+	Flattening the last three axes gives the LOBSTER column order
+	Ask_1, Ask_1_Vol, Ask_1_Ord, Bid_1, Bid_1_Vol, Bid_1_Ord, Ask_2, ...
+	so formatting is a reshape rather than a loop. Missing levels stay 0.
+
+	Attributes:
+		levels (ndarray): Snapshot levels, only the first `size` rows are valid.
+		times (ndarray): Event time of each snapshot in seconds after midnight.
+		size (int): Number of snapshots recorded.
+	"""
+
+	def __init__(self, depth=5, capacity=1024):
+		"""
+		Initializes a new instance of SnapshotStore.
+
+		Args:
+			depth (int): Initial number of levels per side; grows if a wider snapshot is appended.
+			capacity (int): Initial number of snapshots to allocate for; doubles when full.
+		"""
+		self.levels = np.zeros((capacity, max(depth, 1), 2, 3))
+		self.times = np.zeros(capacity)
+		self.size = 0
+
+	def __len__(self):
+		return self.size
+
+	@property
+	def depth(self):
+		return self.levels.shape[1]
+
+	def append(self, time, bids, asks):
+		"""
+		Writes one snapshot into the next free row.
+
+		Args:
+			time (float): Event time in seconds after midnight.
+			bids (list): [price, volume, orders] per bid level in ascending price order.
+			asks (list): [price, volume, orders] per ask level in ascending price order.
+		"""
+		if self.size == len(self.times):
+			self.grow(2 * self.size, self.depth)
+		widest = max(len(bids), len(asks))
+		if widest > self.depth:
+			self.grow(len(self.times), max(widest, self.depth + self.depth // 2))
+		row = self.levels[self.size]
+		if asks:
+			row[:len(asks), ASK] = asks
+		if bids:
+			row[:len(bids), BID] = bids[::-1]
+		self.times[self.size] = time
+		self.size += 1
+
+	def grow(self, capacity, depth):
+		"""
+		Reallocates the arrays with more rows and/or levels, keeping recorded data.
+
+		Args:
+			capacity (int): New number of snapshot rows.
+			depth (int): New number of levels per side.
+		"""
+		levels = np.zeros((capacity, depth, 2, 3))
+		levels[:self.size, :self.depth] = self.levels[:self.size]
+		times = np.zeros(capacity)
+		times[:self.size] = self.times[:self.size]
+		self.levels = levels
+		self.times = times
+
+	def table(self, start_from=0, levels=5):
+		"""
+		Gets the recorded snapshots as a 2D array in LOBSTER column order.
+
+		This is a view of the store when levels equals the store depth, otherwise a copy.
+
+		Args:
+			start_from (int): First snapshot to include.
+			levels (int): Number of levels per side to include.
+
+		Returns:
+			ndarray: Shape (snapshots, 6 * levels).
+		"""
+		if levels > self.depth:
+			self.grow(len(self.times), levels)
+		view = self.levels[start_from:self.size, :levels]
+		return view.reshape(len(view), 6 * levels)
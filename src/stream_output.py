@@ -0,0 +1,49 @@
+from collections import namedtuple
+
+# One streamed event. bids and asks are [price, volume, orders] per level in ascending
+# price order (as in snapshots), None when the snapshot policy skipped the event.
+# execution is (order_id, price, shares, direction), order_id None for a hidden execution.
+BookRecord = namedtuple('BookRecord', ['index', 'time', 'type', 'bids', 'asks', 'execution'])
+
+class Discard:
+	"""
+	Stands in for a history list or journal and keeps nothing.
+	"""
+	__slots__ = ()
+
+	def __len__(self):
+		return 0
+
+	def append(self, *args):
+		pass
+
+
+class Latest:
+	"""
+	Stands in for a history list or snapshot store and keeps only what was appended last.
+
+	Attributes:
+		item (tuple): Arguments of the last append, None once taken.
+	"""
+	__slots__ = ('item',)
+
+	def __init__(self):
+		"""Initializes a new, empty instance of Latest."""
+		self.item = None
+
+	def __len__(self):
+		return 0 if self.item is None else 1
+
+	def append(self, *args):
+		self.item = args
+
+	def take(self):
+		"""
+		Returns the arguments of the last append and forgets them.
+
+		Returns:
+			tuple: Arguments of the last append, None if nothing was appended since the last take.
+		"""
+		item = self.item
+		self.item = None
+		return item
@@ -0,0 +1,91 @@
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from order_book import Book
+import snapshot_policy as sp
+
+def newBook():
+	return Book(snapshot_policy=sp.NoSnapshots())
+
+def test_bbo_fires_only_when_the_best_price_or_size_changes():
+	book = newBook()
+	seen = []
+	book.subscribe('bbo', lambda *args: seen.append(args[1:]))
+	book.processMessage(1.0, 1, 1, 100, 10.00, 1, 0)
+	book.processMessage(2.0, 1, 2, 100, 10.05, -1, 1)
+	book.processMessage(3.0, 1, 3, 100, 9.90, 1, 2)
+	book.processMessage(4.0, 1, 4, 100, 10.10, -1, 3)
+	book.processMessage(5.0, 2, 3, 50, 9.90, 1, 4)
+	book.processMessage(6.0, 5, 0, 30, 10.00, 1, 5)
+	assert seen == [(10.00, 100, None, 0), (10.00, 100, 10.05, 100)]
+
+	book.processMessage(7.0, 4, 1, 40, 10.00, 1, 6)
+	book.processMessage(8.0, 3, 2, 100, 10.05, -1, 7)
+	assert seen[2:] == [(10.00, 60, 10.05, 100), (10.00, 60, 10.10, 100)]
+
+def test_level_fires_on_changes_only_and_reports_removal_as_zero():
+	book = newBook()
+	seen = []
+	book.subscribe('level', lambda *args: seen.append(args[1:]))
+	book.processMessage(1.0, 1, 1, 100, 10.00, 1, 0)
+	book.processMessage(2.0, 1, 2, 200, 10.00, 1, 1)
+	book.processMessage(3.0, 2, 1, 30, 10.00, 1, 2)
+	book.processMessage(4.0, 2, 99, 30, 10.00, 1, 3)
+	book.processMessage(5.0, 5, 0, 30, 10.00, 1, 4)
+	book.processMessage(6.0, 3, 1, 70, 10.00, 1, 5)
+	book.processMessage(7.0, 4, 2, 200, 10.00, 1, 6)
+	assert seen == [(1, 10.00, 100, 1), (1, 10.00, 300, 2), (1, 10.00, 270, 2),
+					(1, 10.00, 200, 1), (1, 10.00, 0, 0)]
+
+def topOrders(book, direction, levels):
+	side = book.buy.highestLimits(levels) if direction == 1 else book.sell.lowestLimits(levels)
+	ids = set()
+	for level in side:
+		order = level.order_queue.head
+		while order is not None:
+			ids.add(order.id)
+			order = order.next
+	return ids
+
+def test_top_order_tracks_orders_entering_and_leaving_the_top_levels():
+	book = newBook()
+	tracked = {2: {1: set(), -1: set()}, 4: {1: set(), -1: set()}}
+	def follow(levels):
+		def callback(time, order_id, direction, price, shares, rank, added):
+			assert rank < levels
+			orders = tracked[levels][direction]
+			if added:
+				assert order_id not in orders
+				orders.add(order_id)
+			else:
+				orders.remove(order_id)
+		return callback
+	book.subscribe('top_order', follow(2), levels=2)
+	book.subscribe('top_order', follow(4), levels=4)
+
+	rng = random.Random(11)
+	live = []
+	next_id = 1
+	for i in range(3000):
+		if rng.random() < 0.5 or not live:
+			direction = rng.choice((1, -1))
+			price = round(100.0 - direction * rng.randint(1, 12) / 100, 2)
+			book.processMessage(float(i), 1, next_id, rng.randint(1, 300), price, direction, i)
+			live.append(next_id)
+			next_id += 1
+		else:
+			order = book.orders[rng.choice(live)]
+			event_type = rng.choice((2, 3, 4))
+			shares = order.shares if event_type == 3 else rng.randint(1, order.shares)
+			if event_type == 2 and shares == order.shares:
+				event_type = 3
+			book.processMessage(float(i), event_type, order.id, shares, order.price, order.direction, i)
+			if order.limit is None:
+				live.remove(order.id)
+
+		for levels, sides in tracked.items():
+			for direction, orders in sides.items():
+				assert orders == topOrders(book, direction, levels)
@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from order_book import Book
+from message_reader import readMessageRows, readOrderbookRow
+import snapshot_policy as sp
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'lobster')
+MESSAGES = os.path.join(DATA, 'AAPL_2012-06-21_34200000_37800000_message_50.csv')
+ORDERBOOK = os.path.join(DATA, 'AAPL_2012-06-21_34200000_57600000_orderbook_1.csv')
+
+def levels(book):
+	"""
+	Every level of both sides as (direction, price, volume, orders).
+	"""
+	return [(direction, level.limit_price, level.total_volume, level.num_orders)
+			for direction, side in ((1, book.buy), (-1, book.sell)) for level in side.inOrderTraversal()]
+
+def seededBook():
+	book = Book(snapshot_policy=sp.NoSnapshots())
+	book.seedFromOrderbook(readOrderbookRow(ORDERBOOK, 0))
+	return book
+
+def test_seeded_checkpoint_resumes_like_an_uninterrupted_replay(tmp_path):
+	split, end = 2000, 6000
+	whole = seededBook()
+	whole.replay(readMessageRows(MESSAGES, 1, end), start_index=1)
+
+	first = seededBook()
+	first.replay(readMessageRows(MESSAGES, 1, split), start_index=1)
+	path = str(tmp_path / 'book.npz')
+	first.saveCheckpoint(path, split - 1)
+	resumed, next_index = Book.loadCheckpoint(path, snapshot_policy=sp.NoSnapshots())
+	assert next_index == split
+	assert resumed.placeholder_count == first.placeholder_count
+	assert {key: order.id for key, order in resumed.placeholders.items()} == {key: order.id for key, order in first.placeholders.items()}
+	resumed.replay(readMessageRows(MESSAGES, split, end), start_index=split)
+
+	assert levels(resumed) == levels(whole)
+	assert sorted(resumed.placeholders) == sorted(whole.placeholders)
+	assert resumed.placeholder_count == whole.placeholder_count
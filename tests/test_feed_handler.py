@@ -0,0 +1,56 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from order_book import Book
+from feed_handler import FeedHandler, BboUpdate, serveMessages
+from message_reader import readMessages
+import snapshot_policy as sp
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'lobster',
+					'AAPL_2012-06-21_34200000_37800000_message_50.csv')
+
+async def runFeed(path, chunk_size):
+	server = await serveMessages(path, chunk_size=chunk_size)
+	handler = FeedHandler(Book(snapshot_policy=sp.NoSnapshots(), retain_history=False), read_size=chunk_size)
+	updates = handler.subscribe(maxsize=64)
+	received = []
+
+	async def consume():
+		while True:
+			update = await updates.get()
+			if update is None:
+				return
+			received.append(update)
+
+	consumer = asyncio.ensure_future(consume())
+	await handler.connect(*server.sockets[0].getsockname()[:2])
+	await consumer
+	server.close()
+	await server.wait_closed()
+	return handler, received
+
+def test_feed_publishes_what_a_replay_of_the_same_messages_sees(tmp_path):
+	# starts mid-day, so some executions hit orders submitted before the slice
+	with open(DATA) as f:
+		lines = f.readlines()[20000:26000]
+	path = str(tmp_path / 'messages.csv')
+	with open(path, 'w') as f:
+		f.writelines(lines)
+
+	book = Book(snapshot_policy=sp.NoSnapshots())
+	bbos = []
+	trades = []
+	book.subscribe('bbo', lambda *args: bbos.append(args))
+	book.subscribe('execution', lambda *args: trades.append(args))
+	book.replay(readMessages(path))
+
+	handler, received = asyncio.run(runFeed(path, chunk_size=4096))
+	assert handler.events == len(lines)
+	assert [tuple(u[1:]) for u in received if isinstance(u, BboUpdate)] == bbos
+	assert [tuple(u[1:]) for u in received if not isinstance(u, BboUpdate)] == trades
+	executions = sum(1 for line in lines if line.split(',')[1] == '4')
+	assert handler.unmatched_executions == executions - len(book.visible_executions)
+	assert handler.unmatched_executions > 0
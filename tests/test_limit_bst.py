@@ -0,0 +1,106 @@
+import math
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import limit_bst as tree
+from order_obj import Order
+
+def checkTree(side, prices):
+	"""
+	Asserts the AVL, ordering and bookkeeping invariants of side, which should hold exactly prices.
+	"""
+	def walk(node, low, high):
+		if node is None:
+			return 0
+		assert low is None or node.limit_price > low
+		assert high is None or node.limit_price < high
+		for child in (node.left_child, node.right_child):
+			if child is not None:
+				assert child.parent is node
+		left = walk(node.left_child, low, node.limit_price)
+		right = walk(node.right_child, node.limit_price, high)
+		assert abs(left - right) <= 1
+		assert node.height == max(left, right) + 1
+		return node.height
+
+	expected = sorted(prices)
+	if side.root is not None:
+		assert side.root.parent is None
+	depth = walk(side.root, None, None)
+	assert side.size == len(expected)
+	assert depth <= 1.45 * math.log2(len(expected) + 2)
+	levels = side.inOrderTraversal()
+	assert [level.limit_price for level in levels] == expected
+	if not expected:
+		assert side.min_limit is None and side.max_limit is None
+		return
+	assert side.min_limit is levels[0]
+	assert side.max_limit is levels[-1]
+	for lower, upper in zip(levels, levels[1:]):
+		assert side.successor(lower) is upper
+		assert side.predecessor(upper) is lower
+	assert side.successor(levels[-1]) is None
+	assert side.predecessor(levels[0]) is None
+
+def add(side, orders, price):
+	order = Order(0.0, len(orders) + 1, 100, price, 1)
+	orders[price] = order
+	side.handleNewOrder(order)
+
+def remove(side, orders, price):
+	side.handleDeletion(orders.pop(price))
+
+@pytest.mark.parametrize('sequence', ['ascending', 'descending', 'random'])
+def test_inserts_then_removals_keep_the_tree_balanced(sequence):
+	prices = [585.0 + k / 100 for k in range(300)]
+	if sequence == 'descending':
+		prices.reverse()
+	elif sequence == 'random':
+		random.Random(1).shuffle(prices)
+	side = tree.BinarySearchTree()
+	orders = {}
+	for price in prices:
+		add(side, orders, price)
+		checkTree(side, orders)
+	for price in prices:
+		remove(side, orders, price)
+		checkTree(side, orders)
+
+def test_removing_from_one_end_keeps_the_tree_balanced():
+	prices = [585.0 + k / 100 for k in range(200)]
+	side = tree.BinarySearchTree()
+	orders = {}
+	for price in prices:
+		add(side, orders, price)
+	for price in prices[:150]:
+		remove(side, orders, price)
+		checkTree(side, orders)
+
+def test_random_interleaved_inserts_and_removals():
+	rng = random.Random(7)
+	side = tree.BinarySearchTree()
+	orders = {}
+	for _ in range(3000):
+		if orders and rng.random() < 0.45:
+			remove(side, orders, rng.choice(list(orders)))
+		else:
+			price = 585.0 + rng.randrange(500) / 100
+			if price not in orders:
+				add(side, orders, price)
+		checkTree(side, orders)
+
+def test_resting_orders_keep_their_level_through_rebalancing():
+	side = tree.BinarySearchTree()
+	orders = {}
+	for k in range(64):
+		add(side, orders, 585.0 + k / 100)
+	for k in range(0, 64, 2):
+		remove(side, orders, 585.0 + k / 100)
+	for price, order in orders.items():
+		assert order.limit is side.getLimit(price)
+		assert order.limit.limit_price == price
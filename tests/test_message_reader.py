@@ -0,0 +1,49 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from message_reader import readMessages, writeBinaryMessages, loadBinaryMessages
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'lobster',
+					'AAPL_2012-06-21_34200000_37800000_message_50.csv')
+
+@pytest.fixture(scope='module')
+def binary_path(tmp_path_factory):
+	path = str(tmp_path_factory.mktemp('binary') / 'messages.bin')
+	writeBinaryMessages(DATA, path, chunk_size=20000)
+	return path
+
+@pytest.mark.parametrize('price_scale', [10000, None])
+def test_memory_mapped_messages_match_the_csv(binary_path, price_scale):
+	expected = readMessages(DATA, price_scale=price_scale)
+	times, types, order_ids, shares, prices, directions = loadBinaryMessages(binary_path, price_scale=price_scale)
+
+	assert len(times) == len(expected)
+	assert isinstance(order_ids, np.memmap)
+	assert (types.dtype, order_ids.dtype, shares.dtype, directions.dtype) == (np.int8, np.int64, np.int32, np.int8)
+	np.testing.assert_allclose(times, expected['time'].to_numpy(), rtol=0, atol=1e-9)
+	np.testing.assert_array_equal(types, expected['type'].to_numpy())
+	np.testing.assert_array_equal(order_ids, expected['order_id'].to_numpy())
+	np.testing.assert_array_equal(shares, expected['shares'].to_numpy())
+	np.testing.assert_array_equal(directions, expected['direction'].to_numpy())
+	if price_scale is None:
+		assert prices.dtype == np.int64
+		np.testing.assert_array_equal(prices, expected['price'].to_numpy())
+	else:
+		assert prices.dtype == np.float64
+		np.testing.assert_allclose(prices, expected['price'].to_numpy(), rtol=0, atol=1e-9)
+
+def test_time_window_matches_the_csv_filter(binary_path):
+	start, end = 34500.0, 35000.0
+	expected = readMessages(DATA, start_time=start, end_time=end)
+	columns = loadBinaryMessages(binary_path, start_time=start, end_time=end)
+	assert len(columns[0]) == len(expected)
+	np.testing.assert_array_equal(columns[2], expected['order_id'].to_numpy())
+
+def test_rejects_other_files():
+	with pytest.raises(ValueError):
+		loadBinaryMessages(DATA)
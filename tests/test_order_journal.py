@@ -0,0 +1,29 @@
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from order_journal import OrderJournal
+
+def test_rows_match_a_scan_while_the_journal_grows():
+	rng = random.Random(5)
+	journal = OrderJournal()
+	appended = []
+	assert journal.rows(1) == []
+	for i in range(20000):
+		order_id = rng.randint(1, 500)
+		journal.append(order_id, 34200.0 + i, rng.randint(1, 4), rng.randint(1, 100), 0)
+		appended.append(order_id)
+		if i % 997 == 0:
+			for order_id in (rng.randint(1, 500), appended[-1], 10 ** 9):
+				assert journal.rows(order_id) == [row for row, seen in enumerate(appended) if seen == order_id]
+
+def test_history_is_oldest_first():
+	journal = OrderJournal()
+	journal.append(7, 34200.0, 1, 100, 100)
+	journal.append(8, 34200.5, 1, 50, 50)
+	journal.append(7, 34201.0, 2, 30, 70)
+	assert journal.history(7) == [[34200.0, 100, 1], [34201.0, 30, 2]]
+	journal.append(7, 34202.0, 4, 70, 0)
+	assert journal.history(7)[-1] == [34202.0, 70, 4]
@@ -0,0 +1,72 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import limit_bst as tree
+from price_ladder import PriceLadder
+from order_book import Book
+from message_reader import readMessages
+from order_obj import Order
+import snapshot_policy as sp
+
+TICK = 100
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'lobster',
+					'AAPL_2012-06-21_34200000_37800000_message_50.csv')
+
+def prices(levels):
+	return [level.limit_price for level in levels]
+
+def checkSide(ladder, reference):
+	"""
+	Asserts ladder holds the same levels as the plain tree reference and finds them the same way.
+	"""
+	expected = prices(reference.inOrderTraversal())
+	assert prices(ladder.inOrderTraversal()) == expected
+	assert ladder.size == len(expected)
+	assert prices(ladder.lowestLimits(5)) == expected[:5]
+	assert prices(ladder.highestLimits(5)) == expected[::-1][:5]
+	if expected:
+		assert ladder.minLimit().limit_price == expected[0]
+		assert ladder.maxLimit().limit_price == expected[-1]
+		best = expected[-1] if ladder.direction == 1 else expected[0]
+		# the best price always sits in the array
+		assert ladder.slotIndex(best) is not None
+	else:
+		assert ladder.minLimit() is None and ladder.maxLimit() is None
+	for price in expected:
+		assert ladder.getLimit(price).limit_price == price
+
+@pytest.mark.parametrize('direction', [1, -1])
+def test_ladder_matches_a_tree_while_prices_drift(direction):
+	rng = random.Random(direction + 2)
+	ladder = PriceLadder(TICK, 16, direction)
+	reference = tree.BinarySearchTree()
+	orders = {}
+	center = 5850000
+	for i in range(6000):
+		# drift the touch so the best price keeps leaving the window in both directions
+		center += TICK * rng.choice((-1, 0, 0, 1))
+		if orders and rng.random() < 0.45:
+			order_id = rng.choice(list(orders))
+			ladder_order, reference_order = orders.pop(order_id)
+			ladder.handleDeletion(ladder_order)
+			reference.handleDeletion(reference_order)
+		else:
+			price = center + TICK * rng.randint(-25, 25)
+			orders[i] = (Order(0.0, i, 100, price, direction), Order(0.0, i, 100, price, direction))
+			ladder.handleNewOrder(orders[i][0])
+			reference.handleNewOrder(orders[i][1])
+		checkSide(ladder, reference)
+	for ladder_order, reference_order in orders.values():
+		assert ladder_order.limit is ladder.getLimit(ladder_order.price)
+
+def test_tick_book_replays_like_the_float_book():
+	float_book = Book(snapshot_policy=sp.TopLevels(10, record_queues=False))
+	tick_book = Book(tick_size=TICK, ladder_window=64, snapshot_policy=sp.TopLevels(10, record_queues=False))
+	float_book.replay(readMessages(DATA, end_time=36000))
+	tick_book.replay(readMessages(DATA, end_time=36000, price_scale=None))
+	assert (float_book.lobsterBook(0, 10).to_numpy() == tick_book.lobsterBook(0, 10).to_numpy()).all()
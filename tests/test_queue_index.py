@@ -0,0 +1,63 @@
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from order_book import Book
+from level_linked_list import LinkedList
+import snapshot_policy as sp
+
+PRICES = [585.0, 585.01, 585.02]
+
+def walkedPosition(order):
+	"""
+	Rank and shares ahead of order found by walking its queue from the head.
+	"""
+	rank = 0
+	shares = 0
+	node = order.limit.order_queue.head
+	while node is not order:
+		rank += 1
+		shares += node.shares
+		node = node.next
+	return rank, shares
+
+def test_queue_position_matches_a_walk_of_the_queue(monkeypatch):
+	reindexed = []
+	reindex = LinkedList.reindex
+	def countingReindex(queue):
+		reindexed.append(queue)
+		reindex(queue)
+	monkeypatch.setattr(LinkedList, 'reindex', countingReindex)
+
+	rng = random.Random(3)
+	book = Book(snapshot_policy=sp.NoSnapshots())
+	live = []
+	next_id = 1
+	for i in range(4000):
+		draw = rng.random()
+		if draw < 0.45 or not live:
+			book.processMessage(34200.0 + i, 1, next_id, rng.randint(1, 500), rng.choice(PRICES), 1, i)
+			live.append(next_id)
+			next_id += 1
+		else:
+			order = book.orders[rng.choice(live)]
+			if draw < 0.7:
+				event_type = 4
+				shares = rng.randint(1, order.shares)
+			elif draw < 0.9 and order.shares > 1:
+				event_type = 2
+				shares = rng.randint(1, order.shares - 1)
+			else:
+				event_type = 3
+				shares = order.shares
+			book.processMessage(34200.0 + i, event_type, order.id, shares, order.price, 1, i)
+			if order.limit is None:
+				live.remove(order.id)
+
+		for order_id in live:
+			assert book.queuePosition(order_id) == walkedPosition(book.orders[order_id])
+
+	assert reindexed
+	assert book.queuePosition(next_id) is None
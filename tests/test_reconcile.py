@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from reconcile import reconcile
+
+# a window that opens with liquidity already resting: orders 5 to 9 were submitted before it
+MESSAGES = ['34200.1,1,11,100,999900,1',
+			'34200.2,1,12,100,1000000,-1',
+			'34200.3,4,12,40,1000000,-1',
+			'34200.4,2,7,100,999900,1',
+			'34200.5,3,8,100,999800,1',
+			'34200.6,4,9,200,1000500,-1',
+			'34200.7,5,0,30,999950,1']
+
+# Ask_1, Ask_1_Size, Bid_1, Bid_1_Size, Ask_2, Ask_2_Size, Bid_2, Bid_2_Size after each message
+ORDERBOOK = [[1000500, 200, 999900, 400, 1001000, 50, 999800, 100],
+			[1000000, 100, 999900, 400, 1000500, 200, 999800, 100],
+			[1000000, 60, 999900, 400, 1000500, 200, 999800, 100],
+			[1000000, 60, 999900, 300, 1000500, 200, 999800, 100],
+			[1000000, 60, 999900, 300, 1000500, 200, -9999999999, 0],
+			[1000000, 60, 999900, 300, 1001000, 50, -9999999999, 0],
+			[1000000, 60, 999900, 300, 1001000, 50, -9999999999, 0]]
+
+def writePair(tmp_path, orderbook):
+	message_path = str(tmp_path / 'message_2.csv')
+	orderbook_path = str(tmp_path / 'orderbook_2.csv')
+	with open(message_path, 'w') as f:
+		f.write('\n'.join(MESSAGES) + '\n')
+	with open(orderbook_path, 'w') as f:
+		f.write('\n'.join(','.join(str(v) for v in row) for row in orderbook) + '\n')
+	return message_path, orderbook_path
+
+def test_aligned_files_reconcile_after_seeding(tmp_path):
+	report = reconcile(*writePair(tmp_path, ORDERBOOK), levels=2, chunk_size=4)
+	assert report['seeded']
+	assert report['rows'] == len(ORDERBOOK) - 1
+	assert report['mismatched_rows'] == 0
+	assert report['first_divergence'] is None
+
+def test_unseeded_replay_misses_the_resting_liquidity(tmp_path):
+	report = reconcile(*writePair(tmp_path, ORDERBOOK), levels=2, seed=False)
+	assert report['mismatched_rows'] == len(ORDERBOOK)
+	assert report['first_divergence']['row'] == 0
+
+def test_a_mismatched_row_fails(tmp_path):
+	orderbook = [list(row) for row in ORDERBOOK]
+	orderbook[3][3] = 310
+	report = reconcile(*writePair(tmp_path, orderbook), levels=2, chunk_size=4)
+	assert report['mismatched_rows'] == 1
+	divergence = report['first_divergence']
+	assert divergence['row'] == 3
+	assert divergence['levels'] == [{'side': 'bid', 'level': 1, 'expected': [999900, 310], 'actual': [999900, 300]}]